@@ -18,15 +18,23 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Callers with their own logging, such as src/migrate.py, disable it.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-from models.project import Project
+from models.outbox import OutboxEmail
+from models.project import SEARCH_TRIGRAM_INDEX, Project
 
 target_metadata = SQLModel.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # The trigram index is created by migration where pg_trgm is available, and is not part of the models
+    return not (type_ == "index" and name == SEARCH_TRIGRAM_INDEX)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -49,6 +57,7 @@ def run_migrations_offline():
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +67,7 @@ def run_migrations_offline():
 
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -71,7 +80,7 @@ async def run_migrations_online():
     and associate a connection with the context.
 
     """
-    connectable = AsyncEngine(create_engine(settings.SQLALCHEMY_DATABASE_URI, echo=True, future=True))
+    connectable = AsyncEngine(create_engine(settings.SQLALCHEMY_DATABASE_URI, future=True))
 
     async with connectable.connect() as connection:
         await connection.run_sync(do_run_migrations)
@@ -0,0 +1,46 @@
+"""search projects
+
+Revision ID: 5b7e2f9c1d3a
+Revises: 04d0b0be673d
+Create Date: 2026-10-19 09:12:40.118203
+
+"""
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "5b7e2f9c1d3a"
+down_revision = "04d0b0be673d"
+branch_labels = None
+depends_on = None
+
+SEARCH_TEXT = (
+    "coalesce(name, '') || ' ' || coalesce(project_id, '') || ' ' || coalesce(client, '') || ' ' || "
+    "coalesce(address, '') || ' ' || coalesce(city, '') || ' ' || coalesce(country, '')"
+)
+
+
+def upgrade():
+    op.add_column(
+        "project",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(f"to_tsvector('simple', {SEARCH_TEXT})", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_project_search_vector", "project", ["search_vector"], unique=False, postgresql_using="gin")
+
+    # Without pg_trgm, partial words are still found, by scanning the table
+    if op.get_bind().execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f"CREATE INDEX ix_project_search_text_trgm ON project USING gin (({SEARCH_TEXT}) gin_trgm_ops)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_project_search_text_trgm")
+    op.drop_index("ix_project_search_vector", table_name="project")
+    op.drop_column("project", "search_vector")
@@ -0,0 +1,39 @@
+"""meta fields as jsonb
+
+Revision ID: 8c4d1e6a2f90
+Revises: 5b7e2f9c1d3a
+Create Date: 2026-10-19 10:02:17.530941
+
+"""
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "8c4d1e6a2f90"
+down_revision = "5b7e2f9c1d3a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column(
+        "project",
+        "meta_fields",
+        existing_type=postgresql.JSON(astext_type=sa.Text()),
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using="meta_fields::jsonb",
+    )
+    op.create_index("ix_project_meta_fields", "project", ["meta_fields"], unique=False, postgresql_using="gin")
+
+
+def downgrade():
+    op.drop_index("ix_project_meta_fields", table_name="project")
+    op.alter_column(
+        "project",
+        "meta_fields",
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using="meta_fields::json",
+    )
@@ -0,0 +1,27 @@
+"""project updated at
+
+Revision ID: a3f9c27e5b14
+Revises: 8c4d1e6a2f90
+Create Date: 2026-10-19 10:48:03.771254
+
+"""
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a3f9c27e5b14"
+down_revision = "8c4d1e6a2f90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "project",
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_column("project", "updated_at")
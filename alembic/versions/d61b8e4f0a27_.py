@@ -0,0 +1,102 @@
+"""change tracking
+
+Revision ID: d61b8e4f0a27
+Revises: a3f9c27e5b14
+Create Date: 2026-10-19 11:36:52.204117
+
+"""
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d61b8e4f0a27"
+down_revision = "a3f9c27e5b14"
+branch_labels = None
+depends_on = None
+
+SET_UPDATED_AT = """
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+RECORD_TOMBSTONE = """
+CREATE OR REPLACE FUNCTION record_tombstone() RETURNS trigger AS $$
+DECLARE
+    deleted jsonb := to_jsonb(OLD);
+    project text := deleted ->> TG_ARGV[1];
+BEGIN
+    -- rows without a project_id column name a parent table to look it up in
+    IF TG_NARGS > 2 THEN
+        EXECUTE format('SELECT project_id FROM %I WHERE id = $1', TG_ARGV[2]) INTO project USING project;
+    END IF;
+    INSERT INTO tombstone (entity, entity_id, project_id, user_id)
+    SELECT TG_TABLE_NAME, string_agg(deleted ->> key, ':' ORDER BY position), project, deleted ->> 'user_id'
+    FROM unnest(string_to_array(TG_ARGV[0], ',')) WITH ORDINALITY AS keys (key, position);
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# table, the columns identifying a deleted row, its project column and the parent table holding the project
+TRACKED_TABLES = [
+    ("project", "id", "id", None),
+    ("projectmember", "id", "project_id", None),
+    ("projectgroup", "id", "project_id", None),
+    ("projectstage", "stage_id", "project_id", None),
+    ("membergrouplink", "member_id,group_id", "group_id", "projectgroup"),
+]
+
+
+def upgrade():
+    op.create_table(
+        "tombstone",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entity", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("entity_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("project_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("user_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_tombstone_deleted_at"), "tombstone", ["deleted_at"], unique=False)
+    op.execute(SET_UPDATED_AT)
+    op.execute(RECORD_TOMBSTONE)
+
+    for table, id_columns, project_column, parent_table in TRACKED_TABLES:
+        if table != "project":
+            op.add_column(
+                table,
+                sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            )
+        op.add_column(
+            table, sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False)
+        )
+        op.create_index(op.f(f"ix_{table}_updated_at"), table, ["updated_at"], unique=False)
+
+        arguments = ", ".join(f"'{argument}'" for argument in (id_columns, project_column, parent_table) if argument)
+        op.execute(
+            f"CREATE TRIGGER {table}_updated_at BEFORE UPDATE ON {table} FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_tombstone AFTER DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION record_tombstone({arguments})"
+        )
+
+
+def downgrade():
+    for table, _, _, _ in reversed(TRACKED_TABLES):
+        op.execute(f"DROP TRIGGER {table}_tombstone ON {table}")
+        op.execute(f"DROP TRIGGER {table}_updated_at ON {table}")
+        op.drop_index(op.f(f"ix_{table}_updated_at"), table_name=table)
+        op.drop_column(table, "created_at")
+        if table != "project":
+            op.drop_column(table, "updated_at")
+
+    op.execute("DROP FUNCTION record_tombstone()")
+    op.execute("DROP FUNCTION set_updated_at()")
+    op.drop_index(op.f("ix_tombstone_deleted_at"), table_name="tombstone")
+    op.drop_table("tombstone")
@@ -0,0 +1,39 @@
+"""email outbox
+
+Revision ID: f2a8c61d93e5
+Revises: d61b8e4f0a27
+Create Date: 2026-10-19 14:05:41.518302
+
+"""
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "f2a8c61d93e5"
+down_revision = "d61b8e4f0a27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outboxemail",
+        sa.Column("parameters", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("recipient", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("email_type", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_outboxemail_next_attempt_at"), "outboxemail", ["next_attempt_at"], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_outboxemail_next_attempt_at"), table_name="outboxemail")
+    op.drop_table("outboxemail")
@@ -0,0 +1,31 @@
+#! /usr/bin/bash
+set -e
+
+# Settings for a local benchmark run. Point POSTGRES_* at the database to seed, it will be modified!
+export SERVER_NAME="LCA Test"
+export SERVER_HOST="http://benchmark"
+export PROJECT_NAME="LCA Benchmark"
+export POSTGRES_HOST=${POSTGRES_HOST:-localhost}
+export POSTGRES_USER=${POSTGRES_USER:-postgresuser}
+export POSTGRES_PASSWORD=${POSTGRES_PASSWORD:-mypassword}
+export POSTGRES_DB=${POSTGRES_DB:-project}
+export POSTGRES_PORT=${POSTGRES_PORT:-5632}
+export AAD_OPENAPI_CLIENT_ID=PLACEHOLDER
+export AAD_APP_CLIENT_ID=PLACEHOLDER
+export AAD_TENANT_ID=PLACEHOLDER
+export AAD_GRAPH_SECRET=PLACEHOLDER
+export SENDGRID_SECRET=PLACEHOLDER
+export ROUTER_URL=http://127.0.0.1:8765
+export STORAGE_ACCOUNT_URL=PLACEHOLDER
+export STORAGE_CONTAINER_NAME=PLACEHOLDER
+export STORAGE_ACCESS_KEY=PLACEHOLDER
+export STORAGE_BASE_PATH=benchmark
+export EMAIL_NOTIFICATION_FROM=no-reply@arkitema.com
+export INTERNAL_EMAIL_DOMAINS_LIST=arkitema,cowi,cowicloud
+export DEFAULT_AD_FQDN=cowi.onmicrosoft.com
+
+# Run the benchmark suite, all arguments are passed on. See `./benchmark.sh --help`
+# Set BENCHMARK=encoding to benchmark the response encoding instead of the load test
+BASEDIR=$(dirname $0)
+cd $BASEDIR
+python -m benchmarks.${BENCHMARK:-run} "$@"
@@ -0,0 +1,109 @@
+"""
+Compare the cost of encoding a large `projects` response with the stdlib json encoder used by Strawberry,
+with orjson, and with orjson followed by the compression negotiated by the GraphQL router.
+
+The payload has the shape of the `projects` query of the load test, so the numbers can be related to it.
+For an end-to-end comparison seed 5000 projects and run the `projects` scenario of `benchmarks/run.py`.
+"""
+import argparse
+import json
+import pathlib
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from benchmarks.generate import user_id_for
+from benchmarks.stubs import fake_user
+
+from core.encoding import compress, encode_json
+
+
+@dataclass
+class EncodingResult:
+    name: str
+    size: int
+    per_response_ms: float
+    responses_per_second: float
+    megabytes_per_second: float
+
+
+def projects_payload(projects: int, members: int, groups: int, stages: int) -> dict:
+    """A response to the `projects` query of the load test"""
+
+    return {
+        "data": {
+            "projects": [
+                {
+                    "id": f"project-{project:06d}",
+                    "name": f"Benchmark Project {project}",
+                    "client": f"Client {project % 50}",
+                    "metaFields": {"benchmark": True, "index": project, "domain": "design"},
+                    "members": [
+                        {"id": f"member-{project:06d}-{member:03d}", "name": user["displayName"], "email": user["mail"]}
+                        for member in range(members)
+                        for user in [fake_user(user_id_for(member))]
+                    ],
+                    "groups": [
+                        {"id": f"group-{project:06d}-{group:03d}", "name": f"Group {group}"} for group in range(groups)
+                    ],
+                    "stages": [
+                        {"stageId": f"stage-{stage:03d}", "name": f"Stage {stage}", "phase": "production"}
+                        for stage in range(stages)
+                    ],
+                }
+                for project in range(projects)
+            ]
+        }
+    }
+
+
+def measure(name: str, encode: Callable[[dict], bytes], payload: dict, iterations: int) -> EncodingResult:
+    body = encode(payload)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encode(payload)
+    elapsed = (time.perf_counter() - start) / iterations
+
+    uncompressed = len(json.dumps(payload).encode())
+    return EncodingResult(
+        name=name,
+        size=len(body),
+        per_response_ms=elapsed * 1000,
+        responses_per_second=1 / elapsed,
+        megabytes_per_second=uncompressed / elapsed / 1e6,
+    )
+
+
+def main(args: argparse.Namespace):
+    payload = projects_payload(args.projects, args.members, args.groups, args.stages)
+    strategies = {
+        "json": lambda data: json.dumps(data).encode(),
+        "orjson": encode_json,
+        "orjson + gzip": lambda data: compress(encode_json(data), "gzip"),
+        "orjson + br": lambda data: compress(encode_json(data), "br"),
+    }
+
+    results = [measure(name, encode, payload, args.iterations) for name, encode in strategies.items()]
+
+    header = f"{'encoding':<16}{'size kB':>12}{'ms/response':>14}{'responses/s':>14}{'MB/s':>10}"
+    print(f"{args.projects} projects with {args.members} members, {args.groups} groups and {args.stages} stages")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result.name:<16}{result.size / 1000:>12.1f}{result.per_response_ms:>14.1f}"
+            f"{result.responses_per_second:>14.1f}{result.megabytes_per_second:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding and compression of a projects response")
+    parser.add_argument("--projects", type=int, default=5000, help="Number of projects in the response")
+    parser.add_argument("--members", type=int, default=20, help="Members per project")
+    parser.add_argument("--groups", type=int, default=5, help="Groups per project")
+    parser.add_argument("--stages", type=int, default=6, help="Life cycle stages per project")
+    parser.add_argument("--iterations", type=int, default=10, help="Measured encodings per strategy")
+    main(parser.parse_args())
@@ -0,0 +1,202 @@
+import argparse
+import asyncio
+import json
+import logging
+import pathlib
+import random
+import sys
+from dataclasses import dataclass, field
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from lcacollect_config.connection import create_postgres_engine
+from lcacollect_config.formatting import string_uuid
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel, select
+
+from models.group import MemberGroupLink, ProjectGroup
+from models.member import ProjectMember
+from models.project import Project
+from models.stage import LifeCycleStage, ProjectStage
+
+logger = logging.getLogger(__name__)
+
+LIFE_CYCLE_STAGES = pathlib.Path(__file__).resolve().parents[1] / "alembic" / "initial_data" / "life_cycle_stages.json"
+BATCH_SIZE = 5000
+
+
+@dataclass
+class Dataset:
+    """Identifiers of the generated rows, used by the benchmark scenarios"""
+
+    project_ids: list[str] = field(default_factory=list)
+    group_ids: list[str] = field(default_factory=list)
+    member_ids: list[str] = field(default_factory=list)
+    user_ids: list[str] = field(default_factory=list)
+    stage_ids: list[str] = field(default_factory=list)
+
+
+def user_id_for(index: int) -> str:
+    """Deterministic Azure AD object id for a synthetic user"""
+
+    return f"00000000-0000-4000-8000-{index:012d}"
+
+
+async def insert_rows(engine: AsyncEngine, model: type[SQLModel], rows: list[dict]):
+    """Bulk insert rows in batches with a single executemany per batch"""
+
+    async with engine.begin() as connection:
+        for start in range(0, len(rows), BATCH_SIZE):
+            await connection.execute(insert(model.__table__), rows[start : start + BATCH_SIZE])
+
+
+async def ensure_life_cycle_stages(engine: AsyncEngine) -> list[str]:
+    """Return the ids of the life cycle stages, loading the EN 15978 stages if the table is empty"""
+
+    async with engine.begin() as connection:
+        stage_ids = (await connection.execute(select(LifeCycleStage.id))).scalars().all()
+    if stage_ids:
+        return list(stage_ids)
+
+    rows = [{"id": string_uuid(), **stage} for stage in json.loads(LIFE_CYCLE_STAGES.read_text())]
+    await insert_rows(engine, LifeCycleStage, rows)
+    return [row["id"] for row in rows]
+
+
+async def generate_dataset(
+    engine: AsyncEngine,
+    projects: int,
+    members: int,
+    groups: int,
+    stages: int,
+    users: int | None = None,
+    public_ratio: float = 0.1,
+    seed: int = 42,
+) -> Dataset:
+    """
+    Seed the database with a synthetic dataset.
+
+    Args:
+        engine: database engine to write to
+        projects: number of projects
+        members: number of members per project
+        groups: number of groups per project
+        stages: number of life cycle stages per project
+        users: size of the pool of distinct users that members are drawn from.
+            Defaults to `members * 10`, so users are shared across projects like in production.
+            The first user is the owner and a member of every project.
+        public_ratio: share of the projects that are public
+        seed: seed for the random generator, so runs are reproducible
+
+    Returns: identifiers of the generated data
+    """
+
+    rng = random.Random(seed)
+    users = users or members * 10
+    dataset = Dataset(user_ids=[user_id_for(index) for index in range(users)])
+
+    life_cycle_stage_ids = await ensure_life_cycle_stages(engine)
+    stages = min(stages, len(life_cycle_stage_ids))
+
+    project_rows, member_rows, group_rows, link_rows, stage_rows = [], [], [], [], []
+    for project_index in range(projects):
+        project_id = string_uuid()
+        project_rows.append(
+            {
+                "id": project_id,
+                "project_id": f"BENCH{project_index:06d}",
+                "name": f"Benchmark Project {project_index}",
+                "client": f"Client {rng.randint(0, 99)}",
+                "domain": rng.choice(["buildings", "infrastructure", "energy", "tunnels"]),
+                "address": f"Street {project_index}",
+                "city": rng.choice(["Copenhagen", "Aarhus", "Oslo", "Stockholm"]),
+                "country": rng.choice(["Denmark", "Norway", "Sweden"]),
+                "image_url": None,
+                "public": rng.random() < public_ratio,
+                "meta_fields": {"owner": dataset.user_ids[0], "domain": "design"},
+            }
+        )
+
+        # The first user owns every project, so the benchmark user has access to all of them
+        project_users = [dataset.user_ids[0], *rng.sample(dataset.user_ids[1:], k=max(min(members, users) - 1, 0))]
+        project_member_ids = []
+        for user_id in project_users:
+            member_id = string_uuid()
+            project_member_ids.append(member_id)
+            member_rows.append({"id": member_id, "user_id": user_id, "project_id": project_id})
+
+        for group_index in range(groups):
+            group_id = string_uuid()
+            group_rows.append(
+                {
+                    "id": group_id,
+                    "name": f"Group {group_index}",
+                    "lead_id": rng.choice(project_member_ids) if project_member_ids else None,
+                    "project_id": project_id,
+                }
+            )
+            group_members = rng.sample(project_member_ids, k=len(project_member_ids) // max(groups, 1))
+            link_rows.extend({"member_id": member_id, "group_id": group_id} for member_id in group_members)
+            dataset.group_ids.append(group_id)
+
+        stage_rows.extend(
+            {"stage_id": stage_id, "project_id": project_id} for stage_id in rng.sample(life_cycle_stage_ids, k=stages)
+        )
+        dataset.project_ids.append(project_id)
+        dataset.member_ids.extend(project_member_ids)
+
+    dataset.stage_ids = life_cycle_stage_ids
+
+    await insert_rows(engine, Project, project_rows)
+    await insert_rows(engine, ProjectMember, member_rows)
+    await insert_rows(engine, ProjectGroup, group_rows)
+    await insert_rows(engine, MemberGroupLink, link_rows)
+    await insert_rows(engine, ProjectStage, stage_rows)
+
+    logger.info(
+        f"Generated {len(project_rows)} projects, {len(member_rows)} members, {len(group_rows)} groups, "
+        f"{len(link_rows)} group memberships and {len(stage_rows)} project stages"
+    )
+    return dataset
+
+
+async def reset_database(engine: AsyncEngine):
+    """Drop and recreate all tables"""
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.drop_all)
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--projects", type=int, default=100, help="Number of projects")
+    parser.add_argument("--members", type=int, default=20, help="Members per project")
+    parser.add_argument("--groups", type=int, default=5, help="Groups per project")
+    parser.add_argument("--stages", type=int, default=6, help="Life cycle stages per project")
+    parser.add_argument("--users", type=int, default=None, help="Distinct users shared across projects")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables before seeding")
+
+
+async def main(args: argparse.Namespace):
+    engine = create_postgres_engine()
+    if args.reset:
+        await reset_database(engine)
+    await generate_dataset(
+        engine,
+        projects=args.projects,
+        members=args.members,
+        groups=args.groups,
+        stages=args.stages,
+        users=args.users,
+        seed=args.seed,
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Seed the project database with a synthetic dataset")
+    add_dataset_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
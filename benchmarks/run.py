@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import pathlib
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+from typing import Callable
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from benchmarks.generate import (
+    Dataset,
+    add_dataset_arguments,
+    generate_dataset,
+    reset_database,
+    user_id_for,
+)
+from benchmarks.stubs import patch_graph, serve_router
+from httpx import AsyncClient
+from lcacollect_config.connection import create_postgres_engine
+from lcacollect_config.security import azure_scheme
+
+from core.config import settings
+from core.statements import track_statements
+from main import app
+
+logger = logging.getLogger(__name__)
+
+PROJECTS_QUERY = """
+    query {
+        projects {
+            id
+            name
+            client
+            metaFields
+            members { id name email }
+            groups { id name }
+            stages { stageId name phase }
+        }
+    }
+"""
+
+PROJECT_MEMBERS_QUERY = """
+    query($projectId: String!) {
+        projectMembers(projectId: $projectId) {
+            id
+            userId
+            name
+            email
+            company
+            lastLogin
+            projectGroups { id name }
+        }
+    }
+"""
+
+PROJECT_GROUPS_QUERY = """
+    query($projectId: String!) {
+        projectGroups(projectId: $projectId) {
+            id
+            name
+            lead { id name email }
+            members { id name email }
+        }
+    }
+"""
+
+ENTITIES_QUERY = """
+    query($representations: [_Any!]!) {
+        _entities(representations: $representations) {
+            ... on GraphQLTask {
+                id
+                author { id name email }
+                assignee { ... on GraphQLProjectMember { id name } }
+            }
+        }
+    }
+"""
+
+ADD_PROJECT_MUTATION = """
+    mutation($name: String!, $userId: String!) {
+        addProject(name: $name, members: [{userId: $userId}]) { id name }
+    }
+"""
+
+UPDATE_PROJECT_MUTATION = """
+    mutation($id: String!, $name: String!) {
+        updateProject(id: $id, name: $name, metaFields: {benchmark: true}) { id name }
+    }
+"""
+
+ADD_PROJECT_GROUP_MUTATION = """
+    mutation($projectId: String!, $name: String!) {
+        addProjectGroup(projectId: $projectId, name: $name) { id name }
+    }
+"""
+
+ADD_PROJECT_MEMBER_MUTATION = """
+    mutation($projectId: String!, $email: String!) {
+        addProjectMember(projectId: $projectId, name: "Benchmark", email: $email, projectGroupIds: []) { id name }
+    }
+"""
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput: float
+    statements_per_request: float
+    error_samples: list[str] = field(default_factory=list)
+
+
+def percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def build_scenarios(dataset: Dataset) -> dict[str, Callable[[int], dict]]:
+    """Map scenario names to a function building the GraphQL payload for the n'th request"""
+
+    projects = itertools.cycle(dataset.project_ids)
+    return {
+        "projects": lambda n: {"query": PROJECTS_QUERY},
+        "projectMembers": lambda n: {"query": PROJECT_MEMBERS_QUERY, "variables": {"projectId": next(projects)}},
+        "projectGroups": lambda n: {"query": PROJECT_GROUPS_QUERY, "variables": {"projectId": next(projects)}},
+        "_entities": lambda n: {
+            "query": ENTITIES_QUERY,
+            "variables": {"representations": [{"__typename": "GraphQLTask", "id": f"task-{n % 50}"}]},
+        },
+        "addProject": lambda n: {
+            "query": ADD_PROJECT_MUTATION,
+            "variables": {"name": f"Benchmark Added {n}", "userId": dataset.user_ids[0]},
+        },
+        "updateProject": lambda n: {
+            "query": UPDATE_PROJECT_MUTATION,
+            "variables": {"id": next(projects), "name": f"Benchmark Updated {n}"},
+        },
+        "addProjectGroup": lambda n: {
+            "query": ADD_PROJECT_GROUP_MUTATION,
+            "variables": {"projectId": next(projects), "name": f"Benchmark Group {n}-{time.time_ns()}"},
+        },
+        "addProjectMember": lambda n: {
+            "query": ADD_PROJECT_MEMBER_MUTATION,
+            "variables": {"projectId": next(projects), "email": f"new-{n}-{time.time_ns()}@benchmark.test"},
+        },
+    }
+
+
+async def run_scenario(
+    client: AsyncClient, name: str, payload: Callable[[int], dict], requests: int, concurrency: int
+) -> ScenarioResult:
+    latencies = []
+    errors = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(n: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(f"{settings.API_STR}/graphql", json=payload(n))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200 or response.json().get("errors"):
+                errors.append(response.text[:500])
+
+    start = time.perf_counter()
+    with track_statements() as stats:
+        await asyncio.gather(*[send(n) for n in range(requests)])
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return ScenarioResult(
+        name=name,
+        requests=requests,
+        errors=len(errors),
+        p50_ms=percentile(latencies_ms, 50),
+        p95_ms=percentile(latencies_ms, 95),
+        p99_ms=percentile(latencies_ms, 99),
+        throughput=requests / elapsed,
+        statements_per_request=stats.statements / requests,
+        error_samples=errors[:3],
+    )
+
+
+def print_report(results: list[ScenarioResult]):
+    header = (
+        f"{'scenario':<18}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'req/s':>10}{'stmt/req':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result.name:<18}{result.requests:>10}{result.errors:>8}{result.p50_ms:>10.1f}{result.p95_ms:>10.1f}"
+            f"{result.p99_ms:>10.1f}{result.throughput:>10.1f}{result.statements_per_request:>10.1f}"
+        )
+        for sample in result.error_samples:
+            print(f"    error: {sample}")
+
+
+async def main(args: argparse.Namespace):
+    settings.ROUTER_URL = args.router_url or f"http://127.0.0.1:{args.router_port}"
+    engine = create_postgres_engine()
+    if args.reset:
+        await reset_database(engine)
+    dataset = await generate_dataset(
+        engine,
+        projects=args.projects,
+        members=args.members,
+        groups=args.groups,
+        stages=args.stages,
+        users=args.users,
+        seed=args.seed,
+    )
+    await engine.dispose()
+
+    user = SimpleNamespace(
+        access_token="benchmark",
+        claims={"oid": user_id_for(0), "preferred_username": "user0@benchmark.test"},
+        roles=["lca_super_admin"] if args.super_admin else [],
+        tid="benchmark",
+        name="Benchmark User 0",
+    )
+    app.dependency_overrides[azure_scheme] = lambda: user
+
+    server = task = None
+    if not args.router_url:
+        server, task = await serve_router(args.router_latency, user_id_for(0), args.router_port)
+
+    scenarios = build_scenarios(dataset)
+    selected = args.scenarios or list(scenarios)
+    results = []
+    with patch_graph(args.graph_latency):
+        async with AsyncClient(app=app, base_url=settings.SERVER_HOST, timeout=None) as client:
+            for name in selected:
+                # warm up caches and connections before measuring
+                await run_scenario(client, name, scenarios[name], args.warmup, args.concurrency)
+                results.append(await run_scenario(client, name, scenarios[name], args.requests, args.concurrency))
+
+    if server:
+        server.should_exit = True
+        await task
+
+    print_report(results)
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps([asdict(result) for result in results], indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Load test the project GraphQL endpoint against a synthetic dataset")
+    add_dataset_arguments(parser)
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent requests in flight")
+    parser.add_argument("--scenarios", nargs="*", help="Scenarios to run. Defaults to all")
+    parser.add_argument("--graph-latency", type=float, default=0.1, help="Microsoft Graph latency in seconds")
+    parser.add_argument("--router-latency", type=float, default=0.02, help="Router latency in seconds")
+    parser.add_argument("--router-port", type=int, default=8765, help="Port of the router stand-in")
+    parser.add_argument("--router-url", default=None, help="Use a running router instead of the stand-in")
+    parser.add_argument("--super-admin", action="store_true", help="Run as a user with the super admin role")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,156 @@
+"""
+Local stand-ins for the external services the project backend talks to.
+
+* `FakeGraphClient` replaces `msgraph.core.GraphClient` inside `lcacollect_config.user` and `core.users`, so the
+  real caching and response parsing of the user lookups is exercised, but no request leaves the machine.
+* `patch_graph` also replaces the SendGrid requests of the email outbox with a no-op.
+* `create_router_app` returns an ASGI app that answers the federated GraphQL queries
+  normally served by the router and the documentation service.
+
+Both stand-ins accept a latency in seconds that is added to every call.
+"""
+import asyncio
+import json
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from requests import Response
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+UNKNOWN_EMAIL_PREFIX = "new-"
+
+
+def make_response(body: dict, status_code: int = 200) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode()
+    return response
+
+
+def fake_user(user_id: str) -> dict:
+    index = user_id.rsplit("-", 1)[-1].lstrip("0") or "0"
+    return {
+        "id": user_id,
+        "displayName": f"Benchmark User {index}",
+        "mail": f"user{index}@benchmark.test",
+        "userPrincipalName": f"user{index}@benchmark.test",
+        "companyName": "Benchmark",
+        "signInActivity": {"lastSignInDateTime": "2023-01-01T12:00:00Z"},
+    }
+
+
+class FakeGraphClient:
+    """Stand-in for the synchronous Microsoft Graph client used by `lcacollect_config.user` and `core.users`"""
+
+    latency: float = 0.0
+    calls: int = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    @classmethod
+    def _wait(cls):
+        cls.calls += 1
+        # The real client is built on `requests`, so the stand-in blocks the same way
+        time.sleep(cls.latency)
+
+    def get(self, url: str, headers: dict | None = None) -> Response:
+        self._wait()
+        body, status_code = self._user_by_email(url)
+        return make_response(body, status_code=status_code)
+
+    @staticmethod
+    def _user_by_email(url: str) -> tuple[dict, int]:
+        user_principal_name = url.rsplit("/", 1)[-1]
+        if user_principal_name.startswith(UNKNOWN_EMAIL_PREFIX):
+            return {"error": {"code": "Request_ResourceNotFound"}}, 404
+        return {"id": f"00000000-0000-4000-9000-{abs(hash(user_principal_name)) % 10**12:012d}"}, 200
+
+    def post(self, url: str, data: str = "", headers: dict | None = None) -> Response:
+        self._wait()
+        body = json.loads(data or "{}")
+        if url.endswith("/invitations"):
+            email = body.get("invitedUserEmailAddress", "")
+            return make_response({"invitedUser": {"id": f"00000000-0000-4000-a000-{abs(hash(email)) % 10**12:012d}"}})
+
+        responses = []
+        for request in body.get("requests", []):
+            # users are fetched by id with a $select, and looked up by email without
+            if "?" in request["url"]:
+                responses.append({"id": request["id"], "status": 200, "body": fake_user(request["id"])})
+            else:
+                user, status_code = self._user_by_email(request["url"])
+                responses.append({"id": request["id"], "status": status_code, "body": user})
+        return make_response({"responses": responses})
+
+
+def patch_graph(latency: float) -> ExitStack:
+    """Route all Microsoft Graph and SendGrid traffic to local stand-ins"""
+
+    def send_emails(*args, **kwargs):
+        return None
+
+    FakeGraphClient.latency = latency
+    stack = ExitStack()
+    stack.enter_context(patch("lcacollect_config.user.GraphClient", FakeGraphClient))
+    stack.enter_context(patch("core.users.GraphClient", FakeGraphClient))
+    # the emails of the outbox are sent by the dispatcher, when it runs in the benchmarked process
+    stack.enter_context(patch("core.outbox.send_emails", send_emails))
+    return stack
+
+
+def create_router_app(latency: float, author_id: str) -> Starlette:
+    """Create an app answering the queries that the project backend sends to the router"""
+
+    async def graphql(request: Request) -> JSONResponse:
+        await asyncio.sleep(latency)
+        payload = await request.json()
+        query: str = payload.get("query", "")
+        variables: dict = payload.get("variables") or {}
+        _id = variables.get("id", "")
+
+        if "tasks(" in query:
+            data = {
+                "tasks": [
+                    {
+                        "id": _id,
+                        "authorId": author_id,
+                        "assigneeId": author_id,
+                        "assignedGroupId": None,
+                        "reportingSchemaId": variables.get("reportingSchemaId", ""),
+                    }
+                ]
+            }
+        elif "comments(" in query:
+            data = {"comments": [{"id": _id, "authorId": author_id}]}
+        elif "projectSources(" in query:
+            data = {"projectSources": [{"id": _id, "authorId": author_id, "projectId": variables.get("projectId")}]}
+        elif "reportingSchemas(" in query:
+            data = {"reportingSchemas": []}
+        elif "projectAssemblies(" in query:
+            data = {"projectAssemblies": []}
+        elif "projectEpds(" in query:
+            data = {"projectEpds": []}
+        else:
+            data = {}
+        return JSONResponse({"data": data})
+
+    return Starlette(routes=[Route("/graphql", graphql, methods=["POST"])])
+
+
+async def serve_router(latency: float, author_id: str, port: int):
+    """Serve the router stand-in on localhost until the returned server is asked to exit"""
+
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(create_router_app(latency, author_id), host="127.0.0.1", port=port, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task
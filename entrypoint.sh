@@ -4,8 +4,8 @@ set -e
 # Wait for database to be online
 python /app/src/initialize.py
 
-# Run migrations
-alembic upgrade head
+# Run migrations, unless the database is at head already
+python /app/src/migrate.py
 
 cd /app/src
 
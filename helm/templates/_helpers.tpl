@@ -1,3 +1,155 @@
 {{- define "serverName" }}
 {{- if eq .Values.deployType "PROD"}} "LCA Project"{{- else}} "LCA Dev"{{- end}}
-{{- end}}
\ No newline at end of file
+{{- end}}
+
+{{/* Most backend replicas running at once */}}
+{{- define "backendMaxReplicas" }}
+{{- if .Values.backend.autoscaling.enabled }}{{ .Values.backend.autoscaling.maxReplicas }}{{- else }}{{ .Values.backend.replicas }}{{- end }}
+{{- end }}
+
+{{/* Environment of the containers running the backend code */}}
+{{- define "backendEnv" -}}
+- name: POSTGRES_USER
+  valueFrom:
+    secretKeyRef:
+      name: {{ .Values.db.secret }}
+      key: username
+
+- name: POSTGRES_PASSWORD
+  valueFrom:
+    secretKeyRef:
+      name: {{ .Values.db.secret }}
+      key: password
+
+- name: POSTGRES_DB
+  valueFrom:
+    configMapKeyRef:
+      name: {{ .Values.db.configmap }}
+      key: POSTGRES_DB
+
+- name: POSTGRES_HOST
+  valueFrom:
+    configMapKeyRef:
+      name: {{ .Values.db.configmap }}
+      key: POSTGRES_HOST
+
+- name: POSTGRES_PORT
+  valueFrom:
+    configMapKeyRef:
+      name: {{ .Values.db.configmap }}
+      key: POSTGRES_PORT
+
+- name: POSTGRES_SSL
+  valueFrom:
+    configMapKeyRef:
+      name: {{ .Values.db.configmap }}
+      key: POSTGRES_SSL
+
+- name: PROJECT_NAME
+  valueFrom:
+    configMapKeyRef:
+      key: SERVER_NAME
+      name: {{ .Values.backend.configmap }}
+
+- name: SERVER_NAME
+  valueFrom:
+    configMapKeyRef:
+      key: SERVER_NAME
+      name: {{ .Values.backend.configmap }}
+
+- name: SERVER_HOST
+  valueFrom:
+    configMapKeyRef:
+      key: SERVER_HOST
+      name: {{ .Values.backend.configmap }}
+
+- name: AAD_OPENAPI_CLIENT_ID
+  valueFrom:
+    configMapKeyRef:
+      name: {{ .Values.backend.configmap }}
+      key: AAD_OPENAPI_CLIENT_ID
+
+- name: AAD_APP_CLIENT_ID
+  valueFrom:
+    configMapKeyRef:
+      name: {{ .Values.backend.configmap }}
+      key: AAD_APP_CLIENT_ID
+
+- name: AAD_TENANT_ID
+  valueFrom:
+    configMapKeyRef:
+      name: {{ .Values.backend.configmap }}
+      key: AAD_TENANT_ID
+
+- name: RUN_STAGE
+  value: {{ .Values.deployType }}
+
+- name: AAD_GRAPH_SECRET
+  valueFrom:
+    secretKeyRef:
+      name: {{ .Values.backend.aadGraphSecret.name }}
+      key: secret
+
+- name: SENDGRID_SECRET
+  valueFrom:
+    secretKeyRef:
+      name: {{ .Values.backend.emailSecret.name }}
+      key: secret
+
+- name: EMAIL_NOTIFICATION_FROM
+  value: {{ .Values.backend.emailNotificationFrom }}
+
+- name: STORAGE_ACCOUNT_URL
+  valueFrom:
+    secretKeyRef:
+      name: {{ .Values.backend.storageAccountURL.name }}
+      key: secret
+
+- name: STORAGE_CONTAINER_NAME
+  valueFrom:
+    secretKeyRef:
+      name: {{ .Values.backend.storageContainer.name }}
+      key: secret
+
+- name: STORAGE_ACCESS_KEY
+  valueFrom:
+    secretKeyRef:
+      name: {{ .Values.backend.storageSecret.name }}
+      key: secret
+
+- name: STORAGE_BASE_PATH
+  value: {{ .Values.backend.storageBasePath }}
+
+- name: ROUTER_URL
+  value: {{ .Values.backend.routerUrl }}
+
+- name: INTERNAL_EMAIL_DOMAINS_LIST
+  value: '{{ .Values.backend.internalEmailDomains }}'
+
+- name: DEFAULT_AD_FQDN
+  value: {{ .Values.backend.defaultAdFQDN }}
+
+- name: CACHE_BACKEND
+  value: {{ .Values.cache.backend }}
+{{- if eq .Values.cache.backend "redis" }}
+- name: CACHE_REDIS_HOST
+  value: {{ .Values.cache.redisHost }}
+
+- name: CACHE_REDIS_PORT
+  value: '{{ .Values.cache.redisPort }}'
+{{- end }}
+
+{{- if eq .Values.deployType "DEV" }}
+- name: AZURE_POSTGRES_USER
+  value: {{ .Values.backend.azure.postgresUser }}
+
+- name: AZURE_POSTGRES_HOST
+  value: {{ .Values.backend.azure.postgresHost }}
+
+- name: AZURE_POSTGRES_PORT
+  value: '{{ .Values.backend.azure.postgresPort }}'
+
+- name: AZURE_POSTGRES_PASSWORD
+  value: {{ .Values.backend.azure.postgresPassword }}
+{{- end }}
+{{- end }}
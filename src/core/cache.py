@@ -0,0 +1,132 @@
+import asyncio
+import functools
+import math
+import random
+import time
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable
+
+import lcacollect_config.user
+import msgpack
+from aiocache import RedisCache, SimpleMemoryCache, caches
+from aiocache.serializers import BaseSerializer
+
+# msgpack extension types
+_DATE = 1
+_DATETIME = 2
+
+
+class CompactSerializer(BaseSerializer):
+    """
+    Serializes cached values with msgpack, extended with dates and datetimes.
+    Unlike pickle, the cached data does not depend on the classes of the service, so values can be shared between
+    replicas running different versions, and reading them cannot execute code.
+    """
+
+    DEFAULT_ENCODING = None
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_encode)
+
+    def loads(self, value: bytes | None) -> Any:
+        if value is None:
+            return None
+        return msgpack.unpackb(value, ext_hook=_decode)
+
+
+def _encode(value: Any) -> msgpack.ExtType:
+    # datetime is a subclass of date
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_DATE, value.isoformat().encode())
+    raise TypeError(f"Cannot cache a value of type {type(value).__name__}")
+
+
+def _decode(code: int, data: bytes) -> Any:
+    if code == _DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+class NamespacedRedisCache(RedisCache):
+    """
+    Redis cache keeping its own namespace in front of the namespaces passed to its calls, which aiocache replaces
+    otherwise. The users cached by lcacollect_config in its `azure_users` and `azure_emails` namespaces are then
+    stored under the `CACHE_NAMESPACE` prefix as well, rather than in keys shared by every service on the Redis server.
+    """
+
+    def _build_key(self, key, namespace=None):
+        # aiocache passes the namespace of the cache when the call has none
+        if namespace and namespace != self.namespace:
+            key = f"{namespace}:{key}"
+        return super()._build_key(key, namespace=self.namespace)
+
+
+def use_shared_user_cache():
+    """
+    Keep the Microsoft Graph users fetched by lcacollect_config in the `azure_users` cache instead of its own
+    in-memory cache, so they are shared between replicas when `CACHE_BACKEND` is shared
+    """
+
+    lcacollect_config.user.cache = caches.get("azure_users")
+
+
+async def delete_prefix(cache, prefix: str):
+    """Delete the entries of a cache with keys starting with `prefix`"""
+
+    if isinstance(cache, SimpleMemoryCache):
+        await cache.clear(namespace=cache.build_key(prefix))
+        return
+
+    keys = [key async for key in cache.client.scan_iter(match=f"{cache.build_key(prefix)}*")]
+    if keys:
+        await cache.client.delete(*keys)
+
+
+def single_flight_cached(ttl: int, key_builder: Callable[..., str], alias: str = "default", beta: float = 1.0):
+    """
+    Cache the results of a coroutine function like `aiocache.cached`, while avoiding cache stampedes:
+
+    * Concurrent misses on a key share one call of the function. The call runs as its own task,
+      so a caller being cancelled does not cancel the others.
+    * Entries are refreshed early with a probability that grows towards their expiry and with how long the function
+      takes (XFetch), so popular keys are recomputed by a single request before they expire for everyone.
+      `beta` above 1 favours earlier refreshes.
+    """
+
+    def decorator(function: Callable[..., Awaitable[Any]]):
+        in_flight: dict[str, asyncio.Task] = {}
+
+        async def compute(cache, key: str, *args, **kwargs):
+            start = time.perf_counter()
+            value = await function(*args, **kwargs)
+            entry = {"value": value, "delta": time.perf_counter() - start, "expiry": time.time() + ttl}
+            await cache.set(key, entry, ttl=ttl)
+            return value
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            cache = caches.get(alias)
+            key = key_builder(function, *args, **kwargs)
+
+            entry = await cache.get(key)
+            if entry is not None and not _refresh_early(entry, beta):
+                return entry["value"]
+
+            if not (task := in_flight.get(key)):
+                task = asyncio.create_task(compute(cache, key, *args, **kwargs))
+                in_flight[key] = task
+                task.add_done_callback(lambda _: in_flight.pop(key, None))
+            return await asyncio.shield(task)
+
+        return wrapper
+
+    return decorator
+
+
+def _refresh_early(entry: dict, beta: float) -> bool:
+    # log of a number in (0, 1], so the expiry is moved forward by a random multiple of the compute time
+    return time.time() - entry["delta"] * beta * math.log(1 - random.random()) >= entry["expiry"]
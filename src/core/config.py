@@ -1,3 +1,7 @@
+import os
+import tempfile
+from typing import Literal
+
 from aiocache import caches
 from lcacollect_config import config
 
@@ -8,18 +12,92 @@ class ProjectSettings(config.Settings):
     STORAGE_ACCESS_KEY: str
     STORAGE_BASE_PATH: str
 
+    POSTGRES_POOL_TIMEOUT: float = 30
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 100
+    POSTGRES_POOL_AUTO_SIZE: bool = False
+    POSTGRES_POOL_REPLICAS: int = 1
+    POSTGRES_RESERVED_CONNECTIONS: int = 10
+    POSTGRES_CONNECT_TIMEOUT: float = 5
+    DATABASE_PROBE_INTERVAL: float = 5
+    SQLALCHEMY_READ_REPLICA_URI: str | None = None
+    READ_YOUR_WRITES_SECONDS: int = 10
+
+    SQL_STATS_IN_RESPONSE: bool = os.getenv("RUN_STAGE") == "DEV"
+    SQL_STATEMENT_WARNING_THRESHOLD: int = 50
+
+    GRAPHQL_MAX_DEPTH: int = 10
+    GRAPHQL_MAX_COST: int = 5000
+    GRAPHQL_COST_LIST_SIZE: int = 10
+    GRAPHQL_COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # operation names of the clients labelling the GraphQL metrics, the others are labelled "other"
+    METRICS_OPERATION_NAMES: set[str] = set()
+
+    TRACING_EXPORTER: Literal["none", "file", "otlp"] = "none"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SERVICE_NAME: str = "lca-project"
+
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    CACHE_NAMESPACE: str = "project"
+    CACHE_REDIS_HOST: str = "localhost"
+    CACHE_REDIS_PORT: int = 6379
+    CACHE_REDIS_DB: int = 0
+    CACHE_REDIS_PASSWORD: str | None = None
+    CACHE_CONNECT_TIMEOUT: float = 1
+    USER_CACHE_SOFT_TTL: int = 60 * 5
+    USER_CACHE_HARD_TTL: int = 60 * 60 * 24
+    PROJECT_ACCESS_CACHE_TTL: int = 60 * 10
+    # the memory cache only sees the invalidations of its own replica
+    PROJECT_ACCESS_LOCAL_CACHE_TTL: int = 5
+    CHANGES_CURSOR_OVERLAP_SECONDS: int = 60
+    SUBSCRIPTION_QUEUE_SIZE: int = 100
+    GRAPH_CONCURRENCY: int = 4
+    EVENT_LOOP_MONITOR_INTERVAL: float = 0.5
+    EVENT_LOOP_LAG_THRESHOLD: float = 0.1
+
+    EMAIL_DISPATCHER_IN_PROCESS: bool = True
+    EMAIL_DISPATCH_INTERVAL: float = 5
+    EMAIL_BATCH_SIZE: int = 100
+    # seconds the emails claimed by a dispatcher are skipped by the others, longer than sending a batch takes
+    EMAIL_CLAIM_TIMEOUT: float = 60 * 5
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_DELAY: float = 30
+    EMAIL_RETRY_MAX_DELAY: float = 60 * 60
+
+    OPENID_CONFIG_FILE: str = os.path.join(tempfile.gettempdir(), "openid-configuration.json")
+    OPENID_CONFIG_MAX_RETRY_SECONDS: int = 60
+
 
 settings = ProjectSettings()
 
+
+def cache_config(name: str, memory_serializer: str = "aiocache.serializers.NullSerializer") -> dict:
+    """
+    aiocache configuration of a cache on `CACHE_BACKEND`.
+    The in-memory backend keeps values with `memory_serializer`, shared backends store them with msgpack.
+    """
+
+    plugins = [{"class": "core.metrics.CacheMetricsPlugin", "name": name}]
+    if settings.CACHE_BACKEND == "redis":
+        return {
+            "cache": "core.cache.NamespacedRedisCache",
+            "endpoint": settings.CACHE_REDIS_HOST,
+            "port": settings.CACHE_REDIS_PORT,
+            "db": settings.CACHE_REDIS_DB,
+            "password": settings.CACHE_REDIS_PASSWORD,
+            "create_connection_timeout": settings.CACHE_CONNECT_TIMEOUT,
+            "namespace": f"{settings.CACHE_NAMESPACE}:{name}",
+            "serializer": {"class": "core.cache.CompactSerializer"},
+            "plugins": plugins,
+        }
+    return {"cache": "aiocache.SimpleMemoryCache", "serializer": {"class": memory_serializer}, "plugins": plugins}
+
+
 caches.set_config(
     {
-        "default": {
-            "cache": "aiocache.SimpleMemoryCache",
-            "serializer": {"class": "aiocache.serializers.StringSerializer"},
-        },
-        "azure_users": {
-            "cache": "aiocache.SimpleMemoryCache",
-            "serializer": {"class": "aiocache.serializers.PickleSerializer"},
-        },
+        "default": cache_config("default"),
+        "azure_users": cache_config("azure_users", "aiocache.serializers.PickleSerializer"),
     }
 )
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+from typing import AsyncGenerator
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import settings
+from core.health import backoff_delay, readiness, set_ready
+from core.metrics import (
+    DB_POOL_CAPACITY,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_DURATION,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SATURATION,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUTS,
+)
+
+logger = logging.getLogger(__name__)
+
+DATABASE_CHECK = "database"
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool recording how long callers wait for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_DURATION.observe(time.perf_counter() - start)
+
+    def capacity(self) -> int:
+        return self.size() + max(self._max_overflow, 0)
+
+
+def create_postgres_engine(
+    url: str | None = None, pool_size: int | None = None, max_overflow: int | None = None
+) -> AsyncEngine:
+    return create_async_engine(
+        url or settings.SQLALCHEMY_DATABASE_URI,
+        future=True,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=settings.POSTGRES_POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+        pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+        connect_args={
+            "ssl": settings.POSTGRES_SSL,
+            # SQLAlchemy's cache of prepared statements and the statement cache of asyncpg.
+            # Both have to be disabled behind a connection pooler in transaction mode, such as PgBouncer.
+            "prepared_statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE,
+            "timeout": settings.POSTGRES_CONNECT_TIMEOUT,
+        },
+    )
+
+
+def pool_limits(max_connections: int) -> tuple[int, int]:
+    """
+    Pool size and overflow of one replica, such that all replicas together stay below the `max_connections`
+    of the database. `POSTGRES_POOL_SIZE` and `POSTGRES_MAX_OVERFLOW` are the upper limits.
+    """
+
+    budget = max((max_connections - settings.POSTGRES_RESERVED_CONNECTIONS) // settings.POSTGRES_POOL_REPLICAS, 1)
+    pool_size = min(settings.POSTGRES_POOL_SIZE, budget)
+    return pool_size, min(settings.POSTGRES_MAX_OVERFLOW, budget - pool_size)
+
+
+def create_session_factory(bind: AsyncEngine) -> sessionmaker:
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+
+# A single engine per process, so connections are pooled across requests
+engine = create_postgres_engine()
+local_session = create_session_factory(engine)
+
+# Optional read replica for queries, see `core.replica`
+replica_engine = (
+    create_postgres_engine(settings.SQLALCHEMY_READ_REPLICA_URI) if settings.SQLALCHEMY_READ_REPLICA_URI else None
+)
+replica_session = create_session_factory(replica_engine) if replica_engine else None
+
+DB_POOL_SIZE.set_function(lambda: engine.pool.size())
+DB_POOL_CAPACITY.set_function(lambda: engine.pool.capacity())
+DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
+DB_POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0))
+DB_POOL_SATURATION.set_function(lambda: engine.pool.checkedout() / engine.pool.capacity())
+
+
+async def setup_engine():
+    """
+    Size the pools from the `max_connections` of the databases when `POSTGRES_POOL_AUTO_SIZE` is enabled.
+    The primary and the read replica are sized independently.
+    """
+
+    global engine, replica_engine
+
+    if not settings.POSTGRES_POOL_AUTO_SIZE:
+        return
+
+    engine = await _auto_sized_engine(engine, settings.SQLALCHEMY_DATABASE_URI)
+    local_session.configure(bind=engine)
+    if replica_engine:
+        replica_engine = await _auto_sized_engine(replica_engine, settings.SQLALCHEMY_READ_REPLICA_URI)
+        replica_session.configure(bind=replica_engine)
+
+
+async def _auto_sized_engine(current: AsyncEngine, url: str) -> AsyncEngine:
+    async with current.connect() as conn:
+        max_connections = int((await conn.execute(text("SHOW max_connections"))).scalar_one())
+    pool_size, max_overflow = pool_limits(max_connections)
+    logger.info(
+        f"Sizing the database pool of {current.url.host} to {pool_size} connections with an overflow of "
+        f"{max_overflow} for {settings.POSTGRES_POOL_REPLICAS} replicas and max_connections={max_connections}"
+    )
+
+    await current.dispose()
+    return create_postgres_engine(url, pool_size, max_overflow)
+
+
+async def dispose_engine():
+    await engine.dispose()
+    if replica_engine:
+        await replica_engine.dispose()
+
+
+async def ping_database(bind: AsyncEngine | None = None):
+    async with (bind or engine).connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_database() -> bool:
+    """Update the `database` readiness check by connecting to the database"""
+
+    try:
+        await asyncio.wait_for(ping_database(), settings.POSTGRES_CONNECT_TIMEOUT)
+    except Exception as error:
+        if readiness()[1].get(DATABASE_CHECK):
+            logger.warning(f"The database is unreachable: {error!r}")
+        set_ready(DATABASE_CHECK, False)
+        return False
+
+    set_ready(DATABASE_CHECK)
+    return True
+
+
+async def monitor_database(ready: bool):
+    """
+    Keep the `database` readiness check up to date after the first check at startup.
+    While the database is unreachable, it is polled with a jittered exponential backoff, so a recovery is noticed
+    quickly.
+    """
+
+    attempt = 0
+    while True:
+        if ready:
+            attempt = 0
+            delay = settings.DATABASE_PROBE_INTERVAL
+        else:
+            delay = backoff_delay(attempt, maximum=settings.DATABASE_PROBE_INTERVAL)
+            attempt += 1
+
+        await asyncio.sleep(delay)
+        ready = await check_database()
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with local_session() as session:
+        yield session
+
+
+async def get_replica_db() -> AsyncGenerator[AsyncSession | None, None]:
+    """Session on the read replica, or None when no replica is configured"""
+
+    if replica_session is None:
+        yield None
+        return
+
+    async with replica_session() as session:
+        yield session
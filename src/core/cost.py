@@ -0,0 +1,201 @@
+from typing import Iterator
+
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    ListValueNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    ValidationContext,
+    ValidationRule,
+    VariableNode,
+    get_named_type,
+)
+from strawberry.extensions import SchemaExtension
+
+from core.config import settings
+
+DATABASE_COST = 1
+ROUTER_COST = 5
+GRAPH_COST = 10
+
+# Estimated cost of resolving a field once, keyed by "Type.field". Fields that are not listed cost nothing.
+# Fields returning project members look the users up in Microsoft Graph.
+FIELD_COSTS: dict[str, int] = {
+    "Query.account": GRAPH_COST,
+    "Query.projects": DATABASE_COST,
+    "Query.searchProjects": DATABASE_COST,
+    "Query.projectStatistics": DATABASE_COST,
+    "Query.projectChangesSince": 2 * DATABASE_COST,
+    "Query.projectMembers": DATABASE_COST + GRAPH_COST,
+    "Query.lifeCycleStages": DATABASE_COST,
+    "Query.projectStages": DATABASE_COST,
+    "Query.projectGroups": DATABASE_COST,
+    "Query._entities": ROUTER_COST,
+    "Mutation.addProject": DATABASE_COST,
+    "Mutation.updateProject": DATABASE_COST,
+    "Mutation.deleteProject": DATABASE_COST + ROUTER_COST,
+    "Mutation.addProjectMember": DATABASE_COST + 3 * GRAPH_COST,
+    "Mutation.addProjectMembers": DATABASE_COST,
+    "Mutation.deleteProjectMember": DATABASE_COST,
+    "Mutation.addProjectStage": DATABASE_COST,
+    "Mutation.deleteProjectStage": DATABASE_COST,
+    "Mutation.setProjectStages": DATABASE_COST,
+    "Mutation.addProjectGroup": DATABASE_COST,
+    "Mutation.updateProjectGroup": DATABASE_COST,
+    "Mutation.deleteProjectGroup": DATABASE_COST,
+    "Mutation.addProjectMembersToGroup": DATABASE_COST,
+    "Mutation.removeProjectMembersFromGroup": DATABASE_COST,
+    "GraphQLProject.members": DATABASE_COST + GRAPH_COST,
+    "GraphQLProject.groups": DATABASE_COST,
+    "GraphQLProject.stages": DATABASE_COST,
+    "GraphQLProjectGroup.members": DATABASE_COST + GRAPH_COST,
+    "GraphQLProjectGroup.lead": DATABASE_COST + GRAPH_COST,
+    "GraphQLProjectMember.leaderOf": DATABASE_COST,
+    "GraphQLProjectMember.projectGroups": DATABASE_COST,
+    "GraphQLTask.author": DATABASE_COST + GRAPH_COST,
+    "GraphQLTask.assignee": DATABASE_COST + GRAPH_COST,
+    "GraphQLComment.author": DATABASE_COST + GRAPH_COST,
+    "GraphQLProjectSource.author": DATABASE_COST + GRAPH_COST,
+    "Subscription.projectEvents": DATABASE_COST,
+}
+
+# Estimated cost of each item of a list argument of a field, keyed by "Type.field" and added to its cost in FIELD_COSTS.
+# Each member added is looked up, and possibly invited, in Microsoft Graph.
+ARGUMENT_COSTS: dict[str, tuple[str, int]] = {
+    "Mutation.addProjectMembers": ("members", 3 * GRAPH_COST),
+}
+
+
+class QueryCostExtension(SchemaExtension):
+    """
+    Estimates the cost of GraphQL operations before they are executed and rejects operations costing more than
+    `GRAPHQL_MAX_COST`. Each field costs its weight in `FIELD_COSTS` times the number of times it is expected to be
+    resolved, where every list is assumed to hold `GRAPHQL_COST_LIST_SIZE` items. Fields in `ARGUMENT_COSTS` also cost
+    their weight for each item of their list argument.
+    The estimated cost is added to the response extensions.
+    """
+
+    def on_operation(self):
+        self.costs: dict[str | None, int] = {}
+        self.execution_context.validation_rules = (*self.execution_context.validation_rules, self._cost_rule())
+        yield
+
+    def get_results(self) -> dict:
+        if not self.costs:
+            return {}
+        operation_name = self.execution_context.operation_name
+        cost = self.costs[operation_name] if operation_name in self.costs else max(self.costs.values())
+        return {"cost": {"estimated": cost, "maximum": settings.GRAPHQL_MAX_COST}}
+
+    def _cost_rule(self) -> type[ValidationRule]:
+        costs = self.costs
+        variables = self.execution_context.variables or {}
+
+        class QueryCostRule(ValidationRule):
+            def enter_operation_definition(self, node: OperationDefinitionNode, *args):
+                root_type = self.context.schema.get_root_type(node.operation)
+                if root_type is None:
+                    return
+
+                name = node.name.value if node.name else None
+                cost = selection_set_cost(self.context, node.selection_set, root_type, 1, set(), variables)
+                costs[name] = cost
+                if cost > settings.GRAPHQL_MAX_COST:
+                    self.report_error(
+                        GraphQLError(
+                            f"'{name or 'anonymous'}' has an estimated cost of {cost}, "
+                            f"which exceeds the maximum cost of {settings.GRAPHQL_MAX_COST}",
+                            node,
+                        )
+                    )
+
+        return QueryCostRule
+
+
+def selection_set_cost(
+    context: ValidationContext,
+    selection_set: SelectionSetNode,
+    parent_type,
+    multiplier: int,
+    fragments: set[str],
+    variables: dict,
+) -> int:
+    cost = 0
+    for field, field_type, field_fragments in _fields(context, selection_set, parent_type, fragments):
+        name = field.name.value
+        cost += multiplier * FIELD_COSTS.get(f"{field_type.name}.{name}", 0)
+        if argument_cost := ARGUMENT_COSTS.get(f"{field_type.name}.{name}"):
+            argument, weight = argument_cost
+            cost += multiplier * weight * _argument_size(field, argument, variables)
+        if not field.selection_set or name.startswith("__"):
+            continue
+
+        field_definition = field_type.fields[name]
+        child_multiplier = multiplier * (settings.GRAPHQL_COST_LIST_SIZE if _is_list(field_definition.type) else 1)
+        cost += selection_set_cost(
+            context,
+            field.selection_set,
+            get_named_type(field_definition.type),
+            child_multiplier,
+            field_fragments,
+            variables,
+        )
+    return cost
+
+
+def _fields(
+    context: ValidationContext, selection_set: SelectionSetNode, parent_type, fragments: set[str]
+) -> Iterator[tuple[FieldNode, GraphQLObjectType, set[str]]]:
+    """
+    Fields of a selection set with fragments expanded.
+    Each field is returned with the type it is selected on and the names of the fragments it is nested in.
+    """
+
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            if hasattr(parent_type, "fields") and selection.name.value in parent_type.fields:
+                yield selection, parent_type, fragments
+        elif isinstance(selection, InlineFragmentNode):
+            fragment_type = (
+                context.schema.get_type(selection.type_condition.name.value)
+                if selection.type_condition
+                else parent_type
+            )
+            yield from _fields(context, selection.selection_set, fragment_type, fragments)
+        elif isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            fragment = context.get_fragment(name)
+            # cycles are reported by the NoFragmentCycles rule
+            if fragment is None or name in fragments:
+                continue
+            fragment_type = context.schema.get_type(fragment.type_condition.name.value)
+            yield from _fields(context, fragment.selection_set, fragment_type, fragments | {name})
+
+
+def _argument_size(field: FieldNode, name: str, variables: dict) -> int:
+    """Number of items of a list argument of a field, given inline or as a variable"""
+
+    for argument in field.arguments:
+        if argument.name.value != name:
+            continue
+        value = argument.value
+        if isinstance(value, VariableNode):
+            value = variables.get(value.name.value)
+            if value is None:
+                return 0
+            return len(value) if isinstance(value, list) else 1
+        # a single value is coerced to a list of one item
+        return len(value.values) if isinstance(value, ListValueNode) else 1
+    return 0
+
+
+def _is_list(type_) -> bool:
+    if isinstance(type_, GraphQLNonNull):
+        type_ = type_.of_type
+    return isinstance(type_, GraphQLList)
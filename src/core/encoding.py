@@ -0,0 +1,43 @@
+import gzip
+
+import brotli
+import orjson
+
+# Ordered by preference. Brotli compresses the repetitive GraphQL responses better than gzip at a similar speed
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+
+def encode_json(data) -> bytes:
+    return orjson.dumps(data)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick the preferred supported content encoding accepted by the client, following the q-values of the header"""
+
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        encoding, _, params = item.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[encoding.strip().lower()] = weight
+
+    accepted = {encoding: weights.get(encoding, weights.get("*", 0.0)) for encoding in SUPPORTED_ENCODINGS}
+    encoding = max(accepted, key=accepted.get)
+    return encoding if accepted[encoding] > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=4)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=5)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
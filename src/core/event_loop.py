@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from core.config import settings
+from core.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+
+class Watchdog:
+    """
+    Thread logging the stack of the event loop while it is blocked for more than `EVENT_LOOP_LAG_THRESHOLD` seconds,
+    which points at the blocking call. Blocking calls cannot be caught from the event loop, as they stop it.
+    """
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.loop_thread = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.watch, name="event-loop-watchdog", daemon=True)
+
+    def watch(self):
+        reported = None
+        while not self.stopped.wait(self.threshold / 2):
+            heartbeat = self.heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked > self.threshold and heartbeat != reported:
+                reported = heartbeat
+                frame = sys._current_frames().get(self.loop_thread)
+                stack = "".join(traceback.format_stack(frame)) if frame else "unknown"
+                logger.warning(f"The event loop has been blocked for {blocked:.3f}s in:\n{stack}")
+
+
+async def monitor_event_loop():
+    """
+    Record how late the event loop wakes up from a sleep, which is the time it spent running blocking code,
+    and count the times it exceeds `EVENT_LOOP_LAG_THRESHOLD`.
+    """
+
+    interval = settings.EVENT_LOOP_MONITOR_INTERVAL
+    watchdog = Watchdog(interval, settings.EVENT_LOOP_LAG_THRESHOLD)
+    watchdog.thread.start()
+    try:
+        while True:
+            start = time.monotonic()
+            watchdog.heartbeat = start
+            await asyncio.sleep(interval)
+            lag = max(time.monotonic() - start - interval, 0)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag > settings.EVENT_LOOP_LAG_THRESHOLD:
+                EVENT_LOOP_BLOCKED.inc()
+    finally:
+        watchdog.stopped.set()
@@ -3,19 +3,21 @@ from typing import TYPE_CHECKING, Annotated, Optional, Union
 
 import httpx
 import strawberry
-from aiocache import cached
 from lcacollect_config.context import get_session, get_token
 from lcacollect_config.exceptions import (
     MicroServiceConnectionError,
     MicroServiceResponseError,
 )
+from opentelemetry import propagate
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from strawberry.types import Info
 
 import models.group as models_group
 import models.member as models_member
+from core.cache import single_flight_cached
 from core.config import settings
+from core.metrics import graphql_operation_name, observe_outbound
 from exceptions import MSGraphException
 
 logger = logging.getLogger(__name__)
@@ -65,11 +67,12 @@ async def get_author(info: Info, root: "GraphQLTask") -> "GraphQLProjectMember":
 
 async def get_member(info: Info, member_id: str):
     """Queries a single Project Member from Azure"""
-    from lcacollect_config.user import get_users_from_azure
+    from core.users import get_users_from_azure
 
     session = get_session(info)
     try:
-        users = await get_users_from_azure(member_id)
+        with observe_outbound("graph", "get_users"):
+            users = await get_users_from_azure(member_id)
         user = users[0]
     except (IndexError, MSGraphException):
         return None, None
@@ -160,46 +163,18 @@ async def get_group(info: Info, root: "GraphQLTask"):
         members=group.members,
         name=group.name,
         project_id=group.project_id,
+        created_at=group.created_at,
+        updated_at=group.updated_at,
     )
 
 
-@cached(ttl=60, key_builder=cache_key_builder)
 async def get_task(reporting_schema_id: str, id: str, token: str) -> "GraphQLTask":
     """
     Queries a task from the Documentation Module and
     returns a GraphQLTask class instance
     """
 
-    query = """
-          query ($reportingSchemaId: String!, $id: String!){
-              tasks(reportingSchemaId: $reportingSchemaId, filters: {id: {equal: $id}}) {
-                id
-                authorId
-                assigneeId
-                assignedGroupId
-                reportingSchemaId
-            }
-        }
-    """
-
-    data = {}
-
-    async with httpx.AsyncClient(
-        headers={"authorization": f"Bearer {token}"},
-    ) as client:
-        response = await client.post(
-            f"{settings.ROUTER_URL}/graphql",
-            json={
-                "query": query,
-                "variables": {"id": id, "reportingSchemaId": reporting_schema_id},
-            },
-        )
-        if response.is_error:
-            raise MicroServiceConnectionError(f"Could not receive data from {settings.ROUTER_URL}. Got {response.text}")
-        data = response.json()
-        if errors := data.get("errors"):
-            raise MicroServiceResponseError(f"Got error from {settings.ROUTER_URL}: {errors}")
-    task = data["data"]["tasks"][0]
+    task = await query_task(reporting_schema_id, id, token)
     return GraphQLTask(
         id=task.get("id"),
         author_id=task.get("authorId"),
@@ -209,53 +184,72 @@ async def get_task(reporting_schema_id: str, id: str, token: str) -> "GraphQLTas
     )
 
 
-@cached(ttl=60, key_builder=cache_key_builder)
 async def get_comment(task_id: str, id: str, token: str) -> "GraphQLComment":
     """
     Queries a comment from the Documentation Module and
     returns a GraphQLComment class instance
     """
 
-    query = """
-        query ($taskId: String!, $id: String!){
-            comments(taskId: $taskId, filters: {id: {equal: $id}}) {
-                id
-                authorId
-            }
-        }
-    """
-
-    data = {}
-
-    async with httpx.AsyncClient(
-        headers={"authorization": f"Bearer {token}"},
-    ) as client:
-        response = await client.post(
-            f"{settings.ROUTER_URL}/graphql",
-            json={
-                "query": query,
-                "variables": {"id": id, "taskId": task_id},
-            },
-        )
-        if response.is_error:
-            raise MicroServiceConnectionError(f"Could not receive data from {settings.ROUTER_URL}. Got {response.text}")
-        data = response.json()
-        if errors := data.get("errors"):
-            raise MicroServiceResponseError(f"Got error from {settings.ROUTER_URL}: {errors}")
-    comment = data["data"]["comments"][0]
+    comment = await query_comment(task_id, id, token)
     return GraphQLComment(
         id=comment.get("id"),
         author_id=comment.get("authorId"),
     )
 
 
-@cached(ttl=60, key_builder=cache_key_builder)
 async def get_source(project_id: str, id: str, token: str) -> "GraphQLProjectSource":
     """
     Queries a source from the Documentation Module and
     returns a GraphQLProjectSource class instance
     """
 
+    source = await query_source(project_id, id, token)
+    return GraphQLProjectSource(
+        id=source.get("id"),
+        project_id=source.get("projectId"),
+        author_id=source.get("authorId"),
+    )
+
+
+# The responses of the Documentation Module are cached as plain data, so any cache backend can store them.
+# Concurrent requests for the same entity share one call to the router.
+
+
+@single_flight_cached(ttl=60, key_builder=cache_key_builder)
+async def query_task(reporting_schema_id: str, id: str, token: str) -> dict:
+    query = """
+          query ($reportingSchemaId: String!, $id: String!){
+              tasks(reportingSchemaId: $reportingSchemaId, filters: {id: {equal: $id}}) {
+                id
+                authorId
+                assigneeId
+                assignedGroupId
+                reportingSchemaId
+            }
+        }
+    """
+
+    data = await microservice_query(token, query, {"id": id, "reportingSchemaId": reporting_schema_id})
+    return data["tasks"][0]
+
+
+@single_flight_cached(ttl=60, key_builder=cache_key_builder)
+async def query_comment(task_id: str, id: str, token: str) -> dict:
+    query = """
+        query ($taskId: String!, $id: String!){
+            comments(taskId: $taskId, filters: {id: {equal: $id}}) {
+                id
+                authorId
+            }
+        }
+    """
+
+    data = await microservice_query(token, query, {"id": id, "taskId": task_id})
+    return data["comments"][0]
+
+
+@single_flight_cached(ttl=60, key_builder=cache_key_builder)
+async def query_source(project_id: str, id: str, token: str) -> dict:
     query = """
         query($projectId: String!, $id: String) {
             projectSources(projectId: $projectId, filters: {id: {equal: $id}}) {
@@ -266,29 +260,8 @@ async def get_source(project_id: str, id: str, token: str) -> "GraphQLProjectSou
         }
     """
 
-    data = {}
-
-    async with httpx.AsyncClient(
-        headers={"authorization": f"Bearer {token}"},
-    ) as client:
-        response = await client.post(
-            f"{settings.ROUTER_URL}/graphql",
-            json={
-                "query": query,
-                "variables": {"id": id, "projectId": project_id},
-            },
-        )
-        if response.is_error:
-            raise MicroServiceConnectionError(f"Could not receive data from {settings.ROUTER_URL}. Got {response.text}")
-        data = response.json()
-        if errors := data.get("errors"):
-            raise MicroServiceResponseError(f"Got error from {settings.ROUTER_URL}: {errors}")
-    source = data["data"]["projectSources"][0]
-    return GraphQLProjectSource(
-        id=source.get("id"),
-        project_id=source.get("projectId"),
-        author_id=source.get("authorId"),
-    )
+    data = await microservice_query(token, query, {"id": id, "projectId": project_id})
+    return data["projectSources"][0]
 
 
 @strawberry.federation.type(keys=["id"])
@@ -335,25 +308,29 @@ class GraphQLComment:
 
 
 async def microservice_query(token: str, query: str, variables: dict | None = None) -> dict | None:
-    async with httpx.AsyncClient(
-        headers={"authorization": f"Bearer {token}"},
-    ) as client:
-        try:
-            response = await client.post(
-                f"{settings.ROUTER_URL}/graphql",
-                json={
-                    "query": query,
-                    "variables": variables,
-                },
-            )
-        except httpx.HTTPError as e:
-            raise MicroServiceConnectionError(f"Could not receive data from {settings.ROUTER_URL}. Got {e}")
-        if response.is_error:
-            raise MicroServiceConnectionError(f"Could not receive data from {settings.ROUTER_URL}. Got {response.text}")
-        data = response.json()
-        if errors := data.get("errors"):
-            raise MicroServiceResponseError(f"Got error from {settings.ROUTER_URL}: {errors}")
-        return data.get("data")
+    with observe_outbound("router", graphql_operation_name(query)):
+        headers = {"authorization": f"Bearer {token}"}
+        # continue the trace in the router and the services behind it
+        propagate.inject(headers)
+        async with httpx.AsyncClient(headers=headers) as client:
+            try:
+                response = await client.post(
+                    f"{settings.ROUTER_URL}/graphql",
+                    json={
+                        "query": query,
+                        "variables": variables,
+                    },
+                )
+            except httpx.HTTPError as e:
+                raise MicroServiceConnectionError(f"Could not receive data from {settings.ROUTER_URL}. Got {e}")
+            if response.is_error:
+                raise MicroServiceConnectionError(
+                    f"Could not receive data from {settings.ROUTER_URL}. Got {response.text}"
+                )
+            data = response.json()
+            if errors := data.get("errors"):
+                raise MicroServiceResponseError(f"Got error from {settings.ROUTER_URL}: {errors}")
+            return data.get("data")
 
 
 async def delete_project_source(id: str, token: str):
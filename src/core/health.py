@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import random
+from typing import Coroutine
+
+logger = logging.getLogger(__name__)
+
+# Readiness of the services the process depends on, keyed by name
+_checks: dict[str, bool] = {}
+_background_tasks: set[asyncio.Task] = set()
+
+
+def register_check(name: str, ready: bool = False):
+    _checks[name] = ready
+
+
+def set_ready(name: str, ready: bool = True):
+    if _checks.get(name) != ready:
+        logger.info(f"{name} is {'ready' if ready else 'not ready'}")
+    _checks[name] = ready
+
+
+def readiness() -> tuple[bool, dict[str, bool]]:
+    """Whether all registered checks are ready, and the state of each check"""
+
+    return all(_checks.values()), dict(_checks)
+
+
+def backoff_delay(attempt: int, base: float = 0.1, maximum: float = 5) -> float:
+    """Exponential backoff with full jitter, so processes retrying together spread out"""
+
+    return random.uniform(0, min(maximum, base * 2**attempt))
+
+
+def run_in_background(coroutine: Coroutine) -> asyncio.Task:
+    """Run a task without delaying the start of the server. The task is cancelled on shutdown."""
+
+    task = asyncio.create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def cancel_background_tasks():
+    for task in list(_background_tasks):
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable
+
+from aiocache import caches
+
+from core.config import settings
+from core.health import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Identifies the events published by this process, so they are not handled twice
+_origin = uuid.uuid4().hex
+_subscribers: list[tuple[str, Callable[["Event"], Awaitable[None]]]] = []
+
+
+@dataclass(frozen=True)
+class Event:
+    """A change of the data of a Project, published after it is committed"""
+
+    project_id: str
+
+    @property
+    def key(self) -> str:
+        return f"project:{self.project_id}"
+
+
+@dataclass(frozen=True)
+class ProjectUpdated(Event):
+    pass
+
+
+@dataclass(frozen=True)
+class ProjectDeleted(Event):
+    pass
+
+
+@dataclass(frozen=True)
+class MemberAdded(Event):
+    user_id: str
+
+    @property
+    def key(self) -> str:
+        return f"project:{self.project_id}:member:{self.user_id}"
+
+
+@dataclass(frozen=True)
+class MemberRemoved(MemberAdded):
+    pass
+
+
+@dataclass(frozen=True)
+class GroupChanged(Event):
+    group_id: str
+
+    @property
+    def key(self) -> str:
+        return f"project:{self.project_id}:group:{self.group_id}"
+
+
+@dataclass(frozen=True)
+class StageAdded(Event):
+    stage_id: str
+
+    @property
+    def key(self) -> str:
+        return f"project:{self.project_id}:stage:{self.stage_id}"
+
+
+@dataclass(frozen=True)
+class StageRemoved(StageAdded):
+    pass
+
+
+EVENTS = {
+    event.__name__: event
+    for event in (
+        ProjectUpdated,
+        ProjectDeleted,
+        MemberAdded,
+        MemberRemoved,
+        GroupChanged,
+        StageAdded,
+        StageRemoved,
+    )
+}
+
+
+def subscribe(prefix: str, handler: Callable[[Event], Awaitable[None]]):
+    """Call `handler` with the events whose key starts with `prefix`, e.g. `project:` for all events"""
+
+    _subscribers.append((prefix, handler))
+
+
+async def publish(*events: Event):
+    """
+    Call the handlers subscribed to the events, e.g. invalidating caches or notifying GraphQL subscriptions.
+    When `CACHE_BACKEND` is shared, the events are also sent to the other replicas through it.
+    """
+
+    for event in events:
+        await _dispatch(event)
+
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            client = caches.get("default").client
+            for event in events:
+                await client.publish(_channel(), _dumps(event))
+        except Exception as error:
+            logger.warning(f"Could not send {len(events)} invalidation events to the other replicas: {error!r}")
+
+
+async def listen():
+    """Handle the events published by the other replicas, reconnecting until the process stops"""
+
+    attempt = 0
+    while True:
+        try:
+            pubsub = caches.get("default").client.pubsub()
+            await pubsub.subscribe(_channel())
+            attempt = 0
+            async for message in pubsub.listen():
+                if message["type"] == "message" and (event := _loads(message["data"])):
+                    await _dispatch(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning(f"Lost the invalidation events of the other replicas: {error!r}")
+        await asyncio.sleep(backoff_delay(attempt))
+        attempt += 1
+
+
+async def _dispatch(event: Event):
+    for prefix, handler in _subscribers:
+        if event.key.startswith(prefix):
+            try:
+                await handler(event)
+            except Exception:
+                logger.exception(f"Handling {event} failed")
+
+
+def _channel() -> str:
+    return f"{settings.CACHE_NAMESPACE}:invalidation"
+
+
+def _dumps(event: Event) -> str:
+    return json.dumps({"origin": _origin, "type": type(event).__name__, "data": asdict(event)})
+
+
+def _loads(message: str | bytes) -> Event | None:
+    payload = json.loads(message)
+    if payload["origin"] == _origin:
+        return None
+    return EVENTS[payload["type"]](**payload["data"])
@@ -0,0 +1,158 @@
+import re
+import time
+from contextlib import contextmanager
+from inspect import isawaitable
+from typing import Any, Awaitable, Callable, Iterator
+
+from aiocache.plugins import BasePlugin
+from opentelemetry.trace import SpanKind
+from prometheus_client import Counter, Gauge, Histogram
+from strawberry.extensions import SchemaExtension
+from strawberry.types import Info
+
+from core.config import settings
+from core.tracing import tracer
+
+OPERATION_DURATION = Histogram(
+    "graphql_operation_duration_seconds",
+    "Duration of GraphQL operations",
+    ["operation_type", "operation_name"],
+)
+RESOLVER_DURATION = Histogram(
+    "graphql_resolver_duration_seconds",
+    "Duration of asynchronous GraphQL resolvers",
+    ["field"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+OPERATION_ERRORS = Counter(
+    "graphql_operation_errors_total",
+    "Number of errors returned by GraphQL operations",
+    ["operation_type", "operation_name"],
+)
+SQL_STATEMENTS = Histogram(
+    "graphql_operation_sql_statements",
+    "Number of SQL statements executed per GraphQL operation",
+    ["operation_type", "operation_name"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+SQL_DURATION = Histogram(
+    "graphql_operation_sql_duration_seconds",
+    "Time spent executing SQL statements per GraphQL operation",
+    ["operation_type", "operation_name"],
+)
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time spent waiting for a connection from the database pool, including connecting",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured size of the database pool")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out_connections", "Database connections currently in use")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow_connections", "Database connections opened beyond the pool size")
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity_connections", "Maximum number of connections of the pool, including overflow"
+)
+DB_POOL_SATURATION = Gauge("db_pool_saturation_ratio", "Share of the pool capacity in use")
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Number of requests that timed out waiting for a connection")
+OUTBOUND_DURATION = Histogram(
+    "outbound_request_duration_seconds",
+    "Duration of calls to other services",
+    ["service", "operation"],
+)
+OUTBOUND_ERRORS = Counter(
+    "outbound_request_errors_total",
+    "Number of failed calls to other services",
+    ["service", "operation"],
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop runs a scheduled callback, i.e. the time it spent on blocking code",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked_total", "Number of times the event loop was blocked for longer than the lag threshold"
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Number of cache lookups by result",
+    ["cache", "result"],
+)
+
+
+def operation_labels(execution_context) -> tuple[str, str]:
+    """
+    Labels identifying a GraphQL operation.
+    Operation names are chosen by the clients, so names outside `METRICS_OPERATION_NAMES` are labelled "other" to keep
+    the number of time series bounded.
+    """
+
+    operation_type = execution_context.operation_type.value if execution_context.operation_type else "unknown"
+    if not (operation_name := execution_context.operation_name):
+        return operation_type, "anonymous"
+    return operation_type, operation_name if operation_name in settings.METRICS_OPERATION_NAMES else "other"
+
+
+class MetricsExtension(SchemaExtension):
+    """Records the duration and errors of GraphQL operations and the duration of asynchronous resolvers"""
+
+    def on_operation(self):
+        start = time.perf_counter()
+        yield
+        labels = operation_labels(self.execution_context)
+        OPERATION_DURATION.labels(*labels).observe(time.perf_counter() - start)
+        if self.execution_context.errors:
+            OPERATION_ERRORS.labels(*labels).inc(len(self.execution_context.errors))
+
+    def resolve(self, _next: Callable, root: Any, info: Info, *args, **kwargs) -> Any:
+        result = _next(root, info, *args, **kwargs)
+        # Attribute lookups are synchronous and not worth timing
+        if not isawaitable(result):
+            return result
+        return self._observe_resolver(result, f"{info.parent_type.name}.{info.field_name}")
+
+    @staticmethod
+    async def _observe_resolver(result: Awaitable, field: str) -> Any:
+        start = time.perf_counter()
+        try:
+            return await result
+        finally:
+            RESOLVER_DURATION.labels(field).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def observe_outbound(service: str, operation: str) -> Iterator[None]:
+    """
+    Record the duration of a call to another service and count it as failed if it raises.
+    The call is traced as a client span, which is the current span within the block.
+    """
+
+    start = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(f"{service} {operation}", kind=SpanKind.CLIENT):
+            yield
+    except Exception:
+        OUTBOUND_ERRORS.labels(service, operation).inc()
+        raise
+    finally:
+        OUTBOUND_DURATION.labels(service, operation).observe(time.perf_counter() - start)
+
+
+def graphql_operation_name(query: str) -> str:
+    """Name of the first root field of a GraphQL document, used to label calls to the router"""
+
+    match = re.search(r"{\s*(\w+)", query)
+    return match.group(1) if match else "unknown"
+
+
+class CacheMetricsPlugin(BasePlugin):
+    """aiocache plugin counting hits and misses of a cache"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def post_get(self, client, key, took=0, ret=None, **kwargs):
+        CACHE_REQUESTS.labels(self.name, "miss" if ret is None else "hit").inc()
+
+    async def post_multi_get(self, client, keys, took=0, ret=None, **kwargs):
+        hits = len([value for value in ret or [] if value is not None])
+        CACHE_REQUESTS.labels(self.name, "hit").inc(hits)
+        CACHE_REQUESTS.labels(self.name, "miss").inc(len(keys) - hits)
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+from fastapi_azure_auth.openid_config import OpenIdConfig
+from jose import jwk
+
+from core.config import settings
+from core.health import set_ready
+
+logger = logging.getLogger(__name__)
+
+OPENID_CHECK = "openid_config"
+
+
+def save_openid_config(openid_config: OpenIdConfig, path: Path):
+    """Persist the endpoints and signing keys of a loaded configuration, so the next start does not wait for Azure"""
+
+    data = {
+        "loaded_at": openid_config._config_timestamp.isoformat(),
+        "authorization_endpoint": openid_config.authorization_endpoint,
+        "token_endpoint": openid_config.token_endpoint,
+        "issuer": openid_config.issuer,
+        "signing_keys": {kid: key.to_dict() for kid, key in openid_config.signing_keys.items()},
+    }
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def restore_openid_config(openid_config: OpenIdConfig, path: Path) -> bool:
+    """
+    Load a configuration persisted by `save_openid_config`.
+    The configuration keeps the time it was loaded at, so the library refreshes it once it is older than a day.
+    """
+
+    try:
+        data = json.loads(path.read_text())
+        openid_config.authorization_endpoint = data["authorization_endpoint"]
+        openid_config.token_endpoint = data["token_endpoint"]
+        openid_config.issuer = data["issuer"]
+        openid_config.signing_keys = {kid: jwk.construct(key, "RS256") for kid, key in data["signing_keys"].items()}
+        openid_config._config_timestamp = datetime.fromisoformat(data["loaded_at"])
+    except FileNotFoundError:
+        return False
+    except Exception as error:
+        logger.warning(f"Could not restore the OpenID configuration from {path}: {error}")
+        return False
+
+    logger.info(f"Restored the OpenID configuration from {path}, loaded at {data['loaded_at']}")
+    return True
+
+
+async def load_openid_config(openid_config: OpenIdConfig, path: Path | None = None):
+    """
+    Make the signing keys available as soon as possible. A persisted copy is used until Azure has answered,
+    and loading from Azure is retried with an exponential backoff without ever failing the startup.
+    """
+
+    path = path or Path(settings.OPENID_CONFIG_FILE)
+    if restore_openid_config(openid_config, path):
+        set_ready(OPENID_CHECK)
+
+    delay = 1
+    while True:
+        try:
+            await openid_config.load_config()
+            break
+        except Exception as error:
+            logger.warning(f"Loading the OpenID configuration failed, retrying in {delay} seconds: {error}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.OPENID_CONFIG_MAX_RETRY_SECONDS)
+
+    set_ready(OPENID_CHECK)
+    if getattr(openid_config, "signing_keys", None):
+        try:
+            save_openid_config(openid_config, path)
+        except OSError as error:
+            logger.warning(f"Could not persist the OpenID configuration to {path}: {error}")
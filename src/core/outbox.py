@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from lcacollect_config.email import EmailType
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail, Personalization, To
+from sqlalchemy import func
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import settings
+from core.connection import local_session
+from core.health import backoff_delay
+from core.metrics import observe_outbound
+from models.outbox import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(session: AsyncSession, recipient: str, email_type: EmailType, **parameters):
+    """Add an email to the outbox. It is sent by the dispatcher if the session commits."""
+
+    session.add(OutboxEmail(recipient=recipient, email_type=email_type.name, parameters=parameters))
+
+
+async def dispatch_emails():
+    """Send the emails of the outbox until the process stops"""
+
+    attempt = 0
+    while True:
+        try:
+            handled = await dispatch_batch()
+            attempt = 0
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning(f"Could not dispatch the emails of the outbox: {error!r}")
+            await asyncio.sleep(backoff_delay(attempt, maximum=settings.EMAIL_DISPATCH_INTERVAL))
+            attempt += 1
+            continue
+        # a full batch means more emails are probably due
+        if handled < settings.EMAIL_BATCH_SIZE:
+            await asyncio.sleep(settings.EMAIL_DISPATCH_INTERVAL)
+
+
+async def dispatch_batch() -> int:
+    """
+    Send up to `EMAIL_BATCH_SIZE` due emails, with one SendGrid request per email type and parameters.
+    The emails are claimed in a transaction of their own, by moving their next attempt `EMAIL_CLAIM_TIMEOUT` seconds
+    ahead, so replicas dispatching together skip them and no lock or connection is held while SendGrid is called.
+    Emails claimed by a dispatcher that stops before recording the result are sent again once the claim expires.
+    Failed emails are retried with backoff, up to `EMAIL_MAX_ATTEMPTS` times. Returns the number of emails handled.
+    """
+
+    async with local_session() as session:
+        query = (
+            select(OutboxEmail)
+            .where(col(OutboxEmail.next_attempt_at) <= func.now())
+            .order_by(OutboxEmail.next_attempt_at)
+            .limit(settings.EMAIL_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        emails = (await session.exec(query)).all()
+        for email in emails:
+            email.next_attempt_at = func.now() + timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT)
+        await session.commit()
+
+    if not emails:
+        return 0
+
+    batches: dict[tuple[str, str], list[OutboxEmail]] = defaultdict(list)
+    for email in emails:
+        batches[(email.email_type, json.dumps(email.parameters, sort_keys=True))].append(email)
+
+    for (email_type, _), batch in batches.items():
+        recipients = [email.recipient for email in batch]
+        try:
+            with observe_outbound("sendgrid", "send"):
+                # the SendGrid client is blocking
+                await asyncio.to_thread(send_emails, recipients, EmailType[email_type], batch[0].parameters)
+        except Exception as error:
+            logger.warning(f"Could not send {len(batch)} {email_type} emails: {error!r}")
+            for email in batch:
+                retry(email, error)
+        else:
+            for email in batch:
+                email.sent_at = func.now()
+                email.next_attempt_at = None
+
+    async with local_session() as session:
+        session.add_all(emails)
+        await session.commit()
+    return len(emails)
+
+
+def retry(email: OutboxEmail, error: Exception):
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        logger.error(f"Gave up sending email {email.id} to {email.recipient} after {email.attempts} attempts")
+        email.next_attempt_at = None
+        return
+
+    delay = backoff_delay(email.attempts, base=settings.EMAIL_RETRY_BASE_DELAY, maximum=settings.EMAIL_RETRY_MAX_DELAY)
+    email.next_attempt_at = func.now() + timedelta(seconds=delay)
+
+
+def send_emails(recipients: list[str], email_type: EmailType, parameters: dict):
+    """Send the same email to several recipients with one request, each in their own personalization"""
+
+    message = Mail(
+        from_email=settings.EMAIL_NOTIFICATION_FROM,
+        subject="LCA project",
+        # parameters missing from the template are left empty
+        html_content=email_type.value.format_map(defaultdict(str, parameters)),
+    )
+    for recipient in recipients:
+        personalization = Personalization()
+        personalization.add_to(To(recipient))
+        message.add_personalization(personalization)
+
+    SendGridAPIClient(settings.SENDGRID_SECRET).send(message)
@@ -1,39 +1,77 @@
 from typing import Any
 
-from aiocache import cached
-from lcacollect_config.context import get_session, get_user
+from aiocache import caches
+from lcacollect_config.context import get_user
 from lcacollect_config.exceptions import AuthenticationError
 from lcacollect_config.validate import is_super_admin
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from strawberry.permission import BasePermission
 from strawberry.types import Info
 
 import models.member as models_member
 import models.project as models_project
+from core.cache import delete_prefix
+from core.config import settings
+from core.invalidation import Event, subscribe
+from core.replica import get_primary_session
 
 
 class IsProjectMember(BasePermission):
     message = "User is not authenticated"
 
-    @cached(ttl=60)
     async def has_permission(self, source: Any, info: Info, **kwargs) -> bool:
         if user := get_user(info):
-            session = get_session(info)
-
             if is_super_admin(user):
                 return True
-            if (await session.get(models_project.Project, kwargs.get("projectId"))).public:
+            # a member added by someone else has no recent writes to read the replica past
+            if await has_project_access(get_primary_session(info), kwargs.get("projectId"), user.claims.get("oid")):
                 return True
+        raise AuthenticationError(self.message)
 
-            query = (
-                select(models_member.ProjectMember)
-                .where(models_member.ProjectMember.user_id == user.claims.get("oid"))
-                .where(models_member.ProjectMember.project_id == kwargs.get("projectId"))
-            )
 
-            project_members = await session.exec(query)
-            if project_members.first():
-                return True
-            else:
-                AuthenticationError(self.message)
-        raise AuthenticationError(self.message)
+def _project_access_key(project_id: str, user_id: str = "") -> str:
+    return f"project_access:{project_id}:{user_id}"
+
+
+async def has_project_access(session: AsyncSession, project_id: str, user_id: str) -> bool:
+    """
+    Whether the project is public or the user is a member of it.
+    Access is cached until the project or its members change. The invalidations only reach the other replicas
+    through Redis, so with the memory backend it is cached for `PROJECT_ACCESS_LOCAL_CACHE_TTL` seconds instead.
+    A denied access is only cached for `PROJECT_ACCESS_LOCAL_CACHE_TTL` seconds, as a read racing with the commit of
+    a new member may cache it after the invalidation.
+    """
+
+    cache = caches.get("default")
+    key = _project_access_key(project_id, user_id)
+    if (access := await cache.get(key)) is not None:
+        return access
+
+    if not (project := await session.get(models_project.Project, project_id)):
+        access = False
+    elif project.public:
+        access = True
+    else:
+        query = (
+            select(models_member.ProjectMember)
+            .where(models_member.ProjectMember.user_id == user_id)
+            .where(models_member.ProjectMember.project_id == project_id)
+        )
+        access = (await session.exec(query)).first() is not None
+
+    await cache.set(key, access, ttl=project_access_ttl(access))
+    return access
+
+
+def project_access_ttl(access: bool) -> int:
+    if access and settings.CACHE_BACKEND == "redis":
+        return settings.PROJECT_ACCESS_CACHE_TTL
+    return settings.PROJECT_ACCESS_LOCAL_CACHE_TTL
+
+
+async def invalidate_project_access(event: Event):
+    await delete_prefix(caches.get("default"), _project_access_key(event.project_id))
+
+
+subscribe("project:", invalidate_project_access)
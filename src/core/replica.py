@@ -0,0 +1,64 @@
+import logging
+
+from aiocache import caches
+from lcacollect_config.context import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from strawberry.extensions import SchemaExtension
+from strawberry.types import Info
+from strawberry.types.graphql import OperationType
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _recent_writes_key(user_id: str) -> str:
+    return f"recent_writes_{user_id}"
+
+
+async def record_write(user_id: str):
+    """Send the reads of a user to the primary for `READ_YOUR_WRITES_SECONDS`, until the replica has caught up"""
+
+    await caches.get("default").set(_recent_writes_key(user_id), True, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+
+async def has_recent_writes(user_id: str) -> bool:
+    return bool(await caches.get("default").get(_recent_writes_key(user_id)))
+
+
+def get_primary_session(info: Info) -> AsyncSession:
+    """
+    Session on the primary, even in queries running on the read replica.
+    For reads that must see the commits of other users, which read-your-writes does not cover.
+    """
+
+    return info.context.get("primary_session") or get_session(info)
+
+
+class ReadReplicaExtension(SchemaExtension):
+    """
+    Executes queries on the read replica session from the context, while mutations use the primary.
+    Users who have run a mutation within the last `READ_YOUR_WRITES_SECONDS` keep reading from the primary,
+    so they see their own changes even if the replica lags behind.
+    """
+
+    async def on_execute(self):
+        context = self.execution_context.context
+        if context.get("read_session") is None:
+            yield
+            return
+
+        user_id = _user_id(context)
+        operation_type = self.execution_context.operation_type
+        if operation_type == OperationType.QUERY and not (user_id and await has_recent_writes(user_id)):
+            context["session"] = context["read_session"]
+
+        yield
+
+        if operation_type == OperationType.MUTATION and user_id:
+            await record_write(user_id)
+
+
+def _user_id(context: dict) -> str | None:
+    user = context.get("user")
+    return getattr(user, "claims", {}).get("oid") if user else None
@@ -0,0 +1,90 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from strawberry.extensions import SchemaExtension
+
+from core.config import settings
+from core.metrics import SQL_DURATION, SQL_STATEMENTS, operation_labels
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StatementStats:
+    """Number of SQL statements and the time spent executing them"""
+
+    statements: int = 0
+    duration: float = 0.0
+
+
+_active_stats: ContextVar[tuple[StatementStats, ...]] = ContextVar("active_statement_stats", default=())
+
+
+@contextmanager
+def track_statements() -> Iterator[StatementStats]:
+    """
+    Count the SQL statements executed within the block by the current task and the tasks it spawns.
+    Blocks can be nested, in which case a statement is counted by all of them.
+    """
+
+    stats = StatementStats()
+    token = _active_stats.set((*_active_stats.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["statement_start"].pop()
+    for stats in _active_stats.get():
+        stats.statements += 1
+        stats.duration += duration
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    if (conn := exception_context.connection) is not None and conn.info.get("statement_start"):
+        conn.info["statement_start"].pop()
+
+
+class StatementCounterExtension(SchemaExtension):
+    """
+    Counts the SQL statements and the database time of each GraphQL operation and records them as metrics.
+    The numbers are added to the response extensions when `SQL_STATS_IN_RESPONSE` is enabled
+    and operations exceeding `SQL_STATEMENT_WARNING_THRESHOLD` statements are logged.
+    """
+
+    def on_operation(self):
+        with track_statements() as self.stats:
+            yield
+
+        labels = operation_labels(self.execution_context)
+        SQL_STATEMENTS.labels(*labels).observe(self.stats.statements)
+        SQL_DURATION.labels(*labels).observe(self.stats.duration)
+
+        operation = self.execution_context.operation_name or self.execution_context.operation_type.value
+        if self.stats.statements > settings.SQL_STATEMENT_WARNING_THRESHOLD:
+            logger.warning(
+                f'GraphQL operation "{operation}" issued {self.stats.statements} SQL statements '
+                f"taking {self.stats.duration * 1000:.1f} ms"
+            )
+        else:
+            logger.debug(f'GraphQL operation "{operation}" issued {self.stats.statements} SQL statements')
+
+    def get_results(self) -> dict:
+        if not settings.SQL_STATS_IN_RESPONSE:
+            return {}
+        return {"sql": {"statements": self.stats.statements, "durationMs": round(self.stats.duration * 1000, 3)}}
@@ -0,0 +1,43 @@
+import asyncio
+from collections import defaultdict
+from typing import AsyncGenerator
+
+from core.config import settings
+from core.invalidation import Event, subscribe
+
+# Queues of the GraphQL subscriptions of this process, by Project id
+_queues: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+
+class SubscriptionOverflow(Exception):
+    pass
+
+
+async def project_events(project_id: str) -> AsyncGenerator[Event, None]:
+    """
+    Yield the events of a Project, published by this process or, when `CACHE_BACKEND` is shared, by the other replicas.
+    A subscriber falling more than `SUBSCRIPTION_QUEUE_SIZE` events behind is ended, as it has missed events.
+    """
+
+    # one extra slot for the overflow marker
+    queue = asyncio.Queue(maxsize=settings.SUBSCRIPTION_QUEUE_SIZE + 1)
+    _queues[project_id].add(queue)
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        raise SubscriptionOverflow(f"Missed events of Project {project_id}, sync them with projectChangesSince")
+    finally:
+        _queues[project_id].discard(queue)
+        if not _queues[project_id]:
+            del _queues[project_id]
+
+
+async def forward(event: Event):
+    for queue in _queues.get(event.project_id, ()):
+        if queue.qsize() < settings.SUBSCRIPTION_QUEUE_SIZE:
+            queue.put_nowait(event)
+        elif not queue.full():
+            queue.put_nowait(None)
+
+
+subscribe("project:", forward)
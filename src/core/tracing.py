@@ -0,0 +1,101 @@
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from strawberry.extensions.tracing import OpenTelemetryExtension
+from strawberry.types import Info
+
+from core.config import settings
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer(__name__)
+
+
+class TracingExtension(OpenTelemetryExtension):
+    """Traces GraphQL operations and their asynchronous resolvers"""
+
+    def __init__(self, *, execution_context=None, arg_filter=None):
+        super().__init__(execution_context=execution_context, arg_filter=arg_filter)
+        # The parent class keeps its spans in a class attribute, which is shared by concurrent operations
+        self._span_holder = {}
+
+    def resolve(self, _next: Callable, root: Any, info: Info, *args, **kwargs) -> Any:
+        # Synchronous resolvers only compute values from their parent, and tracing them would dominate the cost
+        if not is_async_resolver(info):
+            return _next(root, info, *args, **kwargs)
+        return super().resolve(_next, root, info, *args, **kwargs)
+
+
+def is_async_resolver(info: Info) -> bool:
+    field = info.parent_type.fields.get(info.field_name)
+    definition = field and field.extensions.get("strawberry-definition")
+    return bool(definition and definition.base_resolver and definition.base_resolver.is_async)
+
+
+def setup_tracing(exporter: "SpanExporter | None" = None) -> "TracerProvider | None":
+    """
+    Export spans as configured by `TRACING_EXPORTER`:
+
+    * `file` appends one JSON document per span to `TRACING_FILE`
+    * `otlp` sends the spans to the collector given by the standard `OTEL_EXPORTER_OTLP_*` variables
+    """
+
+    if exporter is None and settings.TRACING_EXPORTER == "none":
+        return None
+
+    # The SDK is only imported when tracing is enabled, the API alone creates no-op spans
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if exporter is None:
+        if settings.TRACING_EXPORTER == "file":
+            exporter = ConsoleSpanExporter(
+                out=open(settings.TRACING_FILE, "a"), formatter=lambda span: span.to_json(indent=None) + "\n"
+            )
+        elif settings.TRACING_EXPORTER == "otlp":
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            exporter = OTLPSpanExporter()
+
+    logger.info(f"Exporting traces with {exporter.__class__.__name__}")
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: settings.TRACING_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    if not event.contains(Engine, "before_cursor_execute", _start_statement_span):
+        event.listen(Engine, "before_cursor_execute", _start_statement_span)
+        event.listen(Engine, "after_cursor_execute", _end_statement_span)
+        event.listen(Engine, "handle_error", _fail_statement_span)
+    return provider
+
+
+def _start_statement_span(conn, cursor, statement, parameters, context, executemany):
+    span = tracer.start_span(
+        statement.split(maxsplit=1)[0] if statement else "SQL",
+        kind=SpanKind.CLIENT,
+        attributes={"db.system": "postgresql", "db.name": conn.engine.url.database or "", "db.statement": statement},
+    )
+    conn.info.setdefault("statement_spans", []).append(span)
+
+
+def _end_statement_span(conn, cursor, statement, parameters, context, executemany):
+    conn.info["statement_spans"].pop().end()
+
+
+def _fail_statement_span(exception_context):
+    if (conn := exception_context.connection) is not None and conn.info.get("statement_spans"):
+        span = conn.info["statement_spans"].pop()
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable
+
+import anyio
+import lcacollect_config.user
+from aiocache import caches
+from msgraph.core import GraphClient
+
+from core.config import settings
+from core.health import run_in_background
+from exceptions import MSGraphException
+
+logger = logging.getLogger(__name__)
+
+USER_NAMESPACE = "users"
+# lcacollect_config caches the users looked up by email in this namespace of its cache.
+# In Redis the namespaces are stored under the namespace of the cache, see core.cache.NamespacedRedisCache
+EMAIL_NAMESPACE = "azure_emails"
+# Microsoft Graph accepts up to 20 requests in a $batch
+GRAPH_BATCH_SIZE = 20
+EMAIL = re.compile(r"^([a-zA-Z0-9_\-\.]+)@([a-zA-Z0-9_\-\.]+)\.([a-zA-Z]{2,5})$")
+
+# Users being refreshed in the background, so a stale user is only refreshed once at a time
+_refreshing: set[str] = set()
+_graph_limiter: anyio.CapacityLimiter | None = None
+
+
+async def get_users_from_azure(user_ids: str | list[str]) -> list[dict[str, str]]:
+    """
+    Fetch Users from Azure Active Directory, cached with stale-while-revalidate.
+    Users fetched more than `USER_CACHE_SOFT_TTL` seconds ago are returned right away and refreshed in the background.
+    Users are dropped from the cache after `USER_CACHE_HARD_TTL` seconds, which bounds how stale they can be.
+    """
+
+    if not user_ids:
+        return [{}]
+    if not isinstance(user_ids, list):
+        user_ids = [user_ids]
+
+    entries = await caches.get("azure_users").multi_get(user_ids, namespace=USER_NAMESPACE)
+    now = time.time()
+    users = {}
+    missing = []
+    stale = []
+    for user_id, entry in zip(user_ids, entries):
+        if entry is None:
+            missing.append(user_id)
+            continue
+        users[user_id] = entry["user"]
+        if now - entry["fetched_at"] >= settings.USER_CACHE_SOFT_TTL and user_id not in _refreshing:
+            stale.append(user_id)
+
+    if stale:
+        _refreshing.update(stale)
+        run_in_background(refresh_users(stale))
+    if missing:
+        users.update(await fetch_users(missing))
+
+    return [users[user_id] for user_id in user_ids if user_id in users]
+
+
+async def fetch_users(user_ids: list[str]) -> dict[str, dict[str, str]]:
+    users = []
+    for batch in await asyncio.gather(*(run_graph(lookup_users_by_id, ids) for ids in batches(user_ids))):
+        users.extend(batch)
+    fetched_at = time.time()
+    entries = [(user["user_id"], {"user": user, "fetched_at": fetched_at}) for user in users if user.get("user_id")]
+    if entries:
+        await caches.get("azure_users").multi_set(entries, ttl=settings.USER_CACHE_HARD_TTL, namespace=USER_NAMESPACE)
+    return {user_id: entry["user"] for user_id, entry in entries}
+
+
+async def refresh_users(user_ids: list[str]):
+    try:
+        await fetch_users(user_ids)
+    except Exception as error:
+        logger.warning(f"Could not refresh {len(user_ids)} users from Azure: {error!r}")
+    finally:
+        _refreshing.difference_update(user_ids)
+
+
+def batches(items: list[str]) -> list[list[str]]:
+    """Split requests to Microsoft Graph into $batch requests of at most `GRAPH_BATCH_SIZE`"""
+
+    return [items[index : index + GRAPH_BATCH_SIZE] for index in range(0, len(items), GRAPH_BATCH_SIZE)]
+
+
+async def run_graph(function: Callable, *args: Any) -> Any:
+    """
+    Call the blocking Microsoft Graph client in a worker thread, so it does not block the event loop.
+    At most `GRAPH_CONCURRENCY` calls run at a time.
+    """
+
+    global _graph_limiter
+    if _graph_limiter is None:
+        _graph_limiter = anyio.CapacityLimiter(settings.GRAPH_CONCURRENCY)
+    return await anyio.to_thread.run_sync(partial(function, *args), limiter=_graph_limiter)
+
+
+async def get_aad_users_by_email(emails: list[str]) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    Look up users in Azure Active Directory by email, with concurrent Graph $batch requests.
+    Returns the users, where emails without a user map to an empty dict, and the errors of the emails that could not
+    be looked up, e.g. when Graph throttles some requests of a batch.
+    """
+
+    cache = lcacollect_config.user.cache
+    cached = await cache.multi_get(emails, namespace=EMAIL_NAMESPACE)
+    users = {email: user for email, user in zip(emails, cached) if user and user.get("id")}
+    missing = [email for email in dict.fromkeys(emails) if email not in users]
+
+    fetched = {}
+    errors = {}
+    lookups = [run_graph(lookup_users_by_email, batch) for batch in batches(missing)]
+    for batch, result in zip(batches(missing), await asyncio.gather(*lookups, return_exceptions=True)):
+        if isinstance(result, Exception):
+            errors.update({email: str(result) for email in batch})
+        else:
+            fetched.update(result[0])
+            errors.update(result[1])
+
+    if found := [(email, user) for email, user in fetched.items() if user]:
+        await cache.multi_set(found, ttl=60 * 5, namespace=EMAIL_NAMESPACE)
+    users.update(fetched)
+    return {email: users.get(email, {}) for email in emails if email not in errors}, errors
+
+
+def lookup_users_by_id(user_ids: list[str]) -> list[dict]:
+    """
+    Fetch up to `GRAPH_BATCH_SIZE` users by id with a single Graph $batch request, in the format of
+    `lcacollect_config.user.get_users_from_azure`, which calls Graph on the event loop
+    """
+
+    headers = {"Content-Type": "application/json"}
+    # signInActivity is only available on the beta API, and requires the AuditLog.Read.All permission
+    requests = [
+        {
+            "id": user_id,
+            "method": "GET",
+            "url": f"/users/{user_id}?$select=id,displayName,mail,userPrincipalName,companyName,signInActivity",
+            "headers": headers,
+        }
+        for user_id in user_ids
+    ]
+    graph = GraphClient(credential=settings.AAD_GRAPH_SECRET)
+    response = graph.post(
+        url="https://graph.microsoft.com/beta/$batch", data=json.dumps({"requests": requests}), headers=headers
+    )
+    if response.status_code != 200:
+        raise MSGraphException(f"Failed to fetch users via Graph API: {response.text}")
+
+    users = []
+    for result in response.json().get("responses", []):
+        if result.get("status") != 200:
+            raise MSGraphException(f"Failed to fetch user {result.get('id')} via Graph API: {result}")
+        body = result.get("body")
+        email = body.get("mail")
+        # some accounts have no email, but a principal name that is one
+        if not email:
+            principal_name = body.get("userPrincipalName", "")
+            email = principal_name if EMAIL.match(principal_name) else "NA"
+        if last_login := (body.get("signInActivity") or {}).get("lastSignInDateTime"):
+            last_login = datetime.strptime(last_login, r"%Y-%m-%dT%H:%M:%SZ").date()
+        users.append(
+            {
+                "user_id": body.get("id"),
+                "name": body.get("displayName"),
+                "email": email,
+                "company": body.get("companyName"),
+                "last_login": last_login,
+            }
+        )
+    return users
+
+
+def lookup_users_by_email(emails: list[str]) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    Look up up to `GRAPH_BATCH_SIZE` users by email with a single Graph $batch request.
+    Returns the users found or not, and the errors of the other emails.
+    """
+
+    headers = {"Content-Type": "application/json"}
+    requests = [
+        {"id": str(index), "method": "GET", "url": f"/users/{user_principal_name(email)}", "headers": headers}
+        for index, email in enumerate(emails)
+    ]
+    graph = GraphClient(credential=settings.AAD_GRAPH_SECRET)
+    response = graph.post(url="/$batch", data=json.dumps({"requests": requests}), headers=headers)
+    if response.status_code != 200:
+        raise MSGraphException(f"Failed to look up users via Graph API: {response.text}")
+
+    users = {}
+    errors = {}
+    for result in response.json().get("responses", []):
+        email = emails[int(result["id"])]
+        if result.get("status") == 200:
+            users[email] = result.get("body")
+        elif result.get("status") == 404:
+            users[email] = {}
+        else:
+            errors[email] = f"Failed to look up user {email} via Graph API: status {result.get('status')}"
+    return users, errors
+
+
+def user_principal_name(email: str) -> str:
+    """Principal name of the user with an email. External users have one like `xxxx_gmail.com#EXT#@<AD domain>`"""
+
+    if any(domain in email for domain in settings.INTERNAL_EMAIL_DOMAINS_LIST):
+        return email
+    return f"{email.replace('@', '_')}%23EXT%23@{settings.DEFAULT_AD_FQDN}"
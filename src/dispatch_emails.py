@@ -0,0 +1,13 @@
+import asyncio
+import logging
+
+from core.outbox import dispatch_emails
+
+logger = logging.getLogger(__name__)
+
+# Sends the emails of the outbox in a process of its own, for deployments running the API with
+# EMAIL_DISPATCHER_IN_PROCESS disabled, so notification I/O stays off the request workers.
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Dispatching the emails of the outbox")
+    asyncio.run(dispatch_emails())
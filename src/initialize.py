@@ -1,29 +1,37 @@
 import asyncio
 import logging
 
-from lcacollect_config.connection import create_postgres_engine
-from sqlmodel.ext.asyncio.session import AsyncSession
-from tenacity import after_log, before_log, retry, stop_after_attempt, wait_fixed
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from tenacity import (
+    after_log,
+    before_log,
+    retry,
+    stop_after_delay,
+    wait_random_exponential,
+)
+
+from core.config import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-max_tries = 60 * 5  # 5 minutes
-wait_seconds = 1
+max_wait_seconds = 60 * 5  # 5 minutes
 
 
 @retry(
-    stop=stop_after_attempt(max_tries),
-    wait=wait_fixed(wait_seconds),
+    stop=stop_after_delay(max_wait_seconds),
+    # jittered exponential backoff from 0.1 seconds, so a recovered database is noticed quickly
+    wait=wait_random_exponential(multiplier=0.1, max=5),
     before=before_log(logger, logging.INFO),
     after=after_log(logger, logging.WARN),
 )
-async def init() -> None:
+async def init(engine: AsyncEngine) -> None:
     try:
-        engine = create_postgres_engine()
-        async with AsyncSession(engine) as db:
-            # Try to create session to check if DB is awake
-            await db.execute("SELECT 1")
+        # Try to connect to check if DB is awake
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
     except Exception as e:
         logger.error(e)
         raise e
@@ -31,7 +39,16 @@ async def init() -> None:
 
 async def main() -> None:
     logger.info("Initializing service")
-    await init()
+    # One engine for all attempts. Without a pool every attempt opens a fresh connection, which fails fast.
+    engine = create_async_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        poolclass=NullPool,
+        connect_args={"ssl": settings.POSTGRES_SSL, "timeout": settings.POSTGRES_CONNECT_TIMEOUT},
+    )
+    try:
+        await init(engine)
+    finally:
+        await engine.dispose()
     logger.info("Service finished initializing")
 
 
@@ -2,11 +2,32 @@ import logging.config
 import os
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from lcacollect_config.security import azure_scheme
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from core.cache import use_shared_user_cache
 from core.config import settings
+from core.connection import (
+    DATABASE_CHECK,
+    check_database,
+    dispose_engine,
+    monitor_database,
+    setup_engine,
+)
+from core.event_loop import monitor_event_loop
+from core.health import (
+    cancel_background_tasks,
+    readiness,
+    register_check,
+    run_in_background,
+    set_ready,
+)
+from core.invalidation import listen
+from core.openid import OPENID_CHECK, load_openid_config
+from core.outbox import dispatch_emails
+from core.tracing import setup_tracing
 from routes import graphql_app
 
 if os.getenv("SERVER_NAME") != "LCA Test":
@@ -14,6 +35,8 @@ if os.getenv("SERVER_NAME") != "LCA Test":
 
 logger = logging.getLogger(__name__)
 
+setup_tracing()
+
 app = FastAPI(
     title=settings.SERVER_NAME,
     openapi_url=f"{settings.API_STR}/openapi.json",
@@ -35,19 +58,76 @@ if settings.BACKEND_CORS_ORIGINS:
     )
 
 app.include_router(graphql_app, prefix=settings.API_STR)
+use_shared_user_cache()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics of this process"""
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/health/live", include_in_schema=False)
+def liveness():
+    """The process is running and serving requests"""
+
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", include_in_schema=False)
+def ready(response: Response):
+    """The process can authenticate and serve traffic"""
+
+    is_ready, checks = readiness()
+    if not is_ready:
+        response.status_code = 503
+    return {"status": "ok" if is_ready else "unavailable", "checks": checks}
 
 
 @app.on_event("startup")
 async def app_init():
     """Initialize application services"""
 
+    # The database, Azure AD and the seed import are checked in the background and reported on /health/ready
+    await setup_engine()
+    register_check(DATABASE_CHECK)
+    # The first connection of an engine initializes the dialect, which deadlocks with concurrent connections.
+    # It is made before the server takes requests, and bounded by the connect timeout.
+    run_in_background(monitor_database(await check_database()))
+
     logger.info("Setting up Azure AD")
-    # Setup Azure AD
-    await azure_scheme.openid_config.load_config()
+    register_check(OPENID_CHECK)
+    run_in_background(load_openid_config(azure_scheme.openid_config))
+
+    if settings.CACHE_BACKEND == "redis":
+        run_in_background(listen())
+    run_in_background(monitor_event_loop())
+    if settings.EMAIL_DISPATCHER_IN_PROCESS:
+        run_in_background(dispatch_emails())
 
     if os.environ.get("RUN_STAGE") == "DEV":
         logger.info(f"Running as DEV. Importing project data!")
-        from initial_data.load import load_project_data
+        register_check("initial_data")
+        run_in_background(load_initial_data())
+
+
+async def load_initial_data():
+    from initial_data.load import load_project_data
+
+    # nothing awaits the background task, so the failure is reported by the readiness check
+    try:
+        await load_project_data(Path(__file__).parent / "initial_data")
+    except Exception:
+        logger.exception("Importing the project data failed")
+        set_ready("initial_data", False)
+        return
+    set_ready("initial_data")
+
+
+@app.on_event("shutdown")
+async def app_shutdown():
+    """Stop the background tasks and close the database connections"""
 
-        p = Path(__file__).parent / "initial_data"
-        await load_project_data(p)
+    await cancel_background_tasks()
+    await dispose_engine()
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Key of the Postgres advisory lock held while migrating, shared by all replicas of the service
+MIGRATION_LOCK_KEY = 7_360_129_446_180_415
+
+
+def alembic_config() -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    # keep the logging of this script instead of the configuration in alembic.ini
+    config.attributes["configure_logger"] = False
+    return config
+
+
+async def current_revisions(conn: AsyncConnection) -> set[str]:
+    try:
+        return set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+    except exc.ProgrammingError:
+        # the database has never been migrated
+        return set()
+
+
+async def migrate(config: Config | None = None) -> bool:
+    """
+    Upgrade the database to the head revision. Returns whether any migration was run.
+
+    The revision in `alembic_version` is checked first, so a database at head costs a single query.
+    Otherwise an advisory lock makes sure only one replica migrates, while the others wait and find the database
+    at head once the lock is released.
+    """
+
+    config = config or alembic_config()
+    start = time.perf_counter()
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    # autocommit, so waiting for the lock does not keep a transaction open against the tables being migrated
+    engine = create_async_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        poolclass=NullPool,
+        isolation_level="AUTOCOMMIT",
+        connect_args={"ssl": settings.POSTGRES_SSL},
+    )
+    try:
+        async with engine.connect() as conn:
+            if await current_revisions(conn) == heads:
+                logger.info(f"Database is at {', '.join(heads)}, checked in {time.perf_counter() - start:.3f}s")
+                return False
+
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                # another replica may have migrated while we were waiting for the lock
+                revisions = await current_revisions(conn)
+                if revisions == heads:
+                    logger.info(f"Database was migrated to {', '.join(heads)} by another process")
+                    return False
+
+                from alembic import command
+
+                # env.py runs its own event loop, so the upgrade runs in a thread
+                await asyncio.to_thread(command.upgrade, config, "head")
+                logger.info(
+                    f"Migrated the database from {', '.join(revisions) or 'an empty database'} to "
+                    f"{', '.join(heads)} in {time.perf_counter() - start:.3f}s"
+                )
+                return True
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
@@ -1,12 +1,17 @@
+from datetime import datetime
 from typing import Optional
 
 from lcacollect_config.formatting import string_uuid
 from sqlmodel import Field, Relationship, SQLModel
 
+from models.tracking import created_at_column, track_changes, updated_at_column
+
 
 class MemberGroupLink(SQLModel, table=True):
     member_id: Optional[str] = Field(default=None, foreign_key="projectmember.id", primary_key=True, nullable=False)
     group_id: Optional[str] = Field(default=None, foreign_key="projectgroup.id", primary_key=True, nullable=False)
+    created_at: Optional[datetime] = Field(default=None, sa_column=created_at_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=updated_at_column())
 
 
 class ProjectGroup(SQLModel, table=True):
@@ -30,3 +35,11 @@ class ProjectGroup(SQLModel, table=True):
 
     project_id: Optional[str] = Field(default=None, foreign_key="project.id", nullable=False)
     project: "Project" = Relationship(back_populates="groups")
+    created_at: Optional[datetime] = Field(default=None, sa_column=created_at_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=updated_at_column())
+
+    __mapper_args__ = {"eager_defaults": True}
+
+
+track_changes(MemberGroupLink.__table__, "member_id,group_id", "group_id", "projectgroup")
+track_changes(ProjectGroup.__table__, "id", "project_id")
@@ -1,9 +1,11 @@
+from datetime import datetime
 from typing import Optional
 
 from lcacollect_config.formatting import string_uuid
 from sqlmodel import Field, Relationship, SQLModel
 
 from models.group import MemberGroupLink, ProjectGroup
+from models.tracking import created_at_column, track_changes, updated_at_column
 
 
 class ProjectMember(SQLModel, table=True):
@@ -20,6 +22,10 @@ class ProjectMember(SQLModel, table=True):
     user_id: str
     project_id: Optional[str] = Field(foreign_key="project.id")
     project: "Project" = Relationship(back_populates="members")
+    created_at: Optional[datetime] = Field(default=None, sa_column=created_at_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=updated_at_column())
+
+    __mapper_args__ = {"eager_defaults": True}
 
     @classmethod
     def create_from_user(
@@ -33,3 +39,6 @@ class ProjectMember(SQLModel, table=True):
             user_id=user_id,
             project_id=project_id,
         )
+
+
+track_changes(ProjectMember.__table__, "id", "project_id")
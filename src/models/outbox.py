@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+from models.tracking import created_at_column
+
+
+class OutboxEmail(SQLModel, table=True):
+    """An email notification, sent by the dispatcher once the transaction adding it is committed"""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    recipient: str
+    email_type: str
+    parameters: dict = Field(default_factory=dict, sa_column=Column(JSONB, nullable=False))
+    attempts: int = Field(default=0, nullable=False)
+    last_error: Optional[str]
+    # cleared once the email is sent, or when it is given up on
+    next_attempt_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    )
+    sent_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    created_at: Optional[datetime] = Field(default=None, sa_column=created_at_column())
@@ -1,13 +1,15 @@
+from datetime import datetime
 from typing import Optional
 
 from lcacollect_config.formatting import string_uuid
-from sqlalchemy import Column
-from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy import Column, Computed, Index, literal_column
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel
 
 from models.group import ProjectGroup
 from models.member import ProjectMember
 from models.stage import ProjectStage
+from models.tracking import created_at_column, track_changes, updated_at_column
 
 
 class Project(SQLModel, table=True):
@@ -36,4 +38,27 @@ class Project(SQLModel, table=True):
         back_populates="project",
         sa_relationship_kwargs={"cascade": "all,delete"},
     )
-    meta_fields: dict = Field(default=dict, sa_column=Column(JSON), nullable=False)
+    meta_fields: dict = Field(default=dict, sa_column=Column(JSONB), nullable=False)
+    created_at: Optional[datetime] = Field(default=None, sa_column=created_at_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=updated_at_column())
+
+    # the timestamps set by Postgres are returned by the INSERT and UPDATE statements
+    __mapper_args__ = {"eager_defaults": True}
+
+
+track_changes(Project.__table__, "id", "id")
+
+# The text searched by `searchProjects`. Columns are not qualified, as the expression is also used in the DDL.
+SEARCH_TEXT = " || ' ' || ".join(
+    f"coalesce({column}, '')" for column in ("name", "project_id", "client", "address", "city", "country")
+)
+# Partial words are matched with ILIKE on the search text, indexed with pg_trgm where the extension is available.
+# The index is created by migration only, as the extension may not be.
+SEARCH_TRIGRAM_INDEX = "ix_project_search_text_trgm"
+
+# Maintained by Postgres, and not mapped so it is not loaded with the projects
+search_vector = Column("search_vector", TSVECTOR, Computed(f"to_tsvector('simple', {SEARCH_TEXT})", persisted=True))
+Project.__table__.append_column(search_vector)
+Index("ix_project_search_vector", search_vector, postgresql_using="gin")
+Index("ix_project_meta_fields", Project.__table__.c.meta_fields, postgresql_using="gin")
+search_text = literal_column(f"({SEARCH_TEXT})")
@@ -1,8 +1,11 @@
+from datetime import datetime
 from typing import Optional
 
 from lcacollect_config.formatting import string_uuid
 from sqlmodel import Field, Relationship, SQLModel
 
+from models.tracking import created_at_column, track_changes, updated_at_column
+
 
 class ProjectStage(SQLModel, table=True):
     stage_id: Optional[str] = Field(default=None, foreign_key="lifecyclestage.id", primary_key=True, nullable=False)
@@ -10,6 +13,8 @@ class ProjectStage(SQLModel, table=True):
 
     project: "Project" = Relationship(back_populates="stages")
     stage: "LifeCycleStage" = Relationship(back_populates="projects")
+    created_at: Optional[datetime] = Field(default=None, sa_column=created_at_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=updated_at_column())
 
 
 class LifeCycleStage(SQLModel, table=True):
@@ -21,3 +26,6 @@ class LifeCycleStage(SQLModel, table=True):
     phase: str
 
     projects: list["ProjectStage"] = Relationship(back_populates="stage")
+
+
+track_changes(ProjectStage.__table__, "stage_id", "project_id")
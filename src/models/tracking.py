@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DDL, Column, DateTime, FetchedValue, Table, event, func
+from sqlmodel import Field, SQLModel
+
+# Functions of the triggers keeping `updated_at` and the tombstones of deleted rows.
+# They are created along with the tables, and by the migration adding change tracking.
+SET_UPDATED_AT = """
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+RECORD_TOMBSTONE = """
+CREATE OR REPLACE FUNCTION record_tombstone() RETURNS trigger AS $$
+DECLARE
+    deleted jsonb := to_jsonb(OLD);
+    project text := deleted ->> TG_ARGV[1];
+BEGIN
+    -- rows without a project_id column name a parent table to look it up in
+    IF TG_NARGS > 2 THEN
+        EXECUTE format('SELECT project_id FROM %I WHERE id = $1', TG_ARGV[2]) INTO project USING project;
+    END IF;
+    INSERT INTO tombstone (entity, entity_id, project_id, user_id)
+    SELECT TG_TABLE_NAME, string_agg(deleted ->> key, ':' ORDER BY position), project, deleted ->> 'user_id'
+    FROM unnest(string_to_array(TG_ARGV[0], ',')) WITH ORDINALITY AS keys (key, position);
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def created_at_column() -> Column:
+    return Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+def updated_at_column() -> Column:
+    return Column(
+        DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), nullable=False, index=True
+    )
+
+
+def tracking_triggers(table: str, id_columns: str, project_column: str, parent_table: str | None = None) -> list[str]:
+    """
+    DDL of the triggers tracking the changes of a table.
+    Deleted rows are identified by `id_columns`, joined with ":", and belong to the project in `project_column`,
+    or to the project of the row of `parent_table` referenced by `project_column`.
+    """
+
+    arguments = ", ".join(f"'{argument}'" for argument in (id_columns, project_column, parent_table) if argument)
+    return [
+        f"CREATE TRIGGER {table}_updated_at BEFORE UPDATE ON {table} FOR EACH ROW EXECUTE FUNCTION set_updated_at()",
+        f"CREATE TRIGGER {table}_tombstone AFTER DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION record_tombstone({arguments})",
+    ]
+
+
+def track_changes(table: Table, id_columns: str, project_column: str, parent_table: str | None = None):
+    """Create the triggers tracking the changes of a table along with it"""
+
+    for statement in tracking_triggers(table.name, id_columns, project_column, parent_table):
+        event.listen(table, "after_create", DDL(statement))
+
+
+class Tombstone(SQLModel, table=True):
+    """A deleted row, kept so clients syncing changes learn about the deletion"""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str
+    entity_id: str
+    project_id: Optional[str]
+    # of deleted members, so users learn that they were removed from a project
+    user_id: Optional[str]
+    deleted_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    )
+
+
+# DDL statements are %-formatted
+for function in (SET_UPDATED_AT, RECORD_TOMBSTONE):
+    event.listen(SQLModel.metadata, "before_create", DDL(function.replace("%", "%%")))
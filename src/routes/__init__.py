@@ -1,11 +1,95 @@
 import os
 
-from lcacollect_config.fastapi import get_context
+from fastapi import Depends, HTTPException, Request, Response, Security, WebSocket
+from fastapi.security import SecurityScopes
 from lcacollect_config.router import LCAGraphQLRouter
+from lcacollect_config.security import azure_scheme
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
+from strawberry import UNSET
+from strawberry.fastapi.handlers import GraphQLTransportWSHandler, GraphQLWSHandler
+from strawberry.http import GraphQLHTTPResponse
 
+from core.config import settings
+from core.connection import get_db, get_replica_db
+from core.encoding import compress, encode_json, negotiate_encoding
 from schema import schema
 
-graphql_app = LCAGraphQLRouter(
+
+async def authenticate(connection: HTTPConnection, security_scopes: SecurityScopes):
+    """
+    Authenticate the user with the Authorization header.
+    Browsers cannot set the headers of WebSockets, so WebSockets without one are authenticated with the
+    `Authorization` of their `connection_init` payload instead, see `ConnectionParamsAuthentication`.
+    """
+
+    if isinstance(connection, WebSocket) and "authorization" not in connection.headers:
+        return None
+    return await azure_scheme(connection, security_scopes)
+
+
+async def get_context(session=Depends(get_db), read_session=Depends(get_replica_db), user=Security(authenticate)):
+    # queries are moved to the read session by `core.replica.ReadReplicaExtension`
+    return {"session": session, "primary_session": session, "read_session": read_session, "user": user}
+
+
+class ConnectionParamsAuthentication:
+    """Authenticate the operations of a WebSocket with the `Authorization` of its `connection_init` payload"""
+
+    connection_params: dict | None
+
+    async def get_context(self):
+        context = await super().get_context()
+        authorization = (self.connection_params or {}).get("Authorization")
+        if context["user"] is None and authorization:
+            request = Request({"type": "http", "headers": [(b"authorization", authorization.encode())]})
+            try:
+                context["user"] = await azure_scheme(request, SecurityScopes())
+            except HTTPException:
+                pass
+        return context
+
+
+class ProjectGraphQLTransportWSHandler(ConnectionParamsAuthentication, GraphQLTransportWSHandler):
+    pass
+
+
+class ProjectGraphQLWSHandler(ConnectionParamsAuthentication, GraphQLWSHandler):
+    pass
+
+
+class ProjectGraphQLRouter(LCAGraphQLRouter):
+    """
+    GraphQL router encoding responses with orjson and compressing responses larger than
+    `GRAPHQL_COMPRESSION_MINIMUM_SIZE` with the best encoding the client accepts.
+    Subscriptions are served over WebSockets on the same path.
+    """
+
+    graphql_transport_ws_handler_class = ProjectGraphQLTransportWSHandler
+    graphql_ws_handler_class = ProjectGraphQLWSHandler
+
+    def encode_json(self, response_data: GraphQLHTTPResponse) -> bytes:
+        return encode_json(response_data)
+
+    async def run(self, request: Request, context=UNSET, root_value=UNSET) -> Response:
+        response = await super().run(request, context=context, root_value=root_value)
+        if response.headers.get("content-encoding") or response.media_type != "application/json":
+            return response
+
+        response.headers["vary"] = "Accept-Encoding"
+        if len(response.body) < settings.GRAPHQL_COMPRESSION_MINIMUM_SIZE:
+            return response
+        if not (encoding := negotiate_encoding(request.headers.get("accept-encoding"))):
+            return response
+
+        # zlib and brotli release the GIL, so large responses are compressed without blocking the event loop
+        response.body = await run_in_threadpool(compress, response.body, encoding)
+        response.headers["content-encoding"] = encoding
+        response.headers["content-length"] = str(len(response.body))
+        return response
+
+
+graphql_app = ProjectGraphQLRouter(
     schema,
     context_getter=get_context,
     path="/graphql",
@@ -2,14 +2,23 @@ from inspect import getdoc
 
 import strawberry
 from lcacollect_config.permissions import IsAuthenticated
+from strawberry.extensions import QueryDepthLimiter
 
 import schema.account as schema_account
+import schema.changes as schema_changes
+import schema.events as schema_events
 import schema.group as schema_group
 import schema.member as schema_member
 import schema.project as schema_project
 import schema.stage as schema_stage
+from core.config import settings
+from core.cost import QueryCostExtension
 from core.federation import GraphQLComment, GraphQLProjectSource, GraphQLTask
+from core.metrics import MetricsExtension
 from core.permissions import IsProjectMember
+from core.replica import ReadReplicaExtension
+from core.statements import StatementCounterExtension
+from core.tracing import TracingExtension
 
 
 @strawberry.type
@@ -27,6 +36,21 @@ class Query:
         resolver=schema_project.projects_query,
         description=getdoc(schema_project.projects_query),
     )
+    search_projects: list[schema_project.GraphQLProject] = strawberry.field(
+        permission_classes=[IsAuthenticated],
+        resolver=schema_project.search_projects_query,
+        description=getdoc(schema_project.search_projects_query),
+    )
+    project_statistics: list[schema_project.GraphQLProjectStatistics] = strawberry.field(
+        permission_classes=[IsAuthenticated],
+        resolver=schema_project.project_statistics_query,
+        description=getdoc(schema_project.project_statistics_query),
+    )
+    project_changes_since: schema_changes.GraphQLProjectChanges = strawberry.field(
+        permission_classes=[IsAuthenticated],
+        resolver=schema_changes.project_changes_since_query,
+        description=getdoc(schema_changes.project_changes_since_query),
+    )
     project_members: list[schema_member.GraphQLProjectMember] = strawberry.field(
         permission_classes=[IsProjectMember],
         resolver=schema_member.project_members_query,
@@ -75,6 +99,11 @@ class Mutation:
         resolver=schema_member.add_project_member_mutation,
         description=getdoc(schema_member.add_project_member_mutation),
     )
+    add_project_members: list[schema_member.GraphQLAddProjectMemberResult] = strawberry.mutation(
+        permission_classes=[IsProjectMember],
+        resolver=schema_member.add_project_members_mutation,
+        description=getdoc(schema_member.add_project_members_mutation),
+    )
     delete_project_member: str = strawberry.mutation(
         permission_classes=[IsAuthenticated],
         resolver=schema_member.delete_project_member_mutation,
@@ -92,6 +121,11 @@ class Mutation:
         resolver=schema_stage.delete_project_stage_mutation,
         description=getdoc(schema_stage.delete_project_stage_mutation),
     )
+    set_project_stages: list[schema_stage.GraphQLProjectStage] = strawberry.mutation(
+        permission_classes=[IsProjectMember],
+        resolver=schema_stage.set_project_stages_mutation,
+        description=getdoc(schema_stage.set_project_stages_mutation),
+    )
 
     # Project Groups
     add_project_group: schema_group.GraphQLProjectGroup = strawberry.field(
@@ -123,9 +157,32 @@ class Mutation:
     )
 
 
+@strawberry.type
+class Subscription:
+
+    """GraphQL Subscriptions"""
+
+    project_events: schema_events.GraphQLProjectEvent = strawberry.subscription(
+        resolver=schema_events.project_events_subscription,
+        description=getdoc(schema_events.project_events_subscription),
+    )
+
+
+extensions = [
+    MetricsExtension,
+    StatementCounterExtension,
+    QueryDepthLimiter(max_depth=settings.GRAPHQL_MAX_DEPTH),
+    QueryCostExtension,
+    ReadReplicaExtension,
+]
+if settings.TRACING_EXPORTER != "none":
+    extensions.append(TracingExtension)
+
 schema = strawberry.federation.Schema(
     query=Query,
     mutation=Mutation,
+    subscription=Subscription,
     enable_federation_2=True,
     types=[GraphQLTask, GraphQLProjectSource, GraphQLComment],
+    extensions=extensions,
 )
@@ -1,11 +1,6 @@
 import datetime
 
 import strawberry
-from azure.storage.blob import (
-    BlobSasPermissions,
-    BlobServiceClient,
-    generate_container_sas,
-)
 from lcacollect_config.context import get_user
 from strawberry.types import Info
 
@@ -43,6 +38,13 @@ async def account_query(info: Info) -> GraphQLUserAccount:
 def create_service_sas_blob() -> str:
     """Create a service SAS token to access a blob"""
 
+    # The blob SDK is slow to import and only needed when a token is requested
+    from azure.storage.blob import (
+        BlobSasPermissions,
+        BlobServiceClient,
+        generate_container_sas,
+    )
+
     start_time = datetime.datetime.now(datetime.timezone.utc)
     expiry_time = start_time + datetime.timedelta(hours=1)
 
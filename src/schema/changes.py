@@ -0,0 +1,139 @@
+import base64
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Optional
+
+import strawberry
+from lcacollect_config.context import get_session, get_user
+from lcacollect_config.validate import is_super_admin
+from sqlalchemy import String, and_, cast, false, literal, null, or_, true, union_all
+from sqlmodel import col, func, select
+from sqlmodel.sql.expression import Select
+from strawberry.types import Info
+
+import models.group as models_group
+import models.member as models_member
+import models.project as models_project
+import models.stage as models_stage
+import models.tracking as models_tracking
+from core.config import settings
+from schema.project import user_has_access
+
+
+@strawberry.enum
+class ChangedEntity(Enum):
+    PROJECT = "project"
+    MEMBER = "projectmember"
+    GROUP = "projectgroup"
+    STAGE = "projectstage"
+    GROUP_MEMBER = "membergrouplink"
+
+
+@strawberry.type
+class GraphQLChange:
+    entity: ChangedEntity
+    id: str = strawberry.field(
+        description="Id of the changed row. Stages are identified by stage id, and group members by member id:group id"
+    )
+    project_id: str | None
+    changed_at: datetime
+    deleted: bool
+
+
+@strawberry.type
+class GraphQLProjectChanges:
+    cursor: str = strawberry.field(description="Pass to projectChangesSince to get the next changes")
+    changes: list[GraphQLChange]
+
+
+async def project_changes_since_query(info: Info, cursor: Optional[str] = None) -> GraphQLProjectChanges:
+    """
+    Query what changed in the Projects user has access to, including their members, groups and stages, since the
+    cursor of a previous query. Without a cursor, all Projects are returned.
+    Changes close to the cursor may be returned again, so they can be applied more than once.
+    """
+
+    session = get_session(info)
+    user = get_user(info)
+
+    now = (await session.exec(select(func.now()))).one()
+    since = decode_cursor(cursor) - timedelta(seconds=settings.CHANGES_CURSOR_OVERLAP_SECONDS) if cursor else None
+
+    project = models_project.Project
+    member = models_member.ProjectMember
+    group = models_group.ProjectGroup
+    stage = models_stage.ProjectStage
+    link = models_group.MemberGroupLink
+    tombstone = models_tracking.Tombstone
+    queries = [
+        changes_of(literal("project"), project.id, project.id, project.updated_at, since),
+        changes_of(literal("projectmember"), member.id, member.project_id, member.updated_at, since),
+        changes_of(literal("projectgroup"), group.id, group.project_id, group.updated_at, since),
+        changes_of(literal("projectstage"), stage.stage_id, stage.project_id, stage.updated_at, since),
+        changes_of(
+            literal("membergrouplink"), link.member_id + ":" + link.group_id, group.project_id, link.updated_at, since
+        ).join(group, col(group.id) == link.group_id),
+        changes_of(
+            tombstone.entity,
+            tombstone.entity_id,
+            tombstone.project_id,
+            tombstone.deleted_at,
+            since,
+            deleted=true(),
+            user_id=tombstone.user_id,
+        ),
+    ]
+    changes = union_all(*queries).subquery()
+
+    query = select(changes).order_by(changes.c.changed_at)
+    if not is_super_admin(user):
+        accessible_projects = select(project.id).where(user_has_access(user))
+        # deleted projects have no members left to check access with, and removed members no access
+        query = query.where(
+            or_(
+                col(changes.c.project_id).in_(accessible_projects),
+                and_(changes.c.entity == "project", changes.c.deleted == true()),
+                changes.c.user_id == user.claims.get("oid"),
+            )
+        )
+
+    return GraphQLProjectChanges(
+        cursor=encode_cursor(now),
+        changes=[
+            GraphQLChange(
+                entity=ChangedEntity(change.entity),
+                id=change.id,
+                project_id=change.project_id,
+                changed_at=change.changed_at,
+                deleted=change.deleted,
+            )
+            for change in (await session.execute(query)).all()
+        ],
+    )
+
+
+def changes_of(
+    entity, row_id, project_id, changed_at, since: datetime | None, deleted=false(), user_id=null()
+) -> Select:
+    query = select(
+        entity.label("entity"),
+        row_id.label("id"),
+        project_id.label("project_id"),
+        changed_at.label("changed_at"),
+        deleted.label("deleted"),
+        cast(user_id, String).label("user_id"),
+    )
+    if since:
+        query = query.where(changed_at > since)
+    return query
+
+
+def encode_cursor(timestamp: datetime) -> str:
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode()
+
+
+def decode_cursor(cursor: str) -> datetime:
+    try:
+        return datetime.fromisoformat(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
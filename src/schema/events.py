@@ -0,0 +1,62 @@
+from dataclasses import asdict
+from enum import Enum
+from typing import AsyncGenerator
+
+import strawberry
+from lcacollect_config.context import get_user
+from lcacollect_config.exceptions import AuthenticationError
+from lcacollect_config.validate import is_super_admin
+from strawberry.types import Info
+
+from core.connection import local_session
+from core.invalidation import Event, MemberRemoved, ProjectDeleted
+from core.permissions import has_project_access
+from core.subscriptions import project_events
+from core.validate import project_exists
+
+
+@strawberry.enum
+class ProjectEventType(Enum):
+    PROJECT_UPDATED = "ProjectUpdated"
+    PROJECT_DELETED = "ProjectDeleted"
+    MEMBER_ADDED = "MemberAdded"
+    MEMBER_REMOVED = "MemberRemoved"
+    GROUP_CHANGED = "GroupChanged"
+    STAGE_ADDED = "StageAdded"
+    STAGE_REMOVED = "StageRemoved"
+
+
+@strawberry.type
+class GraphQLProjectEvent:
+    type: ProjectEventType
+    project_id: str
+    user_id: str | None = None
+    group_id: str | None = None
+    stage_id: str | None = None
+
+    @classmethod
+    def from_event(cls, event: Event) -> "GraphQLProjectEvent":
+        return cls(type=ProjectEventType(type(event).__name__), **asdict(event))
+
+
+async def project_events_subscription(info: Info, project_id: str) -> AsyncGenerator[GraphQLProjectEvent, None]:
+    """
+    Subscribe to the changes of a Project, its members, groups and stages.
+    The subscription ends when the Project is deleted or the user is removed from it.
+    """
+
+    user = get_user(info)
+    if not user:
+        raise AuthenticationError("User is not authenticated")
+    user_id = user.claims.get("oid")
+
+    # a subscription outlives its request, so it does not hold a database session while it waits for events
+    async with local_session() as session:
+        await project_exists(session, project_id)
+        if not is_super_admin(user) and not await has_project_access(session, project_id, user_id):
+            raise AuthenticationError("User is not authenticated")
+
+    async for event in project_events(project_id):
+        yield GraphQLProjectEvent.from_event(event)
+        if isinstance(event, ProjectDeleted) or (isinstance(event, MemberRemoved) and event.user_id == user_id):
+            return
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import TYPE_CHECKING, Annotated, Optional
 
 import strawberry
@@ -12,6 +13,8 @@ from strawberry.types import Info
 
 import models.group as models_group
 import models.member as models_member
+from core.invalidation import GroupChanged, publish
+from core.metrics import observe_outbound
 from core.validate import authenticate_user, project_exists
 from schema.inputs import ProjectGroupFilters
 
@@ -27,6 +30,8 @@ class GraphQLProjectGroup:
     lead: Annotated["GraphQLProjectMember", strawberry.lazy("schema.member")] | None
     members: list[Annotated["GraphQLProjectMember", strawberry.lazy("schema.member")]] | None
     project_id: str
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
 
 
 async def get_project_groups_query(
@@ -66,6 +71,7 @@ async def add_project_group_mutation(
 
     session.add(group)
     await session.commit()
+    await publish(GroupChanged(project_id=project_id, group_id=group.id))
 
     query = select(models_group.ProjectGroup).where(
         models_group.ProjectGroup.project_id == project_id,
@@ -96,6 +102,7 @@ async def update_project_group_mutation(
 
     session.add(group)
     await session.commit()
+    await publish(GroupChanged(project_id=group.project_id, group_id=id))
 
     query = select(models_group.ProjectGroup).where(models_group.ProjectGroup.id == id)
     query = graphql_group_options(info, query)
@@ -112,8 +119,10 @@ async def delete_project_group_mutation(info: Info, id: str) -> str:
     if not group:
         raise DatabaseItemNotFound(f"Could not find a project group with id: {id}")
     _ = await authenticate_user(info, group.project_id)
+    event = GroupChanged(project_id=group.project_id, group_id=id)
     await session.delete(group)
     await session.commit()
+    await publish(event)
     return id
 
 
@@ -143,6 +152,7 @@ async def add_project_members_to_group_mutation(
 
     session.add(group)
     await session.commit()
+    await publish(GroupChanged(project_id=group.project_id, group_id=group_id))
     await session.refresh(group)
 
     return await handle_members_and_lead(info, group)
@@ -178,6 +188,7 @@ async def remove_project_members_from_group_mutation(
 
     session.add(group)
     await session.commit()
+    await publish(GroupChanged(project_id=group.project_id, group_id=group_id))
     await session.refresh(group)
 
     lead = await session.get(models_member.ProjectMember, group.lead_id)
@@ -215,8 +226,7 @@ def graphql_group_options(info: Info, query: Select) -> Select:
 async def handle_members_and_lead(info: Info, group: models_group.ProjectGroup):
     """Handle fetching data about lead and project members, if it is required in the query/mutation"""
 
-    from lcacollect_config.user import get_users_from_azure
-
+    from core.users import get_users_from_azure
     from schema.member import GraphQLProjectMember, get_user_info
 
     session = get_session(info)
@@ -244,7 +254,8 @@ async def handle_members_and_lead(info: Info, group: models_group.ProjectGroup):
                     for selection in field.selections
                 ]
             ):
-                users = await get_users_from_azure([member.user_id for member in members])
+                with observe_outbound("graph", "get_users"):
+                    users = await get_users_from_azure([member.user_id for member in members])
                 members = [
                     GraphQLProjectMember(
                         id=member.id,
@@ -270,7 +281,8 @@ async def handle_members_and_lead(info: Info, group: models_group.ProjectGroup):
                 for selection in field.selections
             ]
         ):
-            users = await get_users_from_azure(lead.user_id)
+            with observe_outbound("graph", "get_users"):
+                users = await get_users_from_azure(lead.user_id)
             lead = GraphQLProjectMember(
                 id=lead.id,
                 project_id=lead.project_id,
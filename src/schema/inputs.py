@@ -2,6 +2,7 @@ from typing import Optional
 
 import strawberry
 from lcacollect_config.graphql.input_filters import BaseFilter, FilterOptions
+from strawberry.scalars import JSON
 
 
 @strawberry.input
@@ -13,12 +14,27 @@ class ProjectMemberFilters(BaseFilter):
     company: Optional[FilterOptions] = None
 
 
+@strawberry.input
+class MetaFieldInput:
+    key: str
+    value: JSON
+
+
+@strawberry.input
+class MetaFieldsFilterOptions(FilterOptions):
+    """Filters on the meta fields of a Project. All but the string filters can use an index."""
+
+    has_key: Optional[str] = None
+    key_values: Optional[list[MetaFieldInput]] = None
+    contains_object: Optional[JSON] = None
+
+
 @strawberry.input
 class ProjectFilters(BaseFilter):
     name: Optional[FilterOptions] = None
     project_id: Optional[FilterOptions] = None
     id: Optional[FilterOptions] = None
-    meta_fields: Optional[FilterOptions] = None
+    meta_fields: Optional[MetaFieldsFilterOptions] = None
 
 
 @strawberry.input
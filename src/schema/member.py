@@ -1,16 +1,15 @@
+import asyncio
 from datetime import date
 from typing import TYPE_CHECKING, Annotated, Optional
 
 import strawberry
 from fastapi import HTTPException
 from lcacollect_config.context import get_session
-from lcacollect_config.email import EmailType, send_email
+from lcacollect_config.email import EmailType
+from lcacollect_config.formatting import string_uuid
 from lcacollect_config.graphql.input_filters import filter_model_query
-from lcacollect_config.user import (
-    get_aad_user_by_email,
-    get_users_from_azure,
-    invite_user_to_aad,
-)
+from lcacollect_config.user import invite_user_to_aad
+from sqlalchemy import insert
 from sqlalchemy.orm import selectinload
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -20,7 +19,12 @@ from strawberry.types import Info
 import models.group as models_group
 import models.member as models_member
 import models.project as models_project
+from core.invalidation import MemberAdded, MemberRemoved, publish
+from core.metrics import observe_outbound
+from core.outbox import enqueue_email
+from core.users import get_aad_users_by_email, get_users_from_azure, run_graph
 from core.validate import authenticate_user, project_exists
+from exceptions import MSGraphException
 from schema.inputs import ProjectMemberFilters
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -41,6 +45,20 @@ class GraphQLProjectMember:
     project_id: strawberry.ID
 
 
+@strawberry.input
+class AddProjectMemberInput:
+    name: str
+    email: str
+    project_group_ids: list[str] = strawberry.field(default_factory=list)
+
+
+@strawberry.type
+class GraphQLAddProjectMemberResult:
+    email: str
+    member: GraphQLProjectMember | None = None
+    error: str | None = None
+
+
 async def project_members_query(
     info: Info, project_id: str, filters: Optional[ProjectMemberFilters] = None
 ) -> list[GraphQLProjectMember]:
@@ -63,15 +81,22 @@ async def project_members_query(
 
     members = (await session.exec(query)).all()
 
-    if not members:
-        return []
+    return await graphql_project_members(members)
 
-    user_ids = [member.user_id for member in members]
 
-    if not user_ids:
+async def graphql_project_members(members: list[models_member.ProjectMember]) -> list[GraphQLProjectMember]:
+    """
+    Convert Project Members into GraphQLProjectMembers.
+    The users of all the members are fetched from Azure in a single batch.
+    `leader_of` and `project_groups` have to be loaded on the members beforehand.
+    """
+
+    if not members:
         return []
 
-    users = await get_users_from_azure(user_ids)
+    user_ids = list(dict.fromkeys(member.user_id for member in members))
+    with observe_outbound("graph", "get_users"):
+        users = await get_users_from_azure(user_ids)
 
     return [
         GraphQLProjectMember(
@@ -108,11 +133,16 @@ async def add_project_member_mutation(
     request: Request = info.context.get("request")
     origin_url = request.headers.get("origin")
     # check if user exists in organization's Azure Active Directory tenant
-    user = await get_aad_user_by_email(email)
+    with observe_outbound("graph", "get_user_by_email"):
+        users, errors = await get_aad_users_by_email([email])
+    if email in errors:
+        raise HTTPException(500, errors[email])
+    user = users[email]
     user_id = user.get("id")
     if not user_id:
-        # if doesn't exist - invite user to organization's AD
-        response = invite_user_to_aad(email, name, origin_url)
+        # if doesn't exist - invite user to organization's AD, without blocking the event loop
+        with observe_outbound("graph", "invite_user"):
+            response = await run_graph(invite_user_to_aad, email, name, origin_url)
         if not response.ok:
             raise HTTPException(500, f"Unable to add user to Azure AD: {response.text}")
         data: dict = response.json()
@@ -142,17 +172,15 @@ async def add_project_member_mutation(
     project_member = models_member.ProjectMember(user_id=user_id, project_id=project_id, project_groups=groups)
 
     session.add(project_member)
-
-    await session.commit()
-
     project = await session.get(models_project.Project, project_id)
+    # the email notification is sent from the outbox once the member is committed
+    enqueue_email(session, email, EmailType.INVITE_TO_LCA, project_name=project.name, url=origin_url)
 
-    # send email notification
-    info.context["background_tasks"].add_task(
-        send_email, email, EmailType.INVITE_TO_LCA, **{"project_name": project.name, "url": origin_url}
-    )
+    await session.commit()
+    await publish(MemberAdded(project_id=project_id, user_id=user_id))
 
-    user = await get_users_from_azure(user_id)
+    with observe_outbound("graph", "get_users"):
+        user = await get_users_from_azure(user_id)
 
     gql_pm = GraphQLProjectMember(
         id=project_member.id,
@@ -169,6 +197,99 @@ async def delete_project_member_mutation(info: Info, id: str) -> str:
     session = info.context.get("session")
     project_member = await session.get(models_member.ProjectMember, id)
     _ = await authenticate_user(info, project_member.project_id)
+    event = MemberRemoved(project_id=project_member.project_id, user_id=project_member.user_id)
     await session.delete(project_member)
     await session.commit()
+    await publish(event)
     return id
+
+
+async def add_project_members_mutation(
+    info: Info, project_id: str, members: list[AddProjectMemberInput]
+) -> list[GraphQLAddProjectMemberResult]:
+    """
+    Add several Project Members. The users are looked up in Azure AD together, and only the unknown ones are invited.
+    Returns the added member or the error of each email.
+    """
+
+    session: AsyncSession = info.context.get("session")
+    await project_exists(session, project_id)
+    origin_url = info.context.get("request").headers.get("origin")
+
+    members = list({member.email: member for member in members}.values())
+    with observe_outbound("graph", "get_users_by_email"):
+        users, errors = await get_aad_users_by_email([member.email for member in members])
+    user_ids = {member.email: users[member.email].get("id") for member in members if member.email in users}
+
+    async def invite(member: AddProjectMemberInput):
+        try:
+            with observe_outbound("graph", "invite_user"):
+                response = await run_graph(invite_user_to_aad, member.email, member.name, origin_url)
+            if not response.ok:
+                raise MSGraphException(f"Unable to add user to Azure AD: {response.text}")
+            if not (user_id := response.json().get("invitedUser", {}).get("id")):
+                raise MSGraphException(f"Failed to fetch user_id value from invitation response: {response.text}")
+            user_ids[member.email] = user_id
+        except Exception as error:
+            errors[member.email] = str(error)
+
+    await asyncio.gather(
+        *(invite(member) for member in members if member.email in users and not user_ids[member.email])
+    )
+
+    query = select(models_member.ProjectMember.user_id).where(
+        models_member.ProjectMember.project_id == project_id,
+        col(models_member.ProjectMember.user_id).in_([user_id for user_id in user_ids.values() if user_id]),
+    )
+    existing = set((await session.exec(query)).all())
+    added: dict[str, dict] = {}
+    for member in members:
+        if member.email in errors:
+            continue
+        if user_ids[member.email] in existing:
+            errors[member.email] = f"Member with email '{member.email}' already exists"
+            continue
+        existing.add(user_ids[member.email])
+        added[member.email] = {"id": string_uuid(), "user_id": user_ids[member.email], "project_id": project_id}
+
+    graphql_members = {}
+    if added:
+        group_ids = {group_id for member in members if member.email in added for group_id in member.project_group_ids}
+        query = select(models_group.ProjectGroup.id).where(
+            models_group.ProjectGroup.project_id == project_id, col(models_group.ProjectGroup.id).in_(group_ids)
+        )
+        project_group_ids = set((await session.exec(query)).all())
+        links = [
+            {"member_id": added[member.email]["id"], "group_id": group_id}
+            for member in members
+            if member.email in added
+            for group_id in dict.fromkeys(member.project_group_ids)
+            if group_id in project_group_ids
+        ]
+
+        await session.execute(insert(models_member.ProjectMember).values(list(added.values())))
+        if links:
+            await session.execute(insert(models_group.MemberGroupLink).values(links))
+        project = await session.get(models_project.Project, project_id)
+        for email in added:
+            enqueue_email(session, email, EmailType.INVITE_TO_LCA, project_name=project.name, url=origin_url)
+        await session.commit()
+        await publish(*[MemberAdded(project_id=project_id, user_id=member["user_id"]) for member in added.values()])
+
+        query = (
+            select(models_member.ProjectMember)
+            .where(col(models_member.ProjectMember.id).in_([member["id"] for member in added.values()]))
+            .options(selectinload(models_member.ProjectMember.leader_of))
+            .options(selectinload(models_member.ProjectMember.project_groups))
+        )
+        members_added = (await session.exec(query)).all()
+        graphql_members = {member.id: member for member in await graphql_project_members(members_added)}
+
+    return [
+        GraphQLAddProjectMemberResult(
+            email=member.email,
+            member=graphql_members.get(added.get(member.email, {}).get("id")),
+            error=errors.get(member.email),
+        )
+        for member in members
+    ]
@@ -1,28 +1,34 @@
 import base64
+import json
 import logging
+from collections import defaultdict
+from datetime import datetime
 from enum import Enum
 from hashlib import sha256
 from typing import Optional
 
 import strawberry
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
-from azure.storage.blob.aio import BlobClient
 from lcacollect_config.context import get_session, get_token, get_user
 from lcacollect_config.exceptions import AuthenticationError, DatabaseItemNotFound
-from lcacollect_config.graphql.input_filters import FilterOptions, filter_model_query
+from lcacollect_config.graphql.input_filters import filter_model_query
 from lcacollect_config.validate import is_super_admin
+from opentelemetry.trace import SpanKind
+from sqlalchemy import Text, cast, inspect, literal, literal_column, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import selectinload
-from sqlmodel import col, or_, select
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import col, func, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import SelectOfScalar
 from strawberry.scalars import JSON
 from strawberry.types import Info
 
+import models.group as models_group
 import models.member as models_member
 import models.project as models_project
 import models.stage as models_stage
 import schema.group as schema_group
-import schema.member
 import schema.member as schema_member
 from core.config import settings
 from core.federation import (
@@ -35,8 +41,10 @@ from core.federation import (
     get_project_sources,
     get_reporting_schema,
 )
+from core.invalidation import ProjectDeleted, ProjectUpdated, publish
+from core.tracing import tracer
 from schema.directives import Keys
-from schema.inputs import ProjectFilters, ProjectMemberFilters
+from schema.inputs import MetaFieldsFilterOptions, ProjectFilters
 from schema.stage import GraphQLProjectStage
 
 logger = logging.getLogger(__name__)
@@ -63,12 +71,23 @@ class GraphQLProject:
     image_url: str | None
     public: bool
     meta_fields: Optional[JSON]
+    created_at: datetime
+    updated_at: datetime
 
     groups: list[schema_group.GraphQLProjectGroup] | None
     stages: list[GraphQLProjectStage] | None
     members: list[schema_member.GraphQLProjectMember] | None
 
 
+@strawberry.type
+class GraphQLProjectStatistics:
+    project_id: str
+    member_count: int
+    group_count: int
+    stage_count: int
+    last_modified: datetime
+
+
 @strawberry.input
 class ProjectMemberInput:
     user_id: str
@@ -109,7 +128,126 @@ async def projects_query(info: Info, filters: Optional[ProjectFilters] = None) -
 
     if filters:
         query = filter_model_query(models_project.Project, filters, query)
+        if filters.meta_fields:
+            query = filter_meta_fields(filters.meta_fields, query)
     authorized_projects = (await session.exec(query)).all()
+    return await graphql_projects(info, authorized_projects)
+
+
+def filter_meta_fields(options: MetaFieldsFilterOptions, query: SelectOfScalar) -> SelectOfScalar:
+    """Filter on the meta fields of Projects, which are JSONB and therefore skipped by `filter_model_query`"""
+
+    meta_fields = col(models_project.Project.meta_fields)
+    if options.json_contains:
+        # compared as JSON, so booleans and nulls match their stored values, and @> can use the index
+        try:
+            query = query.where(meta_fields.contains(json.loads(options.json_contains)))
+        except json.decoder.JSONDecodeError:
+            pass
+    if options.has_key:
+        query = query.where(meta_fields.has_key(options.has_key))
+    if options.key_values:
+        query = query.where(meta_fields.contains({field.key: field.value for field in options.key_values}))
+    if options.contains_object is not None:
+        query = query.where(meta_fields.contains(options.contains_object))
+    return query
+
+
+async def search_projects_query(info: Info, query: str, limit: int = 20) -> list[GraphQLProject]:
+    """
+    Search the Projects user has access to by name, project id, client, address, city and country.
+    Projects matching the words of the query are ranked first, followed by projects containing it in any field.
+    """
+
+    session = get_session(info)
+    user = get_user(info)
+
+    ts_query = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), cast(query, Text))
+    statement = (
+        select(models_project.Project)
+        .where(
+            or_(
+                models_project.search_vector.op("@@")(ts_query),
+                models_project.search_text.ilike(f"%{escape_like(query)}%", escape="\\"),
+            )
+        )
+        .order_by(func.ts_rank(models_project.search_vector, ts_query).desc(), models_project.Project.name)
+        .limit(limit)
+    )
+    if not is_super_admin(user):
+        statement = statement.where(user_has_access(user))
+
+    statement = await graphql_project_options(info, statement)
+    projects = (await session.exec(statement)).all()
+    return await graphql_projects(info, projects)
+
+
+def user_has_access(user) -> ColumnElement:
+    """Condition on Projects that are public or have the user as a member"""
+
+    member_projects = select(models_member.ProjectMember.project_id).where(
+        models_member.ProjectMember.user_id == user.claims.get("oid")
+    )
+    return or_(models_project.Project.public == True, col(models_project.Project.id).in_(member_projects))
+
+
+async def project_statistics_query(info: Info, project_ids: list[str]) -> list[GraphQLProjectStatistics]:
+    """
+    Count the members, groups and stages of the Projects user has access to, without fetching them.
+    Projects the user has no access to are left out.
+    """
+
+    session = get_session(info)
+    user = get_user(info)
+
+    def counts(model):
+        return (
+            select(model.project_id, func.count().label("count"))
+            .where(col(model.project_id).in_(project_ids))
+            .group_by(model.project_id)
+            .subquery()
+        )
+
+    members = counts(models_member.ProjectMember)
+    groups = counts(models_group.ProjectGroup)
+    stages = counts(models_stage.ProjectStage)
+    query = (
+        select(
+            models_project.Project.id,
+            func.coalesce(members.c.count, 0),
+            func.coalesce(groups.c.count, 0),
+            func.coalesce(stages.c.count, 0),
+            models_project.Project.updated_at,
+        )
+        .outerjoin(members, members.c.project_id == models_project.Project.id)
+        .outerjoin(groups, groups.c.project_id == models_project.Project.id)
+        .outerjoin(stages, stages.c.project_id == models_project.Project.id)
+        .where(col(models_project.Project.id).in_(project_ids))
+    )
+    if not is_super_admin(user):
+        query = query.where(user_has_access(user))
+
+    return [
+        GraphQLProjectStatistics(
+            project_id=project_id,
+            member_count=member_count,
+            group_count=group_count,
+            stage_count=stage_count,
+            last_modified=last_modified,
+        )
+        for project_id, member_count, group_count, stage_count, last_modified in (await session.exec(query)).all()
+    ]
+
+
+def escape_like(value: str) -> str:
+    """Match the characters of a LIKE pattern literally"""
+
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def graphql_projects(info: Info, authorized_projects: list[models_project.Project]) -> list[GraphQLProject]:
+    """Add the members from Azure AD to the Projects, when they are selected"""
+
     if not authorized_projects:
         return []
 
@@ -117,26 +255,14 @@ async def projects_query(info: Info, filters: Optional[ProjectFilters] = None) -
         any(selection.name in "members" for field in info.selected_fields for selection in field.selections)
         and authorized_projects[0].members is not None
     ):
-        updated_projects = []
-        for project in authorized_projects:
-            member_ids = list({member.id for member in project.members})
-            project_members = []
-            for member_id in member_ids:
-                project_member = await schema.member.project_members_query(
-                    info,
-                    project.id,
-                    filters=ProjectMemberFilters(user_id=FilterOptions(contains=member_id)),
-                )
-                project_members.append(project_member)
-            updated_projects.append(
-                GraphQLProject(
-                    **project.dict(),
-                    members=project_members,
-                    groups=project.groups,
-                    stages=project.stages,
-                )
-            )
-        return updated_projects
+        project_members = await schema_member.graphql_project_members(
+            [member for project in authorized_projects for member in project.members]
+        )
+        members_by_project = defaultdict(list)
+        for project_member in project_members:
+            members_by_project[project_member.project_id].append(project_member)
+
+        return [graphql_project(project, members=members_by_project[project.id]) for project in authorized_projects]
 
     return authorized_projects
 
@@ -234,19 +360,11 @@ async def update_project_mutation(
 
     session = await authenticate_user(id, info)
 
-    if meta_fields is None:
-        meta_fields = {}
-
-    project = await session.get(models_project.Project, id)
-    if not project:
-        raise DatabaseItemNotFound(f"Could not find project with id: {id}")
-
     kwargs = {
         "name": name,
         "project_id": project_id,
         "client": client,
         "domain": domain.name if domain else None,
-        "meta_fields": meta_fields,
         "address": address,
         "city": city,
         "country": country,
@@ -256,44 +374,36 @@ async def update_project_mutation(
         image_url = await handle_file_upload(file)
         kwargs["image_url"] = image_url
 
-    for key, value in kwargs.items():
-        if value is not None and key != "meta_fields":
-            setattr(project, key, value)
-        elif value and key == "meta_fields":
-            fields = {**project.meta_fields, **value}
-            project.meta_fields = fields
-
-    session.add(project)
+    values = {key: value for key, value in kwargs.items() if value is not None}
+    if meta_fields:
+        # merged by Postgres, so concurrent updates of different fields are not lost
+        values["meta_fields"] = col(models_project.Project.meta_fields).op("||")(literal(meta_fields, JSONB))
+
+    # an update without values still reports whether the project exists
+    statement = (
+        update(models_project.Project)
+        .where(col(models_project.Project.id) == id)
+        .values(**(values or {"id": id}))
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(statement)
+    if not result.rowcount:
+        raise DatabaseItemNotFound(f"Could not find project with id: {id}")
 
     await session.commit()
-    await session.refresh(project)
+    await publish(ProjectUpdated(project_id=id))
     query = (
         select(models_project.Project)
         .options(selectinload(models_project.Project.groups))
         .options(selectinload(models_project.Project.stages))
-        .options(selectinload(models_project.Project.members))
-        .where(models_project.Project.id == project.id)
+        .options(selectinload(models_project.Project.members).options(*member_relationship_options()))
+        .where(models_project.Project.id == id)
+        .execution_options(populate_existing=True)
     )
     project: models_project.Project = (await session.exec(query)).first()
 
-    member_ids = list({member.id for member in project.members})
-    if member_ids:
-        project_members = []
-        for member_id in member_ids:
-            project_member = await schema.member.project_members_query(
-                info,
-                project.id,
-                filters=ProjectMemberFilters(user_id=FilterOptions(contains=member_id)),
-            )
-            project_members.append(project_member)
-    else:
-        project_members = None
-    return GraphQLProject(
-        **project.dict(),
-        members=project_members,
-        groups=project.groups,
-        stages=project.stages,
-    )
+    project_members = await schema_member.graphql_project_members(project.members) if project.members else None
+    return graphql_project(project, members=project_members)
 
 
 async def delete_project_mutation(info: Info, id: str) -> str:
@@ -312,6 +422,7 @@ async def delete_project_mutation(info: Info, id: str) -> str:
 
     await session.delete(project)
     await session.commit()
+    await publish(ProjectDeleted(project_id=id))
     return id
 
 
@@ -365,6 +476,9 @@ async def upload_to_storage_account(data: str | bytes) -> str:
     where sha256 is sha256 hash of the input string
     """
 
+    # The blob SDK is slow to import and only needed for uploads
+    from azure.storage.blob.aio import BlobClient
+
     if not isinstance(data, bytes):
         data = data.encode()
     hash_str = sha256(data).hexdigest()
@@ -376,16 +490,17 @@ async def upload_to_storage_account(data: str | bytes) -> str:
         credential=settings.STORAGE_ACCESS_KEY,
         blob_name=filepath,
     ) as blob:
-        try:
-            await blob.upload_blob(data)
-        except ResourceExistsError:
-            return filepath
-        except ResourceNotFoundError as error:
-            logger.error(
-                f"Could not upload file to Azure Storage Container: "
-                f"{settings.STORAGE_ACCOUNT_URL}/{settings.STORAGE_CONTAINER_NAME}"
-            )
-            raise
+        with tracer.start_as_current_span("blob upload", kind=SpanKind.CLIENT, attributes={"blob.name": filepath}):
+            try:
+                await blob.upload_blob(data)
+            except ResourceExistsError:
+                return filepath
+            except ResourceNotFoundError as error:
+                logger.error(
+                    f"Could not upload file to Azure Storage Container: "
+                    f"{settings.STORAGE_ACCOUNT_URL}/{settings.STORAGE_CONTAINER_NAME}"
+                )
+                raise
 
     return filepath
 
@@ -423,7 +538,7 @@ async def graphql_project_options(info: Info, query: SelectOfScalar) -> SelectOf
     Returns: updated query
     """
 
-    if project_field := [field for field in info.selected_fields if field.name == "projects"]:
+    if project_field := [field for field in info.selected_fields if field.name in ("projects", "searchProjects")]:
         if stage_field := [field for field in project_field[0].selections if field.name == "stages"]:
             if [field for field in stage_field[0].selections if field.name == "phase"]:
                 query = query.options(
@@ -436,6 +551,27 @@ async def graphql_project_options(info: Info, query: SelectOfScalar) -> SelectOf
             query = query.options(selectinload(models_project.Project.groups))
 
         if [field for field in project_field[0].selections if field.name == "members"]:
-            query = query.options(selectinload(models_project.Project.members))
+            query = query.options(selectinload(models_project.Project.members).options(*member_relationship_options()))
 
     return query
+
+
+def member_relationship_options() -> list:
+    """Loader options for the relationships of a Project Member that are exposed in GraphQL"""
+
+    return [
+        selectinload(models_member.ProjectMember.leader_of),
+        selectinload(models_member.ProjectMember.project_groups),
+    ]
+
+
+def graphql_project(project: models_project.Project, members: list | None) -> GraphQLProject:
+    """Convert a Project into a GraphQLProject. Collections that have not been loaded are left out"""
+
+    unloaded = inspect(project).unloaded
+    return GraphQLProject(
+        **project.dict(),
+        members=members,
+        groups=project.groups if "groups" not in unloaded else None,
+        stages=project.stages if "stages" not in unloaded else None,
+    )
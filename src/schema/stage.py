@@ -1,12 +1,15 @@
 import strawberry
 from lcacollect_config.context import get_session
 from lcacollect_config.exceptions import DatabaseItemNotFound
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
-from sqlmodel import select
+from sqlmodel import col, select
 from strawberry.types import Info
 
 import models.project as models_project
 import models.stage as models_stage
+from core.invalidation import StageAdded, StageRemoved, publish
 from core.validate import project_exists
 
 
@@ -74,6 +77,7 @@ async def add_project_stage_mutation(info: Info, project_id: str, stage_id: str)
     project_stage = models_stage.ProjectStage(stage=life_cycle_stage, project=project)
     session.add(project_stage)
     await session.commit()
+    await publish(StageAdded(project_id=project_id, stage_id=stage_id))
 
     query = (
         select(models_stage.ProjectStage)
@@ -103,5 +107,50 @@ async def delete_project_stage_mutation(info: Info, project_id: str, stage_id: s
 
     await session.delete(stage)
     await session.commit()
+    await publish(StageRemoved(project_id=project_id, stage_id=stage_id))
 
     return stage_id
+
+
+async def set_project_stages_mutation(info: Info, project_id: str, stage_ids: list[str]) -> list[GraphQLProjectStage]:
+    """Set the life cycle stages of a project. Missing stages are added and the others removed in one transaction"""
+
+    session = get_session(info)
+    await project_exists(session, project_id)
+
+    project_stage = models_stage.ProjectStage
+    current = set(
+        (await session.exec(select(project_stage.stage_id).where(project_stage.project_id == project_id))).all()
+    )
+    added = [stage_id for stage_id in dict.fromkeys(stage_ids) if stage_id not in current]
+    removed = current - set(stage_ids)
+
+    if added:
+        query = select(models_stage.LifeCycleStage.id).where(col(models_stage.LifeCycleStage.id).in_(added))
+        if unknown := set(added) - set((await session.exec(query)).all()):
+            raise DatabaseItemNotFound(f"Life cycle stages with ids: {', '.join(sorted(unknown))} do not exist")
+        # stages added concurrently are left as they are
+        await session.execute(
+            insert(project_stage)
+            .values([{"project_id": project_id, "stage_id": stage_id} for stage_id in added])
+            .on_conflict_do_nothing()
+        )
+    if removed:
+        await session.execute(
+            delete(project_stage)
+            .where(project_stage.project_id == project_id)
+            .where(col(project_stage.stage_id).in_(removed))
+        )
+    await session.commit()
+    await publish(
+        *[StageAdded(project_id=project_id, stage_id=stage_id) for stage_id in added],
+        *[StageRemoved(project_id=project_id, stage_id=stage_id) for stage_id in sorted(removed)],
+    )
+
+    query = (
+        select(project_stage)
+        .where(project_stage.project_id == project_id)
+        .options(selectinload(project_stage.stage))
+        .execution_options(populate_existing=True)
+    )
+    return (await session.exec(query)).all()
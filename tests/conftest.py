@@ -1,9 +1,12 @@
 import time
+from contextlib import contextmanager
 from typing import Iterator
 
 import docker
 import lcacollect_config.security
+import lcacollect_config.user
 import pytest
+from aiocache import caches
 from asgi_lifespan import LifespanManager
 from fastapi import FastAPI
 from httpx import AsyncClient
@@ -11,6 +14,7 @@ from lcacollect_config.connection import create_postgres_engine
 from sqlmodel import SQLModel
 
 from core.config import settings
+from core.statements import track_statements
 
 
 @pytest.fixture(scope="session")
@@ -50,6 +54,16 @@ async def db(postgres) -> None:
         await conn.run_sync(SQLModel.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+async def clear_caches():
+    """Values cached by one test must not be returned in the next"""
+
+    await caches.get("default").clear()
+    await caches.get("azure_users").clear()
+    await lcacollect_config.user.cache.clear()
+    yield
+
+
 @pytest.fixture()
 def mock_azure_scheme(mocker):
     class ConfigClass:
@@ -66,17 +80,23 @@ def mock_azure_scheme(mocker):
         claims = {"oid": "someid0"}
         roles = []
 
+        async def __call__(self, request, security_scopes):
+            return self
+
     mocker.patch.object(
         lcacollect_config.security,
         "azure_scheme",
-        AzureScheme,
+        AzureScheme(),
     )
 
 
 @pytest.fixture()
-async def app(db, mock_azure_scheme) -> FastAPI:
+async def app(db, mock_azure_scheme, mocker) -> FastAPI:
     from main import app
 
+    # the outbox is dispatched by the tests sending emails
+    mocker.patch.object(settings, "EMAIL_DISPATCHER_IN_PROCESS", False)
+
     async with LifespanManager(app):
         yield app
 
@@ -94,3 +114,18 @@ async def client(app: FastAPI) -> Iterator[AsyncClient]:
             yield _client
         except Exception as exc:
             print(exc)
+
+
+@pytest.fixture()
+def max_statements():
+    """Assert an upper bound on the number of SQL statements executed within a block"""
+
+    @contextmanager
+    def _max_statements(limit: int):
+        with track_statements() as stats:
+            yield stats
+        assert (
+            stats.statements <= limit
+        ), f"Expected at most {limit} SQL statements, but {stats.statements} were executed"
+
+    yield _max_statements
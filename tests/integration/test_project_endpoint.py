@@ -1,10 +1,16 @@
+import asyncio
+
 import pytest
+from aiocache import caches
 from httpx import AsyncClient
 from pytest_httpx import HTTPXMock
+from sqlalchemy import event
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+import core.connection
 from core.config import settings
+from models.member import ProjectMember
 from models.project import Project
 
 
@@ -31,6 +37,384 @@ async def test_get_projects(client: AsyncClient, project_with_members):
     ]
 
 
+@pytest.mark.asyncio
+async def test_search_projects(client: AsyncClient, db):
+    async with AsyncSession(db) as session:
+        for name, city, client_name, user_id in [
+            ("Harbour Bath", "Copenhagen", "City of Copenhagen", "someid0"),
+            ("Copenhagen Office", "Aarhus", None, "someid0"),
+            ("Station", "Copenhagen", None, "someid1"),
+            ("School", "Odense", None, "someid0"),
+        ]:
+            session.add(
+                Project(
+                    name=name, city=city, client=client_name, members=[ProjectMember(user_id=user_id)], meta_fields={}
+                )
+            )
+        await session.commit()
+
+    query = """
+        query($query: String!) {
+            searchProjects(query: $query) {
+                name
+            }
+        }
+    """
+
+    response = await client.post(
+        f"{settings.API_STR}/graphql", json={"query": query, "variables": {"query": "copenhagen"}}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert not data.get("errors")
+    # ranked by the number of matches, and only the projects of the user
+    assert data["data"]["searchProjects"] == [{"name": "Harbour Bath"}, {"name": "Copenhagen Office"}]
+
+    response = await client.post(f"{settings.API_STR}/graphql", json={"query": query, "variables": {"query": "penha"}})
+
+    assert response.json()["data"]["searchProjects"] == [{"name": "Copenhagen Office"}, {"name": "Harbour Bath"}]
+
+
+@pytest.mark.asyncio
+async def test_project_statistics(
+    client: AsyncClient,
+    db,
+    projects,
+    project_members,
+    project_with_groups,
+    life_cycle_stages,
+    project_with_stages,
+    max_statements,
+):
+    async with AsyncSession(db) as session:
+        private_project = Project(name="Private", members=[ProjectMember(user_id="someid1")], meta_fields={})
+        private_project_id = private_project.id
+        session.add(private_project)
+        await session.commit()
+
+    query = """
+        query($projectIds: [String!]!) {
+            projectStatistics(projectIds: $projectIds) {
+                projectId
+                memberCount
+                groupCount
+                stageCount
+                lastModified
+            }
+        }
+    """
+
+    # without any call to Azure AD
+    with max_statements(1):
+        response = await client.post(
+            f"{settings.API_STR}/graphql",
+            json={"query": query, "variables": {"projectIds": [projects[0].id, projects[1].id, private_project_id]}},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert not data.get("errors")
+    statistics = sorted(data["data"]["projectStatistics"], key=lambda x: x["memberCount"], reverse=True)
+    assert [
+        (item["projectId"], item["memberCount"], item["groupCount"], item["stageCount"]) for item in statistics
+    ] == [
+        (projects[0].id, 1 + len(project_members), 3, len(life_cycle_stages)),
+        (projects[1].id, 1, 0, 0),
+    ]
+    assert statistics[0]["lastModified"]
+
+
+@pytest.mark.asyncio
+async def test_project_changes_since(client: AsyncClient, db, projects, mocker):
+    mocker.patch.object(settings, "CHANGES_CURSOR_OVERLAP_SECONDS", 0)
+    query = """
+        query($cursor: String) {
+            projectChangesSince(cursor: $cursor) {
+                cursor
+                changes {
+                    entity
+                    id
+                    projectId
+                    deleted
+                }
+            }
+        }
+    """
+
+    async def changes_since(cursor: str | None) -> dict:
+        response = await client.post(
+            f"{settings.API_STR}/graphql", json={"query": query, "variables": {"cursor": cursor}}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert not data.get("errors")
+        return data["data"]["projectChangesSince"]
+
+    initial = await changes_since(None)
+    assert {(change["entity"], change["projectId"]) for change in initial["changes"]} == {
+        (entity, project.id) for project in projects for entity in ("PROJECT", "MEMBER")
+    }
+
+    async with AsyncSession(db) as session:
+        project = await session.get(Project, projects[0].id)
+        project.name = "Renamed"
+        session.add(project)
+        member = await session.get(ProjectMember, projects[1].members[0].id)
+        await session.delete(member)
+        await session.commit()
+
+    changes = await changes_since(initial["cursor"])
+
+    assert sorted(changes["changes"], key=lambda change: change["entity"]) == [
+        {"entity": "MEMBER", "id": projects[1].members[0].id, "projectId": projects[1].id, "deleted": True},
+        {"entity": "PROJECT", "id": projects[0].id, "projectId": projects[0].id, "deleted": False},
+    ]
+    assert (await changes_since(changes["cursor"]))["changes"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_projects_with_members(
+    client: AsyncClient, project_with_members, mock_members_from_azure, max_statements
+):
+    query = """
+        query {
+            projects {
+                name
+                members {
+                    userId
+                    name
+                    projectGroups {
+                        name
+                    }
+                }
+            }
+        }
+    """
+
+    # The number of statements must not grow with the number of projects or members
+    with max_statements(5):
+        response = await client.post(f"{settings.API_STR}/graphql", json={"query": query, "variables": None})
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert not data.get("errors")
+    projects = sorted(data["data"]["projects"], key=lambda x: x.get("name"))
+    assert len(projects) == 3
+    assert {member["userId"] for member in projects[0]["members"]} == {
+        user["user_id"] for user in mock_members_from_azure
+    }
+    assert projects[0]["members"][0]["name"]
+
+
+@pytest.mark.asyncio
+async def test_get_projects_sql_stats(client: AsyncClient, project_with_members, mocker):
+    mocker.patch.object(settings, "SQL_STATS_IN_RESPONSE", True)
+    query = """
+        query {
+            projects {
+                name
+            }
+        }
+    """
+
+    response = await client.post(f"{settings.API_STR}/graphql", json={"query": query, "variables": None})
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert not data.get("errors")
+    assert data["extensions"]["sql"]["statements"] == 1
+    assert data["extensions"]["sql"]["durationMs"] > 0
+
+
+@pytest.mark.asyncio
+async def test_get_projects_cost(client: AsyncClient, project_with_members, mock_members_from_azure):
+    query = """
+        query {
+            projects {
+                name
+                members {
+                    name
+                }
+            }
+        }
+    """
+
+    response = await client.post(f"{settings.API_STR}/graphql", json={"query": query, "variables": None})
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert not data.get("errors")
+    assert data["extensions"]["cost"] == {"estimated": 111, "maximum": settings.GRAPHQL_MAX_COST}
+
+
+@pytest.mark.asyncio
+async def test_get_projects_too_expensive(client: AsyncClient, project_with_members):
+    query = """
+        query {
+            projects {
+                groups {
+                    members {
+                        projectGroups {
+                            members {
+                                name
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    """
+
+    response = await client.post(f"{settings.API_STR}/graphql", json={"query": query, "variables": None})
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["data"] is None
+    assert "exceeds the maximum cost" in data["errors"][0]["message"]
+
+
+@pytest.mark.asyncio
+async def test_get_projects_too_deep(client: AsyncClient, project_with_members):
+    query = "query { projects { " + "groups { lead { leaderOf { " * 4 + "id" + " } } }" * 4 + " } }"
+
+    response = await client.post(f"{settings.API_STR}/graphql", json={"query": query, "variables": None})
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["data"] is None
+    assert any("exceeds maximum operation depth" in error["message"] for error in data["errors"])
+
+
+@pytest.mark.asyncio
+async def test_get_projects_compressed(client: AsyncClient, project_with_members, mocker):
+    mocker.patch.object(settings, "GRAPHQL_COMPRESSION_MINIMUM_SIZE", 100)
+    query = """
+        query {
+            projects {
+                id
+                name
+            }
+        }
+    """
+
+    response = await client.post(
+        f"{settings.API_STR}/graphql",
+        json={"query": query, "variables": None},
+        headers={"accept-encoding": "gzip;q=0.8, br;q=0.5"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert len(response.json()["data"]["projects"]) == 3
+
+    response = await client.post(
+        f"{settings.API_STR}/graphql",
+        json={"query": query, "variables": None},
+        headers={"accept-encoding": "identity"},
+    )
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert len(response.json()["data"]["projects"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_projects_read_replica(
+    client: AsyncClient, project_with_members, mock_members_from_azure, db, mocker
+):
+    # the test database stands in for the replica, which is told apart by its engine
+    mocker.patch.object(core.connection, "replica_session", core.connection.create_session_factory(db))
+    await caches.get("default").clear()
+    replica_statements = []
+
+    def count_statement(*args):
+        replica_statements.append(args[2])
+
+    event.listen(db.sync_engine, "before_cursor_execute", count_statement)
+    query = """
+        query {
+            projects {
+                name
+            }
+        }
+    """
+    mutation = """
+        mutation {
+            updateProject(id: "%s", name: "Renamed") {
+                name
+            }
+        }
+    """
+
+    try:
+        response = await client.post(f"{settings.API_STR}/graphql", json={"query": query})
+        assert len(response.json()["data"]["projects"]) == 3
+        assert replica_statements
+
+        replica_statements.clear()
+        response = await client.post(f"{settings.API_STR}/graphql", json={"query": mutation % project_with_members.id})
+        assert response.json()["data"]["updateProject"] == {"name": "Renamed"}
+        assert not replica_statements
+
+        # the user who just wrote reads from the primary
+        response = await client.post(f"{settings.API_STR}/graphql", json={"query": query})
+        assert "Renamed" in [project["name"] for project in response.json()["data"]["projects"]]
+        assert not replica_statements
+    finally:
+        event.remove(db.sync_engine, "before_cursor_execute", count_statement)
+
+
+@pytest.mark.asyncio
+async def test_get_metrics(client: AsyncClient, project_with_members, mocker):
+    mocker.patch.object(settings, "METRICS_OPERATION_NAMES", {"getProjects"})
+    for name in ["getProjects", "randomName"]:
+        query = f"""
+            query {name} {{
+                projects {{
+                    name
+                }}
+            }}
+        """
+
+        response = await client.post(f"{settings.API_STR}/graphql", json={"query": query, "variables": None})
+        assert response.status_code == 200
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert (
+        'graphql_operation_duration_seconds_count{operation_name="getProjects",operation_type="query"}' in response.text
+    )
+    # the other operation names are chosen by the clients and not used as labels
+    assert 'graphql_operation_duration_seconds_count{operation_name="other",operation_type="query"}' in response.text
+    assert "randomName" not in response.text
+    assert 'graphql_resolver_duration_seconds_count{field="Query.projects"}' in response.text
+    assert "db_pool_checkout_duration_seconds_count" in response.text
+
+
+@pytest.mark.asyncio
+async def test_get_health(client: AsyncClient):
+    response = await client.get("/health/live")
+    assert response.status_code == 200
+
+    # the database and the OpenID configuration are checked in the background
+    for _ in range(10):
+        response = await client.get("/health/ready")
+        if response.status_code == 200:
+            break
+        await asyncio.sleep(0.01)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "checks": {"database": True, "openid_config": True}}
+
+
 @pytest.mark.asyncio
 async def test_get_projects_with_filters(client: AsyncClient, project_with_members):
     query = """
@@ -79,6 +463,51 @@ async def test_get_projects_with_json_filters(client: AsyncClient, project_with_
     assert data["data"]["projects"][0] == {"metaFields": {"domain": "design"}}
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "meta_fields_filter, names",
+    [
+        ({"hasKey": "phase"}, ["Project 1"]),
+        ({"keyValues": [{"key": "domain", "value": "design"}]}, ["Project 0", "Project 1", "Project 2"]),
+        ({"keyValues": [{"key": "domain", "value": "design"}, {"key": "phase", "value": "tender"}]}, ["Project 1"]),
+        ({"containsObject": {"area": {"gross": 100}}}, ["Project 1"]),
+        ({"containsObject": {"area": {"gross": 200}}}, []),
+        ({"jsonContains": '{"published": true}'}, ["Project 1"]),
+        ({"jsonContains": '{"published": false}'}, []),
+        ({"jsonContains": '{"approved": null, "phase": "tender"}'}, ["Project 1"]),
+    ],
+)
+async def test_get_projects_with_meta_fields_filters(client: AsyncClient, projects, db, meta_fields_filter, names):
+    async with AsyncSession(db) as session:
+        project = await session.get(Project, projects[1].id)
+        project.meta_fields = {
+            "domain": "design",
+            "phase": "tender",
+            "area": {"gross": 100, "net": 90},
+            "published": True,
+            "approved": None,
+        }
+        session.add(project)
+        await session.commit()
+
+    query = """
+        query($metaFields: MetaFieldsFilterOptions!) {
+            projects(filters: {metaFields: $metaFields}) {
+                name
+            }
+        }
+    """
+
+    response = await client.post(
+        f"{settings.API_STR}/graphql", json={"query": query, "variables": {"metaFields": meta_fields_filter}}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert not data.get("errors")
+    assert sorted(project["name"] for project in data["data"]["projects"]) == names
+
+
 @pytest.mark.asyncio
 async def test_create_project(client: AsyncClient):
     query = """
@@ -275,6 +704,28 @@ async def test_update_project(client: AsyncClient, mock_members_from_azure, proj
     }
 
 
+@pytest.mark.asyncio
+async def test_update_project_meta_fields(client: AsyncClient, projects, mock_members_from_azure, max_statements):
+    query = """
+        mutation($id: String!, $metaFields: JSON!) {
+            updateProject(id: $id, metaFields: $metaFields) {
+                metaFields
+            }
+        }
+    """
+
+    with max_statements(8):
+        response = await client.post(
+            f"{settings.API_STR}/graphql",
+            json={"query": query, "variables": {"id": projects[0].id, "metaFields": {"phase": "tender"}}},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert not data.get("errors")
+    assert data["data"]["updateProject"] == {"metaFields": {"domain": "design", "phase": "tender"}}
+
+
 @pytest.mark.asyncio
 async def test_delete_project(client: AsyncClient, projects, db, httpx_mock: HTTPXMock, mocker):
     reporting_schemas_mock = {
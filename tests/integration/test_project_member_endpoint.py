@@ -6,6 +6,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from core.config import settings
 from models.member import ProjectMember
+from models.outbox import OutboxEmail
 
 
 @pytest.mark.asyncio
@@ -112,9 +113,8 @@ async def test_get_project_member_bad_id(
 @pytest.mark.asyncio
 async def test_add_project_member(client: AsyncClient, project_groups, mocker):
     mocker.patch("schema.member.project_exists", return_value=True)
-    mocker.patch("schema.member.get_aad_user_by_email", return_value={"id": "123"})
+    mocker.patch("schema.member.get_aad_users_by_email", return_value=({"test@test.com": {"id": "123"}}, {}))
     mocker.patch("schema.member.invite_user_to_aad", return_value=Response())
-    mocker.patch("schema.member.send_email")
     mocker.patch(
         "schema.member.get_users_from_azure",
         return_value=[
@@ -273,3 +273,80 @@ async def test_remove_project_members_from_group(
     data = response.json()
     assert not data.get("errors")
     assert len(data["data"]["removeProjectMembersFromGroup"]["members"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_add_project_members(client: AsyncClient, project_groups, db, mocker):
+    project_id = project_groups[0].project_id
+    mocker.patch(
+        "schema.member.get_aad_users_by_email",
+        return_value=(
+            {"known@test.com": {"id": "123"}, "member@test.com": {"id": "someid0"}, "new@test.com": {}},
+            {"throttled@test.com": "Failed to look up user throttled@test.com via Graph API: status 429"},
+        ),
+    )
+    invitation = Response()
+    invitation.status_code = 201
+    invitation._content = b'{"invitedUser": {"id": "456"}}'
+    invite = mocker.patch("schema.member.invite_user_to_aad", return_value=invitation)
+    mocker.patch(
+        "schema.member.get_users_from_azure",
+        return_value=[
+            {"user_id": "123", "name": "Known", "email": "known@test.com", "company": None, "last_login": None},
+            {"user_id": "456", "name": "New", "email": "new@test.com", "company": None, "last_login": None},
+        ],
+    )
+    query = """
+        mutation($projectId: String!, $members: [AddProjectMemberInput!]!) {
+            addProjectMembers(projectId: $projectId, members: $members) {
+                email
+                error
+                member {
+                    name
+                    projectGroups {
+                        name
+                    }
+                }
+            }
+        }
+    """
+
+    response = await client.post(
+        f"{settings.API_STR}/graphql",
+        json={
+            "query": query,
+            "variables": {
+                "projectId": project_id,
+                "members": [
+                    {"name": "Known", "email": "known@test.com", "projectGroupIds": [project_groups[0].id]},
+                    {"name": "Member", "email": "member@test.com"},
+                    {"name": "New", "email": "new@test.com"},
+                    {"name": "Throttled", "email": "throttled@test.com"},
+                ],
+            },
+        },
+    )
+
+    data = response.json()
+    assert not data.get("errors")
+    assert data["data"]["addProjectMembers"] == [
+        {"email": "known@test.com", "error": None, "member": {"name": "Known", "projectGroups": [{"name": "Group 0"}]}},
+        {"email": "member@test.com", "error": "Member with email 'member@test.com' already exists", "member": None},
+        {"email": "new@test.com", "error": None, "member": {"name": "New", "projectGroups": []}},
+        {
+            "email": "throttled@test.com",
+            "error": "Failed to look up user throttled@test.com via Graph API: status 429",
+            "member": None,
+        },
+    ]
+    # every member added is looked up in Microsoft Graph
+    assert data["extensions"]["cost"]["estimated"] == 1 + 4 * 30 + settings.GRAPHQL_COST_LIST_SIZE
+    invite.assert_called_once_with("new@test.com", "New", None)
+
+    async with AsyncSession(db) as session:
+        query = select(ProjectMember.user_id).where(ProjectMember.project_id == project_id)
+        user_ids = (await session.exec(query)).all()
+        emails = (await session.exec(select(OutboxEmail.recipient))).all()
+    assert user_ids.count("123") == 1
+    assert user_ids.count("456") == 1
+    assert sorted(emails) == ["known@test.com", "new@test.com"]
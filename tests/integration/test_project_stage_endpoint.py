@@ -1,3 +1,6 @@
+import asyncio
+
+import lcacollect_config.security
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.orm import selectinload
@@ -6,6 +9,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from core.config import settings
 from models.project import Project
+from schema import schema
 
 
 @pytest.mark.asyncio
@@ -125,3 +129,81 @@ async def test_delete_project_stage(db, client: AsyncClient, project_with_stages
         _project = _project.one()
 
     assert len(_project.stages) == len(life_cycle_stages) - 1
+
+
+@pytest.mark.asyncio
+async def test_subscribe_to_project_events(client: AsyncClient, projects, life_cycle_stages):
+    subscription = await schema.subscribe(
+        """
+        subscription($projectId: String!) {
+            projectEvents(projectId: $projectId) {
+                type
+                projectId
+                stageId
+            }
+        }
+        """,
+        variable_values={"projectId": projects[0].id},
+        context_value={"user": lcacollect_config.security.azure_scheme},
+    )
+    next_event = asyncio.create_task(subscription.__anext__())
+    await asyncio.sleep(0.1)
+
+    query = """
+        mutation($projectId: String!, $stageId: String!) {
+            addProjectStage(projectId: $projectId, stageId: $stageId) {
+                name
+            }
+        }
+    """
+    response = await client.post(
+        f"{settings.API_STR}/graphql",
+        json={"query": query, "variables": {"projectId": projects[0].id, "stageId": life_cycle_stages[0].id}},
+    )
+    assert not response.json().get("errors")
+
+    result = await asyncio.wait_for(next_event, 1)
+    await subscription.aclose()
+
+    assert not result.errors
+    assert result.data["projectEvents"] == {
+        "type": "STAGE_ADDED",
+        "projectId": projects[0].id,
+        "stageId": life_cycle_stages[0].id,
+    }
+
+
+@pytest.mark.asyncio
+async def test_set_project_stages(db, client: AsyncClient, project_with_stages, life_cycle_stages, max_statements):
+    project_id = project_with_stages.id
+    stage_ids = [stage.id for stage in life_cycle_stages]
+    query = """
+        mutation($projectId: String!, $stageIds: [String!]!) {
+            setProjectStages(projectId: $projectId, stageIds: $stageIds) {
+                stageId
+                name
+            }
+        }
+    """
+
+    with max_statements(12):
+        response = await client.post(
+            f"{settings.API_STR}/graphql",
+            json={"query": query, "variables": {"projectId": project_id, "stageIds": stage_ids[1:]}},
+        )
+
+    data = response.json()
+    assert not data.get("errors")
+    assert {stage["stageId"] for stage in data["data"]["setProjectStages"]} == set(stage_ids[1:])
+
+    response = await client.post(
+        f"{settings.API_STR}/graphql",
+        json={"query": query, "variables": {"projectId": project_id, "stageIds": ["unknown", *stage_ids]}},
+    )
+    assert response.json()["errors"][0]["message"] == "Life cycle stages with ids: unknown do not exist"
+
+    async with AsyncSession(db) as session:
+        query = select(Project).where(Project.id == project_id).options(selectinload(Project.stages))
+        _project = (await session.exec(query)).one()
+
+    assert {stage.stage_id for stage in _project.stages} == set(stage_ids[1:])
@@ -91,7 +91,7 @@ async def project_groups(db, users_with_groups, project) -> list[ProjectGroup]:
 @pytest.fixture
 async def mock_federation_get_users(mocker, users):
     mocker.patch(
-        "lcacollect_config.user.get_users_from_azure",
+        "core.users.lookup_users_by_id",
         return_value=users,
     )
     yield users
@@ -100,7 +100,7 @@ async def mock_federation_get_users(mocker, users):
 @pytest.fixture
 async def mock_federation_get_users_none(mocker):
     mocker.patch(
-        "lcacollect_config.user.get_users_from_azure",
+        "core.users.lookup_users_by_id",
         return_value=[],
     )
     yield []
@@ -108,7 +108,7 @@ async def mock_federation_get_users_none(mocker):
 
 @pytest.fixture
 async def mock_federation_get_users_error(mocker):
-    mocker.patch("lcacollect_config.user.get_users_from_azure", return_value=[], side_effect=MSGraphException())
+    mocker.patch("core.users.lookup_users_by_id", return_value=[], side_effect=MSGraphException())
     yield []
 
 
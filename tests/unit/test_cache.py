@@ -0,0 +1,149 @@
+import asyncio
+import pickle
+import time
+from datetime import date, datetime, timezone
+
+import fakeredis
+import pytest
+from aiocache import caches
+
+from core.cache import CompactSerializer, delete_prefix, single_flight_cached
+from core.config import cache_config, settings
+
+
+@pytest.fixture
+def redis_cache(mocker):
+    """A cache configured for Redis, backed by an in-process stand-in"""
+
+    mocker.patch.object(settings, "CACHE_BACKEND", "redis")
+    caches.add("redis", cache_config("default"))
+    cache = caches.create("redis")
+    cache.client = fakeredis.FakeAsyncRedis()
+
+    yield cache
+
+
+def test_compact_serializer():
+    serializer = CompactSerializer()
+    value = {
+        "user_id": "someid0",
+        "last_login": date(2023, 4, 1),
+        "updated": datetime(2023, 4, 1, 12, 30, tzinfo=timezone.utc),
+        "groups": [None, True, 1.5],
+    }
+
+    data = serializer.dumps(value)
+
+    assert serializer.loads(data) == value
+    assert len(data) < len(pickle.dumps(value))
+    assert serializer.loads(None) is None
+    with pytest.raises(TypeError):
+        serializer.dumps(object())
+
+
+@pytest.mark.asyncio
+async def test_redis_cache(redis_cache):
+    task = {"id": "task", "authorId": "someid0", "assigneeId": None}
+    users = {"someid0": {"user_id": "someid0", "last_login": date(2023, 4, 1)}, "someid1": None}
+
+    await redis_cache.set("query_task_schema_task", task)
+    await redis_cache.multi_set(users.items(), namespace="azure_users")
+
+    assert await redis_cache.get("query_task_schema_task") == task
+    assert await redis_cache.multi_get(list(users), namespace="azure_users") == list(users.values())
+    # explicit namespaces, like the ones of lcacollect_config, are kept under the namespace of the cache
+    assert sorted(await redis_cache.client.keys()) == [
+        f"{settings.CACHE_NAMESPACE}:default:azure_users:someid0".encode(),
+        f"{settings.CACHE_NAMESPACE}:default:azure_users:someid1".encode(),
+        f"{settings.CACHE_NAMESPACE}:default:query_task_schema_task".encode(),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+async def test_delete_prefix(backend, redis_cache):
+    cache = redis_cache if backend == "redis" else caches.get("default")
+    await cache.multi_set(
+        [("project_access:1:someid0", True), ("project_access:1:someid1", False), ("project_access:2:someid0", True)]
+    )
+
+    await delete_prefix(cache, "project_access:1:")
+
+    assert await cache.multi_get(
+        ["project_access:1:someid0", "project_access:1:someid1", "project_access:2:someid0"]
+    ) == [None, None, True]
+
+
+def key_builder(function, *args, **kwargs):
+    return f"{function.__name__}_{args[0]}"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cached():
+    await caches.get("default").clear()
+    calls = []
+    release = asyncio.Event()
+
+    @single_flight_cached(ttl=60, key_builder=key_builder)
+    async def query(id: str) -> dict:
+        calls.append(id)
+        await release.wait()
+        return {"id": id}
+
+    requests = [asyncio.create_task(query("task")) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*requests) == [{"id": "task"}] * 10
+    assert calls == ["task"]
+
+    # cached, unless it is refreshed early
+    assert await query("task") == {"id": "task"}
+    assert calls == ["task"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cached_refresh_early(mocker):
+    await caches.get("default").clear()
+    calls = []
+
+    @single_flight_cached(ttl=60, key_builder=key_builder)
+    async def query(id: str) -> dict:
+        calls.append(id)
+        await asyncio.sleep(0.01)
+        return {"id": id}
+
+    await query("task")
+    clock = mocker.patch("core.cache.time")
+    clock.perf_counter = time.perf_counter
+    clock.time.return_value = time.time() + 59.99
+
+    # shortly before the expiry, a draw of 0 keeps the entry
+    mocker.patch("core.cache.random.random", return_value=0)
+    await query("task")
+    assert calls == ["task"]
+
+    # while a high draw refreshes it
+    mocker.patch("core.cache.random.random", return_value=0.99)
+    await query("task")
+    assert calls == ["task", "task"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cached_error():
+    await caches.get("default").clear()
+    calls = []
+
+    @single_flight_cached(ttl=60, key_builder=key_builder)
+    async def query(id: str) -> dict:
+        calls.append(id)
+        await asyncio.sleep(0)
+        if len(calls) == 1:
+            raise ConnectionError()
+        return {"id": id}
+
+    results = await asyncio.gather(query("task"), query("task"), return_exceptions=True)
+
+    assert [type(result) for result in results] == [ConnectionError, ConnectionError]
+    assert await query("task") == {"id": "task"}
+    assert calls == ["task", "task"]
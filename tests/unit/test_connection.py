@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+import core.connection
+from core.config import settings
+from core.connection import DATABASE_CHECK, monitor_database, pool_limits, setup_engine
+from core.health import readiness, register_check
+
+
+def test_pool_limits(mocker):
+    mocker.patch.object(settings, "POSTGRES_POOL_SIZE", 20)
+    mocker.patch.object(settings, "POSTGRES_MAX_OVERFLOW", 30)
+    mocker.patch.object(settings, "POSTGRES_RESERVED_CONNECTIONS", 10)
+
+    mocker.patch.object(settings, "POSTGRES_POOL_REPLICAS", 1)
+    assert pool_limits(100) == (20, 30)
+
+    mocker.patch.object(settings, "POSTGRES_POOL_REPLICAS", 4)
+    assert pool_limits(100) == (20, 2)
+
+    mocker.patch.object(settings, "POSTGRES_POOL_REPLICAS", 10)
+    assert pool_limits(100) == (9, 0)
+
+    mocker.patch.object(settings, "POSTGRES_POOL_REPLICAS", 200)
+    assert pool_limits(100) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_setup_engine_auto_size(db, mocker):
+    mocker.patch.object(settings, "POSTGRES_POOL_AUTO_SIZE", True)
+    mocker.patch.object(settings, "POSTGRES_RESERVED_CONNECTIONS", 0)
+    mocker.patch.object(settings, "POSTGRES_POOL_REPLICAS", 1000)
+
+    await setup_engine()
+
+    try:
+        assert core.connection.engine.pool.size() == 1
+        assert core.connection.engine.pool.capacity() == 1
+        assert core.connection.local_session.kw["bind"] is core.connection.engine
+    finally:
+        mocker.patch.object(settings, "POSTGRES_POOL_REPLICAS", 1)
+        await setup_engine()
+        await core.connection.dispose_engine()
+
+    assert core.connection.engine.pool.size() == settings.POSTGRES_POOL_SIZE
+
+
+@pytest.mark.asyncio
+async def test_monitor_database(mocker):
+    mocker.patch("core.connection.ping_database", side_effect=[OSError(), OSError(), None, asyncio.CancelledError()])
+    states = []
+    sleep = mocker.patch(
+        "core.connection.asyncio.sleep", side_effect=lambda delay: states.append(readiness()[1][DATABASE_CHECK])
+    )
+    register_check(DATABASE_CHECK, True)
+
+    with pytest.raises(asyncio.CancelledError):
+        await monitor_database(True)
+
+    delays = [call.args[0] for call in sleep.call_args_list]
+    assert delays[0] == settings.DATABASE_PROBE_INTERVAL
+    assert 0 <= delays[1] <= 0.1 and 0 <= delays[2] <= 0.2
+    assert delays[3] == settings.DATABASE_PROBE_INTERVAL
+    assert states == [True, False, False, True]
@@ -0,0 +1,32 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from core.config import settings
+from core.event_loop import monitor_event_loop
+from core.metrics import EVENT_LOOP_BLOCKED
+
+
+def blocking_call():
+    time.sleep(0.2)
+
+
+@pytest.mark.asyncio
+async def test_monitor_event_loop(mocker, caplog):
+    mocker.patch.object(settings, "EVENT_LOOP_MONITOR_INTERVAL", 0.01)
+    mocker.patch.object(settings, "EVENT_LOOP_LAG_THRESHOLD", 0.05)
+    blocked = EVENT_LOOP_BLOCKED._value.get()
+
+    with caplog.at_level(logging.WARNING, logger="core.event_loop"):
+        monitor = asyncio.create_task(monitor_event_loop())
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+        monitor.cancel()
+
+    assert EVENT_LOOP_BLOCKED._value.get() == blocked + 1
+    # the stack of the event loop points at the blocking call
+    assert len(caplog.records) == 1
+    assert "in blocking_call" in caplog.records[0].message
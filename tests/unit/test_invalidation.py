@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import settings
+from core.invalidation import (
+    Event,
+    GroupChanged,
+    MemberAdded,
+    MemberRemoved,
+    listen,
+    publish,
+    subscribe,
+)
+from core.permissions import has_project_access, project_access_ttl
+from models.member import ProjectMember
+
+
+@pytest.fixture
+def subscriber(mocker):
+    mocker.patch("core.invalidation._subscribers", [])
+    events = []
+
+    async def handler(event: Event):
+        events.append(event)
+
+    yield events, handler
+
+
+@pytest.mark.asyncio
+async def test_publish(subscriber):
+    events, handler = subscriber
+    subscribe("project:1:member:", handler)
+
+    await publish(MemberAdded(project_id="1", user_id="someid0"), GroupChanged(project_id="1", group_id="group"))
+    await publish(MemberRemoved(project_id="2", user_id="someid0"))
+
+    assert events == [MemberAdded(project_id="1", user_id="someid0")]
+
+
+@pytest.mark.asyncio
+async def test_publish_to_replicas(subscriber, mocker):
+    events, handler = subscriber
+    subscribe("project:", handler)
+    mocker.patch.object(settings, "CACHE_BACKEND", "redis")
+    client = fakeredis.FakeAsyncRedis()
+    mocker.patch("core.invalidation.caches.get").return_value.client = client
+
+    listener = asyncio.create_task(listen())
+    await asyncio.sleep(0.01)
+    # events of this replica are handled when they are published, and not again when they are received
+    await publish(MemberAdded(project_id="1", user_id="someid0"))
+    other_replica = {"origin": "other", "type": "MemberRemoved", "data": {"project_id": "1", "user_id": "someid0"}}
+    await client.publish(f"{settings.CACHE_NAMESPACE}:invalidation", json.dumps(other_replica))
+    await asyncio.sleep(0.01)
+    listener.cancel()
+
+    assert events == [MemberAdded(project_id="1", user_id="someid0"), MemberRemoved(project_id="1", user_id="someid0")]
+
+
+@pytest.mark.asyncio
+async def test_project_access_invalidated(db, project):
+    async with AsyncSession(db) as session:
+        assert await has_project_access(session, project.id, "someid0") is False
+
+        session.add(ProjectMember(user_id="someid0", project_id=project.id))
+        await session.commit()
+        # cached until the change is published
+        assert await has_project_access(session, project.id, "someid0") is False
+
+        await publish(MemberAdded(project_id=project.id, user_id="someid0"))
+        assert await has_project_access(session, project.id, "someid0") is True
+
+
+def test_project_access_ttl(mocker):
+    # other replicas only publish their changes through Redis
+    assert project_access_ttl(True) == settings.PROJECT_ACCESS_LOCAL_CACHE_TTL
+
+    mocker.patch.object(settings, "CACHE_BACKEND", "redis")
+    assert project_access_ttl(True) == settings.PROJECT_ACCESS_CACHE_TTL
+    # a denied access may be cached by a read racing with the commit of a new member
+    assert project_access_ttl(False) == settings.PROJECT_ACCESS_LOCAL_CACHE_TTL
+
+
+@pytest.mark.asyncio
+async def test_project_access_missing_project(db):
+    async with AsyncSession(db) as session:
+        assert await has_project_access(session, "missing", "someid0") is False
@@ -1,6 +1,26 @@
+import asyncio
+
+import pytest
+from alembic import command
 from pytest_alembic.tests import (
     test_model_definitions_match_ddl,
     test_single_head_revision,
     test_up_down_consistency,
     test_upgrade,
 )
+
+from migrate import alembic_config, migrate
+
+
+@pytest.mark.asyncio
+async def test_migrate(postgres, mocker):
+    config = alembic_config()
+    await asyncio.to_thread(command.downgrade, config, "base")
+    assert await migrate(config)
+
+    try:
+        upgrade = mocker.patch("alembic.command.upgrade")
+        assert not await migrate(config)
+        upgrade.assert_not_called()
+    finally:
+        await asyncio.to_thread(command.downgrade, config, "base")
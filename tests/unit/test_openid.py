@@ -0,0 +1,62 @@
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi_azure_auth.openid_config import OpenIdConfig
+from jose import jwk
+from pytest_httpx import HTTPXMock
+
+from core.health import readiness, register_check
+from core.openid import OPENID_CHECK, load_openid_config, restore_openid_config
+
+CONFIG_URL = "https://login.test/v2.0/.well-known/openid-configuration"
+
+
+@pytest.fixture
+def signing_key() -> dict:
+    public_key = rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key()
+    pem = public_key.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return {**jwk.construct(pem, "RS256").to_dict(), "kid": "key-1", "use": "sig"}
+
+
+@pytest.mark.asyncio
+async def test_load_openid_config_persisted(httpx_mock: HTTPXMock, signing_key, tmp_path):
+    httpx_mock.add_response(
+        url=CONFIG_URL,
+        json={
+            "authorization_endpoint": "https://login.test/authorize",
+            "token_endpoint": "https://login.test/token",
+            "issuer": "https://login.test/issuer",
+            "jwks_uri": "https://login.test/keys",
+        },
+    )
+    httpx_mock.add_response(url="https://login.test/keys", json={"keys": [signing_key]})
+    path = tmp_path / "openid-configuration.json"
+    register_check(OPENID_CHECK)
+
+    openid_config = OpenIdConfig(config_url=CONFIG_URL)
+    await load_openid_config(openid_config, path)
+
+    assert readiness()[1][OPENID_CHECK] is True
+    assert path.exists()
+
+    restored = OpenIdConfig(config_url=CONFIG_URL)
+    assert restore_openid_config(restored, path)
+    assert restored.issuer == "https://login.test/issuer"
+    assert restored.signing_keys["key-1"].to_dict() == openid_config.signing_keys["key-1"].to_dict()
+
+    # the restored configuration is recent, so it is not loaded from Azure again
+    await restored.load_config()
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_load_openid_config_retries(mocker, tmp_path):
+    openid_config = mocker.Mock(spec=["load_config"])
+    openid_config.load_config = mocker.AsyncMock(side_effect=[RuntimeError("unavailable"), RuntimeError(), None])
+    sleep = mocker.patch("core.openid.asyncio.sleep")
+    register_check(OPENID_CHECK)
+
+    await load_openid_config(openid_config, tmp_path / "missing.json")
+
+    assert [call.args[0] for call in sleep.call_args_list] == [1, 2]
+    assert readiness()[1][OPENID_CHECK] is True
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+import pytest
+from lcacollect_config.email import EmailType
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import settings
+from core.connection import create_session_factory
+from core.outbox import dispatch_batch, enqueue_email
+from models.outbox import OutboxEmail
+
+
+@pytest.fixture
+async def outbox(db, mocker):
+    mocker.patch("core.outbox.local_session", create_session_factory(db))
+    async with AsyncSession(db) as session:
+        for recipient in ["first@test.com", "second@test.com"]:
+            enqueue_email(session, recipient, EmailType.INVITE_TO_LCA, project_name="Project 0", url="url")
+        enqueue_email(session, "third@test.com", EmailType.INVITE_TO_LCA, project_name="Project 1", url="url")
+        await session.commit()
+
+
+async def emails(db) -> list[OutboxEmail]:
+    async with AsyncSession(db) as session:
+        return (await session.exec(select(OutboxEmail).order_by(OutboxEmail.id))).all()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch(db, outbox, mocker):
+    sendgrid = mocker.patch("core.outbox.SendGridAPIClient").return_value
+
+    assert await dispatch_batch() == 3
+
+    # one request per project, with a personalization per recipient
+    messages = sorted(
+        (call.args[0].get() for call in sendgrid.send.call_args_list), key=lambda m: m["content"][0]["value"]
+    )
+    assert [len(message["personalizations"]) for message in messages] == [2, 1]
+    assert "project Project 0" in messages[0]["content"][0]["value"]
+    assert all(email.sent_at and email.next_attempt_at is None for email in await emails(db))
+    assert await dispatch_batch() == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_retry(db, outbox, mocker):
+    mocker.patch.object(settings, "EMAIL_MAX_ATTEMPTS", 2)
+    mocker.patch.object(settings, "EMAIL_RETRY_BASE_DELAY", 60)
+    sendgrid = mocker.patch("core.outbox.SendGridAPIClient").return_value
+    sendgrid.send.side_effect = ConnectionError("SendGrid is down")
+
+    assert await dispatch_batch() == 3
+    failed = await emails(db)
+    assert all(email.attempts == 1 and email.sent_at is None for email in failed)
+    assert all(email.next_attempt_at > email.created_at for email in failed)
+    assert "SendGrid is down" in failed[0].last_error
+
+    async with AsyncSession(db) as session:
+        for email in failed:
+            email.next_attempt_at = email.created_at
+            session.add(email)
+        await session.commit()
+
+    # given up after EMAIL_MAX_ATTEMPTS
+    assert await dispatch_batch() == 3
+    assert all(email.attempts == 2 and email.next_attempt_at is None for email in await emails(db))
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_claims_before_sending(db, outbox, mocker):
+    sending = threading.Event()
+    release = threading.Event()
+
+    def send_emails(*args):
+        sending.set()
+        release.wait(5)
+
+    mocker.patch("core.outbox.send_emails", side_effect=send_emails)
+    dispatch = asyncio.create_task(dispatch_batch())
+    await asyncio.to_thread(sending.wait, 5)
+
+    # the claimed emails are neither due nor locked while they are sent
+    async with AsyncSession(db) as session:
+        query = select(OutboxEmail).with_for_update(nowait=True)
+        claimed = (await session.exec(query)).all()
+        assert all(email.next_attempt_at > email.created_at and email.sent_at is None for email in claimed)
+    assert await dispatch_batch() == 0
+
+    release.set()
+    assert await dispatch == 3
+    assert all(email.sent_at and email.next_attempt_at is None for email in await emails(db))
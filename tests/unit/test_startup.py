@@ -0,0 +1,55 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Seconds it may take to import `main`, override with IMPORT_TIME_BUDGET on slow machines
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "2.0"))
+
+# Dependencies that are only imported on first use
+LAZY_MODULES = ["azure.storage.blob", "opentelemetry.sdk"]
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time of each module in microseconds, as reported by `python -X importtime`"""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parents[2] / "src",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if match := re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line):
+            times[match.group(3)] = int(match.group(1))
+    return times
+
+
+def test_import_time_budget():
+    # The best of a few runs, as the first run also pays for compiling and reading from a cold disk
+    runs = [import_times("main") for _ in range(3)]
+    times = min(runs, key=lambda times: times["main"])
+
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    assert times["main"] / 1e6 < IMPORT_TIME_BUDGET, f"Importing main took {times['main'] / 1e6:.2f}s: {slowest}"
+    assert not [module for module in times if module.startswith(tuple(LAZY_MODULES))]
+
+
+@pytest.mark.asyncio
+async def test_load_initial_data_failure(mocker):
+    from core.health import readiness, register_check
+    from main import load_initial_data
+
+    mocker.patch.dict("core.health._checks")
+    register_check("initial_data")
+    mocker.patch("initial_data.load.load_project_data", side_effect=ConnectionError("Database is down"))
+
+    # reported by the readiness check, as nothing awaits the background task
+    await load_initial_data()
+
+    assert readiness()[1]["initial_data"] is False
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from core.config import settings
+from core.invalidation import GroupChanged, MemberAdded, publish
+from core.subscriptions import SubscriptionOverflow, _queues, forward, project_events
+
+
+@pytest.mark.asyncio
+async def test_project_events():
+    events = project_events("1")
+    next_event = asyncio.create_task(events.__anext__())
+    await asyncio.sleep(0)
+
+    await publish(MemberAdded(project_id="2", user_id="someid0"), GroupChanged(project_id="1", group_id="group"))
+
+    assert await asyncio.wait_for(next_event, 1) == GroupChanged(project_id="1", group_id="group")
+    await events.aclose()
+    assert "1" not in _queues
+
+
+@pytest.mark.asyncio
+async def test_project_events_overflow(mocker):
+    mocker.patch.object(settings, "SUBSCRIPTION_QUEUE_SIZE", 2)
+    events = project_events("1")
+    next_event = asyncio.create_task(events.__anext__())
+    await asyncio.sleep(0)
+
+    # forwarded without yielding to the subscriber in between
+    for i in range(4):
+        await forward(GroupChanged(project_id="1", group_id=f"group{i}"))
+
+    # the queued events are delivered before the slow subscriber is ended
+    assert await next_event == GroupChanged(project_id="1", group_id="group0")
+    assert await events.__anext__() == GroupChanged(project_id="1", group_id="group1")
+    with pytest.raises(SubscriptionOverflow):
+        await events.__anext__()
+    assert "1" not in _queues
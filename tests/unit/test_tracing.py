@@ -0,0 +1,64 @@
+import pytest
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from pytest_httpx import HTTPXMock
+from sqlalchemy import text
+
+from core.config import settings
+from core.federation import get_task
+from core.tracing import setup_tracing, tracer
+
+
+@pytest.fixture(scope="module")
+def finished_spans():
+    exporter = InMemorySpanExporter()
+    provider = setup_tracing(exporter)
+
+    def _finished_spans():
+        provider.force_flush()
+        return exporter.get_finished_spans()
+
+    yield _finished_spans
+
+    provider.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_trace_router_query(httpx_mock: HTTPXMock, finished_spans):
+    mock_data = {
+        "data": {
+            "tasks": [
+                {
+                    "id": "tracing-task",
+                    "authorId": "f8a9e659-ce95-49cf-b45d-5b0a867a4a17",
+                    "assigneeId": None,
+                    "assignedGroupId": None,
+                    "reportingSchemaId": "tracing-schema",
+                }
+            ]
+        }
+    }
+    httpx_mock.add_response(url=f"{settings.ROUTER_URL}/graphql", json=mock_data)
+
+    with tracer.start_as_current_span("test") as parent:
+        await get_task("tracing-schema", "tracing-task", "mytoken")
+
+    span = next(span for span in finished_spans() if span.name == "router tasks")
+    assert span.parent.span_id == parent.get_span_context().span_id
+
+    traceparent = httpx_mock.get_request().headers["traceparent"]
+    assert traceparent.split("-")[1:3] == [
+        f"{span.context.trace_id:032x}",
+        f"{span.context.span_id:016x}",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_trace_sql_statements(db, finished_spans):
+    with tracer.start_as_current_span("test") as parent:
+        async with db.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    spans = [span for span in finished_spans() if span.attributes.get("db.statement") == "SELECT 1"]
+    assert len(spans) == 1
+    assert spans[0].name == "SELECT"
+    assert spans[0].parent.span_id == parent.get_span_context().span_id
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import time
+from datetime import date
+
+import pytest
+
+from core.config import settings
+from core.users import (
+    get_aad_users_by_email,
+    get_users_from_azure,
+    lookup_users_by_id,
+    user_principal_name,
+)
+
+
+def azure_user(user_id: str, name: str) -> dict:
+    return {"user_id": user_id, "name": name, "email": f"{name}@example.com", "company": "Company"}
+
+
+@pytest.fixture
+def graph(mocker):
+    """Microsoft Graph $batch requests of users by id, answering with the names in `graph.names`"""
+
+    def get_users(user_ids):
+        return [azure_user(user_id, mock.names[user_id]) for user_id in user_ids if user_id in mock.names]
+
+    mock = mocker.patch("core.users.lookup_users_by_id", side_effect=get_users)
+    mock.names = {"someid0": "first", "someid1": "second"}
+    yield mock
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = mocker.patch("core.users.time")
+    clock.time.return_value = time.time()
+    yield clock
+
+
+@pytest.mark.asyncio
+async def test_get_users_cached(graph, clock):
+    assert await get_users_from_azure(["someid0", "someid1"]) == [
+        azure_user("someid0", "first"),
+        azure_user("someid1", "second"),
+    ]
+    assert await get_users_from_azure("someid0") == [azure_user("someid0", "first")]
+
+    graph.assert_called_once_with(["someid0", "someid1"])
+
+
+@pytest.mark.asyncio
+async def test_get_users_stale_while_revalidate(graph, clock):
+    await get_users_from_azure("someid0")
+    graph.names["someid0"] = "renamed"
+    clock.time.return_value += settings.USER_CACHE_SOFT_TTL
+
+    # the stale user is returned right away, and refreshed once in the background
+    assert (
+        await asyncio.gather(get_users_from_azure("someid0"), get_users_from_azure("someid0"))
+        == [[azure_user("someid0", "first")]] * 2
+    )
+    await asyncio.sleep(0.01)
+
+    assert graph.call_count == 2
+    assert await get_users_from_azure("someid0") == [azure_user("someid0", "renamed")]
+
+
+@pytest.mark.asyncio
+async def test_get_users_refresh_error(graph, clock):
+    await get_users_from_azure("someid0")
+    graph.side_effect = ConnectionError()
+    clock.time.return_value += settings.USER_CACHE_SOFT_TTL
+
+    # a failed refresh keeps serving the stale user
+    assert await get_users_from_azure("someid0") == [azure_user("someid0", "first")]
+    await asyncio.sleep(0.01)
+    assert await get_users_from_azure("someid0") == [azure_user("someid0", "first")]
+
+
+@pytest.mark.asyncio
+async def test_get_users_hard_ttl(graph, mocker):
+    mocker.patch.object(settings, "USER_CACHE_HARD_TTL", 0.01)
+
+    await get_users_from_azure("someid0")
+    graph.names["someid0"] = "renamed"
+    await asyncio.sleep(0.02)
+
+    # past the hard TTL, the user is fetched before returning
+    assert await get_users_from_azure("someid0") == [azure_user("someid0", "renamed")]
+    assert graph.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_users_in_batches(graph):
+    user_ids = [f"user{index}" for index in range(25)]
+    graph.names = {user_id: user_id for user_id in user_ids}
+
+    assert await get_users_from_azure(user_ids) == [azure_user(user_id, user_id) for user_id in user_ids]
+    # Graph takes at most 20 requests per $batch
+    assert [len(call.args[0]) for call in graph.call_args_list] == [20, 5]
+
+
+@pytest.mark.asyncio
+async def test_get_aad_users_by_email(mocker):
+    emails = [f"user{index}@example.com" for index in range(25)]
+    known = {user_principal_name(email): email for email in emails[::2]}
+
+    def post(url, data, headers):
+        responses = []
+        for request in json.loads(data)["requests"]:
+            principal_name = request["url"].removeprefix("/users/")
+            if principal_name in known:
+                responses.append({"id": request["id"], "status": 200, "body": {"id": known[principal_name]}})
+            elif principal_name == user_principal_name(emails[1]):
+                responses.append({"id": request["id"], "status": 429, "body": {}})
+            else:
+                responses.append({"id": request["id"], "status": 404, "body": {}})
+        return mocker.Mock(status_code=200, json=mocker.Mock(return_value={"responses": responses}))
+
+    graph = mocker.patch("core.users.GraphClient").return_value
+    graph.post.side_effect = post
+
+    users, errors = await get_aad_users_by_email(emails)
+    assert users == {
+        email: {"id": email} if index % 2 == 0 else {} for index, email in enumerate(emails) if email != emails[1]
+    }
+    # a throttled request only fails its own email
+    assert list(errors) == [emails[1]]
+    # in batches of 20 requests
+    assert graph.post.call_count == 2
+
+    # the users found are cached
+    assert await get_aad_users_by_email(emails[2:4]) == ({emails[2]: {"id": emails[2]}, emails[3]: {}}, {})
+    assert len(json.loads(graph.post.call_args.kwargs["data"])["requests"]) == 1
+
+
+def test_lookup_users_by_id(mocker):
+    graph = mocker.patch("core.users.GraphClient").return_value
+    graph.post.return_value.status_code = 200
+    graph.post.return_value.json.return_value = {
+        "responses": [
+            {
+                "id": "someid0",
+                "status": 200,
+                "body": {
+                    "id": "someid0",
+                    "displayName": "First",
+                    "mail": None,
+                    "userPrincipalName": "first@example.com",
+                    "companyName": "Company",
+                    "signInActivity": {"lastSignInDateTime": "2023-01-02T03:04:05Z"},
+                },
+            }
+        ]
+    }
+
+    assert lookup_users_by_id(["someid0"]) == [
+        {
+            "user_id": "someid0",
+            "name": "First",
+            "email": "first@example.com",
+            "company": "Company",
+            "last_login": date(2023, 1, 2),
+        }
+    ]